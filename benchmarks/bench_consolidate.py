@@ -0,0 +1,105 @@
+"""Weekly consolidation time and memory (svs_consolidate).
+
+Builds a database with synthetic customers of 10k+ bills each (several
+bills a day, 3-8 lines per bill) and times, for one customer:
+  * the old weekly-bill path - get_customer_bills() over all history, then
+    the old per-line consolidation (legacy_consolidate below)
+  * consolidate_customer() for one week
+  * consolidate_customer() over the whole history (streamed)
+with peak Python memory (tracemalloc, measured in a second run) for each.
+
+Usage: python benchmarks/bench_consolidate.py [bills_per_customer] [customers]
+Writes the database into a temporary directory.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import svs_db  # noqa: E402
+from svs_consolidate import consolidate_customer, week_window  # noqa: E402
+from svs_core import DATE_FORMAT, INITIAL_PRODUCTS  # noqa: E402
+from svs_sales import get_customer_bills, load_bill_items, save_bill_items  # noqa: E402
+
+BILLS_PER_DAY = 12
+
+
+def legacy_consolidate(sales):
+    """consolidate_bills() as it was before svs_consolidate: strptime twice per line."""
+    lines = {}
+    total_amount = 0.0
+    for bill_id, when, amount, items_json in sales:
+        total_amount += amount
+        for name, quantity, rate, total in load_bill_items(bill_id, items_json):
+            line = lines.setdefault((name, rate), {'name': name, 'quantity': 0.0, 'rate': rate, 'total': 0.0, 'dates': []})
+            line['quantity'] += quantity
+            line['total'] += total
+            line['dates'].append(datetime.strptime(when, DATE_FORMAT).strftime('%d %b'))
+    return list(lines.values()), total_amount
+
+
+def populate(db, bills_per_customer, customers):
+    rng = random.Random(7)
+    start = datetime(2023, 1, 1, 6, 0)
+    with db.transaction() as conn:
+        for c in range(customers):
+            for n in range(bills_per_customer):
+                when = start + timedelta(days=n // BILLS_PER_DAY, minutes=(n % BILLS_PER_DAY) * 50)
+                items = []
+                for name, rate in rng.sample(INITIAL_PRODUCTS, rng.randint(3, 8)):
+                    quantity = rng.choice((0.25, 0.5, 1.0, 2.0, 5.0))
+                    items.append((name, quantity, rate, quantity * rate))
+                bill_id = conn.execute(
+                    "INSERT INTO sales_history (transaction_date, customer_name, total_amount, items_json) VALUES (?, ?, ?, '')",
+                    (when.strftime('%Y-%m-%d %H:%M:%S'), f"Hotel {c}", sum(i[3] for i in items)),
+                ).lastrowid
+                save_bill_items(conn, bill_id, items)
+    return start, start + timedelta(days=(bills_per_customer - 1) // BILLS_PER_DAY)
+
+
+def measure(label, fn):
+    began = time.perf_counter()
+    bills = fn()
+    elapsed = time.perf_counter() - began
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<34} {bills:>6} bills  {elapsed * 1e3:8.1f} ms  peak {peak / 1024:8.0f} KiB")
+
+
+def main():
+    bills_per_customer = int(sys.argv[1]) if len(sys.argv) > 1 else 12000
+    customers = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    with tempfile.TemporaryDirectory() as tmp:
+        # The app-wide database, since load_bill_items() reads lines through it
+        db = svs_db.configure(os.path.join(tmp, "bench.db"))
+        try:
+            with db.transaction() as conn:
+                svs_db.create_schema(conn)
+            began = time.perf_counter()
+            first, last = populate(db, bills_per_customer, customers)
+            print(f"populate: {customers} x {bills_per_customer} bills in {time.perf_counter() - began:.1f} s")
+            customer = "Hotel 0"
+            week = week_window(last - timedelta(days=3))
+
+            def old_path():
+                sales = get_customer_bills(customer, db=db)
+                legacy_consolidate(sales)
+                return len(sales)
+
+            measure("all history (old weekly bill)", old_path)
+            measure("consolidate_customer, one week", lambda: consolidate_customer(customer, *week, db=db).bill_count)
+            measure("consolidate_customer, all history",
+                    lambda: consolidate_customer(customer, first.date(), last.date(), db=db).bill_count)
+        finally:
+            svs_db.configure()  # closes the benchmark database
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""Warm invoice rendering latency.
+
+Times, after one warm-up render:
+  * build_invoice_html() - the per-invoice template work on the WeasyPrint path
+  * generate_pdf_invoice() - a full render (WeasyPrint if importable, else ReportLab)
+
+Usage: python benchmarks/bench_render.py [lines_per_invoice] [repeats]
+Writes PDFs into a temporary directory.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import svs_pdf  # noqa: E402
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    items = [(f"Tomato {i} (தக்காளி)", 1.25 + i, 25.0, (1.25 + i) * 25.0) for i in range(lines)]
+    total = sum(item[3] for item in items)
+
+    start = time.perf_counter()
+    for _ in range(repeats * 50):
+        svs_pdf.build_invoice_html(1, "Bench <Customer> & Co", items, total)
+    build_us = (time.perf_counter() - start) / (repeats * 50) * 1e6
+    print(f"build_invoice_html ({lines} lines): {build_us:.1f} us/invoice")
+
+    engine = "WeasyPrint" if svs_pdf.weasy_available() else "ReportLab"
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.makedirs("Invoices")
+        svs_pdf.generate_pdf_invoice(0, "Warm up", items, total)
+        start = time.perf_counter()
+        for bill_id in range(1, repeats + 1):
+            svs_pdf.generate_pdf_invoice(bill_id, f"Customer {bill_id}", items, total)
+        render_ms = (time.perf_counter() - start) / repeats * 1e3
+    print(f"generate_pdf_invoice via {engine} ({lines} lines): {render_ms:.1f} ms/invoice (warm)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Type-ahead product search latency (svs_search.ProductIndex).
+
+Builds an index over the seed products repeated with variants up to the
+requested number of SKUs, then times keystroke-by-keystroke queries in
+English, Tamil and PLU codes, plus an incremental re-index of one product.
+
+Usage: python benchmarks/bench_search.py [skus] [repeats]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from svs_core import INITIAL_PRODUCTS  # noqa: E402
+from svs_search import ProductIndex  # noqa: E402
+
+GRADES = ['', 'Grade A ', 'Grade B ', 'Organic ', 'Hybrid ', 'Nattu ', 'Ooty ', 'Bangalore ']
+PACKS = ['', ' 250g', ' 500g', ' 1kg', ' 5kg', ' Box', ' Crate', ' Bunch']
+
+
+def make_names(count):
+    """Unique SKU names: grade x seed product x pack size (up to ~5400)."""
+    names = [f"{grade}{base}{pack}" for pack in PACKS for grade in GRADES for base, _rate in INITIAL_PRODUCTS]
+    return names[:count]
+
+
+def main():
+    skus = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    names = make_names(skus)
+
+    index = ProductIndex()
+    start = time.perf_counter()
+    for product_id, name in enumerate(names, 1):
+        index.add(product_id, name)
+    print(f"index build: {skus} SKUs in {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    for query in ("tomato", "தக்காளி", "org sm on 500", "1234"):
+        # Every prefix, as the cashier types the query one key at a time
+        prefixes = [query[:n] for n in range(1, len(query) + 1)]
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for prefix in prefixes:
+                index.search(prefix)
+        per_key = (time.perf_counter() - start) / (repeats * len(prefixes)) * 1e6
+        print(f"search {query!r:>14}: {per_key:7.1f} us/keystroke -> {index.search(query, 3)}")
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        index.add(17, "Renamed Product (புதிய பெயர்)")
+        index.add(17, names[16])
+    print(f"re-index one product: {(time.perf_counter() - start) / (2 * repeats) * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Load generator for the local billing API (svs_server.py).
+
+Starts the service on a temporary database and hammers it from several
+client threads, each a "counter" with its own keep-alive connection doing a
+mix of reads (products, customers, fetch bill) and bill creation.
+Reports requests/sec and p50/p95/p99 latency per request type.
+
+Usage: python benchmarks/bench_server.py [counters] [seconds] [write_percent]
+Pass --url http://host:port to load an already running service instead.
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import svs_db  # noqa: E402
+from svs_core import setup_database_and_folders  # noqa: E402
+from svs_render import RenderEngine  # noqa: E402
+from svs_server import BillingClient, make_server  # noqa: E402
+
+
+def counter(host, port, deadline, write_percent, latencies, seed):
+    rnd = random.Random(seed)
+    client = BillingClient(host, port)
+    products = client.products()
+    bill_ids = []
+    while time.perf_counter() < deadline:
+        roll = rnd.random() * 100
+        start = time.perf_counter()
+        if roll < write_percent:
+            kind = 'create_bill'
+            lines = [{'name': p['name'], 'quantity': rnd.choice((0.5, 1, 2.25))} for p in rnd.sample(products, 5)]
+            bill_ids.append(client.create_bill(f"Counter {seed}", lines)['bill_id'])
+        elif roll < write_percent + 20 and bill_ids:
+            kind = 'get_bill'
+            client.bill(rnd.choice(bill_ids))
+        elif roll < write_percent + 60:
+            kind = 'products'
+            client.products()
+        else:
+            kind = 'customers'
+            client.customers()
+        latencies.setdefault(kind, []).append(time.perf_counter() - start)
+    client.close()
+
+
+def run(host, port, counters, seconds, write_percent):
+    deadline = time.perf_counter() + seconds
+    per_thread = [{} for _ in range(counters)]
+    threads = [threading.Thread(target=counter, args=(host, port, deadline, write_percent, per_thread[i], i))
+               for i in range(counters)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    merged = {}
+    for latencies in per_thread:
+        for kind, values in latencies.items():
+            merged.setdefault(kind, []).extend(values)
+    total = sum(len(v) for v in merged.values())
+    print(f"{counters} counters, {seconds}s, {write_percent}% writes: {total / seconds:.0f} req/s")
+    for kind, values in sorted(merged.items()):
+        values.sort()
+        q = statistics.quantiles(values, n=100) if len(values) > 1 else values * 99
+        print(f"  {kind:<12} {len(values):>7} req  p50 {q[49] * 1e3:6.2f} ms  "
+              f"p95 {q[94] * 1e3:6.2f} ms  p99 {q[98] * 1e3:6.2f} ms")
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--url')]
+    counters = int(args[0]) if len(args) > 0 else 3
+    seconds = float(args[1]) if len(args) > 1 else 5
+    write_percent = float(args[2]) if len(args) > 2 else 30
+
+    url = next((a.split('=', 1)[1] for a in sys.argv[1:] if a.startswith('--url=')), None)
+    if url:
+        parsed = urlparse(url)
+        run(parsed.hostname, parsed.port, counters, seconds, write_percent)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        svs_db.configure(os.path.join(tmp, 'bench.db'))
+        setup_database_and_folders()
+        server = make_server(port=0, engine=RenderEngine(0))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            run('127.0.0.1', server.server_address[1], counters, seconds, write_percent)
+        finally:
+            server.shutdown()
+            server.server_close()
+            svs_db.get_db().close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Startup cost of the PDF layer.
+
+Each measurement runs in a fresh interpreter:
+  * import svs_pdf with no font manifest / with a valid manifest
+  * svs_fonts.resolve_fonts() with no manifest (folders are listed and
+    matched) and with a valid manifest (a few stat() calls)
+  * svs_fonts.register_fonts() (the TTF parse that used to run on import)
+  * the first generate_pdf_invoice()
+  * import svs_billing_app (everything before the first window is built)
+
+Usage: python benchmarks/bench_startup.py [repeats]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNIPPETS = {
+    'import svs_pdf': "import svs_pdf",
+    'resolve fonts': (
+        "import svs_fonts; t = time.perf_counter(); svs_fonts.resolve_fonts(); "
+        "print('STEP', time.perf_counter() - t)"
+    ),
+    'register fonts': (
+        "import svs_fonts; svs_fonts.resolve_fonts(); t = time.perf_counter(); svs_fonts.register_fonts(); "
+        "print('STEP', time.perf_counter() - t)"
+    ),
+    'first render': (
+        "import os, svs_pdf; os.makedirs('Invoices', exist_ok=True); "
+        "t = time.perf_counter(); "
+        "svs_pdf.generate_pdf_invoice(1, 'Bench', [('Tomato (தக்காளி)', 1.0, 20.0, 20.0)], 20.0, use_weasyprint=False); "
+        "print('STEP', time.perf_counter() - t)"
+    ),
+    'import svs_billing_app': "import svs_billing_app",
+}
+
+
+def run(snippet, workdir, manifest):
+    code = (
+        "import time, sys; sys.path.insert(0, %r); t0 = time.perf_counter(); "
+        "%s; print('TOTAL', time.perf_counter() - t0)" % (ROOT, snippet)
+    )
+    env = dict(os.environ, SVS_FONT_MANIFEST=manifest)
+    out = subprocess.run([sys.executable, "-c", code], cwd=workdir, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return {line.split()[0]: float(line.split()[1]) for line in out.splitlines()
+            if line.startswith(('TOTAL', 'STEP'))}
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    def best(name, workdir, manifest, key='TOTAL', cold=False):
+        times = []
+        for _ in range(repeats):
+            if cold and os.path.exists(manifest):
+                os.remove(manifest)
+            times.append(run(SNIPPETS[name], workdir, manifest)[key])
+        return min(times) * 1e3
+
+    with tempfile.TemporaryDirectory() as workdir:
+        manifest = os.path.join(workdir, 'svs_fonts.json')
+        print(f"import svs_pdf, no manifest:     {best('import svs_pdf', workdir, manifest, cold=True):7.1f} ms")
+        print(f"import svs_pdf, with manifest:   {best('import svs_pdf', workdir, manifest):7.1f} ms")
+        print(f"resolve fonts, no manifest:      {best('resolve fonts', workdir, manifest, 'STEP', cold=True):7.2f} ms")
+        print(f"resolve fonts, with manifest:    {best('resolve fonts', workdir, manifest, 'STEP'):7.2f} ms")
+        print(f"register fonts (first render):   {best('register fonts', workdir, manifest, 'STEP'):7.1f} ms")
+        print(f"first invoice render:            {best('first render', workdir, manifest, 'STEP'):7.1f} ms")
+        try:
+            print(f"import svs_billing_app:          {best('import svs_billing_app', workdir, manifest):7.1f} ms")
+        except subprocess.CalledProcessError as e:
+            print(f"import svs_billing_app failed: {e.stderr.strip().splitlines()[-1]}")
+
+
+if __name__ == "__main__":
+    main()
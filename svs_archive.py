@@ -0,0 +1,290 @@
+"""Cold storage for old sales: one SQLite file per year.
+
+sales_history only ever grew, so every screen that reads it slowed down with
+it. archive_bills() moves the live bills of closed years (or months: any
+cutoff date works) and their line items into ``svs_sales_YYYY.db`` files next
+to the shop database, and removes them from it. Each archive file has the
+same tables, indexes and daily rollup as the hot database, so the queries
+that run against the hot database run against an archive unchanged
+(qualify() only prefixes the table names with the archive's schema).
+
+The hot database keeps one sales_archives row per file: the year, bill
+count, total, and date and bill_id ranges. Readers (history, counts,
+reprints, weekly bills and statements) look up the archives that overlap
+what they were asked for and ATTACH just those, once per connection, on
+first use. Billing and the dashboard, which only touch recent days, never
+open an archive. Archived bills are read-only.
+
+Bills move a batch at a time: copied into the archive in one transaction,
+then deleted from the hot database in another. A crash in between leaves a
+copy in both, and the next run finishes the move. Tombstones (deleted bills
+waiting for undo) are not archived.
+"""
+import json
+import os
+import re
+import sqlite3
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+from svs_db import get_db
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Folder of the archive files; by default the shop database's own folder
+ARCHIVE_DIR = os.getenv('SVS_ARCHIVE_DIR')
+ARCHIVE_NAME = 'svs_sales_{year}.db'
+# Bills moved per pair of transactions, so the counter's writes never wait long
+ARCHIVE_BATCH_SIZE = 500
+# A year is archived once it closed at least this many days ago, so
+# last year's bills stay hot for the first months of the new one
+ARCHIVE_GRACE_DAYS = 90
+# SQLite allows 10 attached databases per connection by default
+MAX_ATTACHED = 9
+
+ArchiveInfo = namedtuple(
+    'ArchiveInfo',
+    'year file_name bill_count total_amount first_date last_date first_bill_id last_bill_id archived_at',
+)
+ArchiveResult = namedtuple('ArchiveResult', 'before years bills elapsed')
+
+# Tables of an archive file, created on first use. The same as in the hot
+# database (svs_db) minus the foreign key to products, which stays there;
+# deleted_at is always NULL here. The rollup is kept by triggers.
+ARCHIVE_SCHEMA_STATEMENTS = [
+    '''
+    CREATE TABLE IF NOT EXISTS {schema}.sales_history (
+        bill_id INTEGER PRIMARY KEY,
+        transaction_date TEXT NOT NULL,
+        customer_name TEXT NOT NULL,
+        total_amount REAL NOT NULL,
+        items_json TEXT NOT NULL,
+        deleted_at TEXT,
+        deleted_by INTEGER
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS {schema}.sales_items (
+        bill_id INTEGER NOT NULL REFERENCES sales_history(bill_id) ON DELETE CASCADE,
+        line_no INTEGER NOT NULL,
+        product_id INTEGER,
+        product_name TEXT NOT NULL,
+        quantity_kg REAL NOT NULL,
+        rate REAL NOT NULL,
+        total REAL NOT NULL,
+        PRIMARY KEY (bill_id, line_no)
+    )
+    ''',
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_live_bills_date ON sales_history(transaction_date, total_amount, deleted_at) WHERE deleted_at IS NULL",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_live_bills_customer_date ON sales_history(customer_name, transaction_date) WHERE deleted_at IS NULL",
+    "DROP INDEX IF EXISTS {schema}.idx_live_bills_customer",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_sales_items_product_name ON sales_items(product_name)",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_legacy_bills ON sales_history(bill_id) WHERE items_json != ''",
+    '''
+    CREATE TABLE IF NOT EXISTS {schema}.daily_sales_rollup (
+        sale_date TEXT NOT NULL,
+        customer_name TEXT NOT NULL,
+        bill_count INTEGER NOT NULL,
+        total_amount REAL NOT NULL,
+        PRIMARY KEY (sale_date, customer_name)
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS {schema}.trg_rollup_insert AFTER INSERT ON sales_history
+    BEGIN
+        INSERT INTO daily_sales_rollup (sale_date, customer_name, bill_count, total_amount)
+        VALUES (substr(NEW.transaction_date, 1, 10), NEW.customer_name, 1, NEW.total_amount)
+        ON CONFLICT (sale_date, customer_name) DO UPDATE SET
+            bill_count = bill_count + 1,
+            total_amount = total_amount + excluded.total_amount;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS {schema}.trg_rollup_delete AFTER DELETE ON sales_history
+    BEGIN
+        UPDATE daily_sales_rollup
+        SET bill_count = bill_count - 1, total_amount = total_amount - OLD.total_amount
+        WHERE sale_date = substr(OLD.transaction_date, 1, 10) AND customer_name = OLD.customer_name;
+        DELETE FROM daily_sales_rollup
+        WHERE sale_date = substr(OLD.transaction_date, 1, 10) AND customer_name = OLD.customer_name
+          AND bill_count <= 0;
+    END
+    ''',
+]
+
+# Table names that qualify() points at an archive
+_TABLES = re.compile(r'(?<![\w.])(sales_history|sales_items|daily_sales_rollup)\b')
+
+
+def qualify(sql, schema):
+    """Points the sales tables in sql at schema ('main' leaves sql as it is)."""
+    if schema == 'main':
+        return sql
+    return _TABLES.sub(rf'{schema}.\1', sql)
+
+
+def archive_path(year, db=None):
+    folder = ARCHIVE_DIR or os.path.dirname(os.path.abspath((db or get_db()).path))
+    return os.path.join(folder, ARCHIVE_NAME.format(year=year))
+
+
+def default_cutoff(today=None):
+    """First day of the newest year that closed ARCHIVE_GRACE_DAYS ago ('YYYY-MM-DD')."""
+    day = (today or date.today()) - timedelta(days=ARCHIVE_GRACE_DAYS)
+    return f"{day.year}-01-01"
+
+
+# --- READING ---
+
+def list_archives(db=None):
+    """ArchiveInfo for every archive file, newest year first."""
+    return [ArchiveInfo(*row) for row in (db or get_db()).query('''
+        SELECT year, file_name, bill_count, total_amount, first_date, last_date,
+               first_bill_id, last_bill_id, archived_at
+        FROM sales_archives
+        ORDER BY year DESC
+    ''')]
+
+
+def archives_between(start_date=None, end_date=None, db=None):
+    """Archives holding bills dated in [start_date, end_date] (either end optional), newest first."""
+    start = str(start_date)[:10] if start_date else '0000-00-00'
+    end = str(end_date)[:10] if end_date else '9999-12-31'
+    return [info for info in list_archives(db)
+            if info.bill_count and info.first_date <= end and info.last_date >= start]
+
+
+def attach_archive(year, db=None, create=False):
+    """ATTACHes a year's archive to this thread's connection (once); returns its schema name.
+
+    Raises FileNotFoundError when the file is missing, unless create is set.
+    Must not be called inside a transaction.
+    """
+    db = db or get_db()
+    schema = f"archive_{int(year)}"
+    conn = db.connection()
+    attached = [row[1] for row in conn.execute("PRAGMA database_list") if row[1].startswith('archive_')]
+    if schema in attached:
+        return schema
+    path = archive_path(year, db)
+    if not create and not os.path.exists(path):
+        raise FileNotFoundError(f"Sales archive {path} is missing; put it back next to the database.")
+    # Make room by detaching archives this connection is not reading right now
+    for other in attached[:max(0, len(attached) - MAX_ATTACHED + 1)]:
+        try:
+            conn.execute(f"DETACH DATABASE {other}")
+        except sqlite3.OperationalError:
+            pass  # still in use by an open cursor
+    conn.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+    if create:
+        for statement in ARCHIVE_SCHEMA_STATEMENTS:
+            conn.execute(statement.format(schema=schema))
+    return schema
+
+
+def archive_schemas(start_date=None, end_date=None, db=None):
+    """Attached schema names of the archives overlapping the window, oldest first."""
+    return [attach_archive(info.year, db) for info in reversed(archives_between(start_date, end_date, db))]
+
+
+def find_archived_bill(bill_id, db=None):
+    """Schema name of the archive holding bill_id, or None when it is not archived."""
+    db = db or get_db()
+    for info in list_archives(db):
+        if info.bill_count and info.first_bill_id <= bill_id <= info.last_bill_id:
+            schema = attach_archive(info.year, db)
+            if db.query_one(f"SELECT 1 FROM {schema}.sales_history WHERE bill_id = ?", (bill_id,)):
+                return schema
+    return None
+
+
+# --- ARCHIVING ---
+
+def archive_bills(before=None, batch_size=ARCHIVE_BATCH_SIZE, is_idle=None, db=None):
+    """Moves live bills dated before ``before`` ('YYYY-MM-DD', default
+    default_cutoff()) into their year's archive file.
+
+    Safe to run while bills are being saved, and to run again after it was
+    interrupted; stops between batches once is_idle() turns False. Returns
+    an ArchiveResult.
+    """
+    db = db or get_db()
+    before = str(before or default_cutoff())[:10]
+    began = time.perf_counter()
+    years, moved = [], 0
+    while is_idle is None or is_idle():
+        row = db.query_one(
+            "SELECT MIN(transaction_date) FROM sales_history WHERE deleted_at IS NULL AND transaction_date < ?",
+            (before,),
+        )
+        if row[0] is None:
+            break
+        year = int(row[0][:4])
+        window = (f"{year}-01-01", min(f"{year + 1}-01-01", before))
+        schema = attach_archive(year, db, create=True)
+        if year not in years:
+            years.append(year)
+        moved += _move_batch(schema, year, window, batch_size, db)
+    return ArchiveResult(before, years, moved, time.perf_counter() - began)
+
+
+def _move_batch(schema, year, window, batch_size, db):
+    """Copies the oldest batch of the window's live bills into the archive, then drops them from the hot database."""
+    with db.transaction() as conn:
+        bill_ids = json.dumps([bill_id for (bill_id,) in conn.execute('''
+            SELECT bill_id FROM sales_history
+            WHERE deleted_at IS NULL AND transaction_date >= ? AND transaction_date < ?
+            ORDER BY transaction_date LIMIT ?
+        ''', (*window, batch_size))])
+        # OR IGNORE: bills copied by an interrupted run are already there
+        conn.execute(f'''
+            INSERT OR IGNORE INTO {schema}.sales_history
+                (bill_id, transaction_date, customer_name, total_amount, items_json)
+            SELECT bill_id, transaction_date, customer_name, total_amount, items_json
+            FROM main.sales_history WHERE bill_id IN (SELECT value FROM json_each(?))
+        ''', (bill_ids,))
+        conn.execute(f'''
+            INSERT OR IGNORE INTO {schema}.sales_items
+            SELECT * FROM main.sales_items WHERE bill_id IN (SELECT value FROM json_each(?))
+        ''', (bill_ids,))
+
+    with db.transaction() as conn:
+        # A bill edited since the copy (its header differs) stays hot and its stale copy goes
+        deleted = conn.execute(f'''
+            DELETE FROM main.sales_history WHERE bill_id IN (
+                SELECT h.bill_id FROM main.sales_history h JOIN {schema}.sales_history a USING (bill_id)
+                WHERE h.bill_id IN (SELECT value FROM json_each(?)) AND h.deleted_at IS NULL
+                  AND h.transaction_date = a.transaction_date AND h.customer_name = a.customer_name
+                  AND h.total_amount = a.total_amount)
+        ''', (bill_ids,)).rowcount
+        conn.execute(f'''
+            DELETE FROM {schema}.sales_history
+            WHERE bill_id IN (SELECT value FROM json_each(?)) AND bill_id IN (SELECT bill_id FROM main.sales_history)
+        ''', (bill_ids,))
+        _register(conn, schema, year)
+    return deleted
+
+
+def _register(conn, schema, year):
+    """Refreshes the hot database's sales_archives row for a year's file."""
+    count, total = conn.execute(
+        f"SELECT COALESCE(SUM(bill_count), 0), TOTAL(total_amount) FROM {schema}.daily_sales_rollup"
+    ).fetchone()
+    first_date, last_date = conn.execute(
+        f"SELECT substr(MIN(transaction_date), 1, 10), substr(MAX(transaction_date), 1, 10) FROM {schema}.sales_history"
+    ).fetchone()
+    first_id, last_id = conn.execute(f"SELECT MIN(bill_id), MAX(bill_id) FROM {schema}.sales_history").fetchone()
+    conn.execute('''
+        INSERT OR REPLACE INTO sales_archives
+            (year, file_name, bill_count, total_amount, first_date, last_date, first_bill_id, last_bill_id, archived_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (year, ARCHIVE_NAME.format(year=year), count, total, first_date, last_date, first_id, last_id,
+          datetime.now().strftime(DATE_FORMAT)))
+
+
+def format_archive_result(result):
+    if not result.bills:
+        return f"No bills before {result.before} to archive."
+    years = ", ".join(ARCHIVE_NAME.format(year=year) for year in result.years)
+    return f"{result.bills} bills before {result.before} moved to {years} in {result.elapsed:.1f}s."
@@ -0,0 +1,334 @@
+"""Batch print jobs for historical invoices.
+
+reprint_bills() streams every bill matching a date range and/or a customer
+list straight from the database, keeps the render engine's worker pool busy
+with a bounded number of jobs in flight, and writes the PDFs plus a CSV
+manifest into a fresh folder under Invoices/.
+
+print_day_end() puts all of one day's bills into a single multi-page PDF
+(optionally behind a summary page), so closing time is one document and
+one print job instead of dozens.
+
+run_statements() is the week-end / month-end statement run: one
+consolidated statement PDF per customer with bills in the period, rendered
+in parallel. Its ledger.csv records every finished statement as it
+completes, so an interrupted run picks up where it stopped.
+
+Command line:
+    python svs_batch.py reprint --from 2025-01-01 --to 2025-01-31 --customer "Hotel A"
+    python svs_batch.py dayend --date 2025-01-31
+    python svs_batch.py statements --month 2025-01
+"""
+import argparse
+import csv
+import hashlib
+import os
+import time
+from collections import deque, namedtuple
+from datetime import datetime
+
+from svs_consolidate import active_customers, consolidate_customers, month_window, resolve_window, week_window
+from svs_pdf import make_pdf_filename, safe_file_stem
+from svs_render import RenderEngine, get_render_engine, make_job
+from svs_sales import iter_bills_with_items
+
+MANIFEST_NAME = 'manifest.csv'
+MANIFEST_FIELDS = ['bill_id', 'transaction_date', 'customer_name', 'total_amount', 'pdf_path', 'status', 'error']
+
+LEDGER_NAME = 'ledger.csv'
+LEDGER_FIELDS = ['customer_name', 'bill_count', 'total_amount', 'date_range', 'pdf_path', 'status', 'error', 'finished_at']
+
+ReprintResult = namedtuple('ReprintResult', 'folder manifest_path rendered failed elapsed bills_per_sec')
+DayEndResult = namedtuple('DayEndResult', 'pdf_path bill_count total_amount elapsed')
+StatementResult = namedtuple('StatementResult',
+                             'folder ledger_path customers rendered skipped failed total_amount elapsed')
+
+
+def make_run_folder(prefix='Reprint', root='Invoices'):
+    """Creates and returns a per-run output folder, e.g. Invoices/Reprint 2025-01-31 18-05-09."""
+    folder = os.path.join(root, f"{prefix} {datetime.now().strftime('%Y-%m-%d %H-%M-%S')}")
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def reprint_bills(start_date=None, end_date=None, customers=None, engine=None,
+                  folder=None, max_in_flight=None, progress=None, db=None):
+    """Re-renders every matching bill and returns a ReprintResult.
+
+    Dates are 'YYYY-MM-DD' and inclusive. progress(done, failed), if given,
+    is called from this thread after each finished bill.
+    """
+    engine = engine or get_render_engine()
+    folder = folder or make_run_folder()
+    # Enough queued work to keep every worker busy without loading all bills
+    max_in_flight = max_in_flight or max(4, 4 * engine.workers)
+    manifest_path = os.path.join(folder, MANIFEST_NAME)
+
+    rendered = failed = 0
+    started = time.perf_counter()
+    in_flight = deque()
+
+    with open(manifest_path, 'w', newline='', encoding='utf-8') as manifest_file:
+        manifest = csv.DictWriter(manifest_file, fieldnames=MANIFEST_FIELDS)
+        manifest.writeheader()
+
+        def finish_oldest():
+            nonlocal rendered, failed
+            bill, future = in_flight.popleft()
+            row = {
+                'bill_id': bill.bill_id,
+                'transaction_date': bill.transaction_date,
+                'customer_name': bill.customer_name,
+                'total_amount': f"{bill.total_amount:.2f}",
+                'pdf_path': '',
+                'status': 'ok',
+                'error': '',
+            }
+            try:
+                row['pdf_path'] = future.result()
+                rendered += 1
+            except Exception as e:
+                row['status'] = 'failed'
+                row['error'] = str(e)
+                failed += 1
+            manifest.writerow(row)
+            if progress:
+                progress(rendered, failed)
+
+        for bill in iter_bills_with_items(start_date, end_date, customers, db=db):
+            filename = os.path.join(folder, f"{safe_file_stem(bill.customer_name)} - Bill {bill.bill_id}.pdf")
+            future = engine.submit(bill.bill_id, bill.customer_name, bill.items, bill.total_amount, filename=filename)
+            in_flight.append((bill, future))
+            if len(in_flight) >= max_in_flight:
+                finish_oldest()
+        while in_flight:
+            finish_oldest()
+
+    elapsed = time.perf_counter() - started
+    bills_per_sec = (rendered + failed) / elapsed if elapsed > 0 else 0.0
+    return ReprintResult(folder, manifest_path, rendered, failed, elapsed, bills_per_sec)
+
+
+def print_day_end(day=None, summary=True, engine=None, filename=None, db=None):
+    """Renders every bill of one day ('YYYY-MM-DD', default today) into one PDF.
+
+    Returns a DayEndResult; pdf_path is None when the day has no bills.
+    """
+    engine = engine or get_render_engine()
+    day = str(day or datetime.now().date())[:10]
+    started = time.perf_counter()
+    invoices = []
+    for bill in iter_bills_with_items(day, day, db=db):
+        printed_at = datetime.strptime(bill.transaction_date, '%Y-%m-%d %H:%M:%S').strftime('%d-%b-%Y %H:%M')
+        invoices.append(make_job(bill.bill_id, bill.customer_name, bill.items, bill.total_amount, date_range=printed_at))
+    if not invoices:
+        return DayEndResult(None, 0, 0.0, time.perf_counter() - started)
+
+    filename = filename or make_pdf_filename(f"Day End {day}")
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    summary_title = f"DAY-END SUMMARY {day}" if summary else None
+    pdf_path = engine.submit_merged(invoices, filename, summary_title).result()
+    total_amount = sum(invoice['total_amount'] for invoice in invoices)
+    return DayEndResult(pdf_path, len(invoices), total_amount, time.perf_counter() - started)
+
+
+def statement_folder(start_date, end_date, root='Invoices'):
+    """The fixed output folder of a period, so a rerun finds its ledger again."""
+    return os.path.join(root, f"Statements {start_date} to {end_date}")
+
+
+def read_ledger(path):
+    """customer -> last ledger row written for them ({} when there is no ledger yet)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, newline='', encoding='utf-8') as f:
+        # A run killed mid-write can leave a torn last line; it has no status
+        return {row['customer_name']: row for row in csv.DictReader(f) if row.get('finished_at')}
+
+
+def statement_filename(folder, customer, start_date, end_date):
+    """Path of a customer's statement PDF.
+
+    safe_file_stem() drops characters, so 'A/B' and 'AB' share a stem; a short
+    hash of the exact name keeps their files apart (and stable across runs).
+    """
+    digest = hashlib.sha1(customer.encode('utf-8')).hexdigest()[:8]
+    return os.path.join(folder, f"{safe_file_stem(customer)} {digest} - {start_date} to {end_date}.pdf")
+
+
+def _statement_is_current(row, bill_count, total_amount):
+    return (row is not None and row['status'] == 'ok' and os.path.exists(row['pdf_path'])
+            and int(row['bill_count']) == bill_count and row['total_amount'] == f"{total_amount:.2f}")
+
+
+def run_statements(start_date=None, end_date=None, title="CONSOLIDATED STATEMENT", engine=None,
+                   folder=None, max_in_flight=None, progress=None, db=None):
+    """Renders a consolidated statement for every customer with bills in the period.
+
+    Dates are 'YYYY-MM-DD' and inclusive (default: this week). Customers and
+    their totals come from the daily rollup; their bills are consolidated in
+    one pass grouped by customer and rendered with a bounded number of
+    statements in flight. Each statement is appended to the ledger (and
+    flushed to disk) once its PDF is written. Running the same period again
+    skips customers whose statement is in the ledger and still matches their
+    bill count and total, and redoes failed or changed ones.
+
+    progress(done, total, failed), if given, is called from this thread.
+    Returns a StatementResult.
+    """
+    start_date, end_date = resolve_window(start_date, end_date)
+    engine = engine or get_render_engine()
+    folder = folder or statement_folder(start_date, end_date)
+    os.makedirs(folder, exist_ok=True)
+    ledger_path = os.path.join(folder, LEDGER_NAME)
+    max_in_flight = max_in_flight or max(4, 4 * engine.workers)
+
+    started = time.perf_counter()
+    customers = active_customers(start_date, end_date, db=db)
+    finished = read_ledger(ledger_path)
+    todo = [customer for customer, bill_count, total_amount in customers
+            if not _statement_is_current(finished.get(customer), bill_count, total_amount)]
+    skipped = len(customers) - len(todo)
+    rendered = failed = 0
+    total_amount = sum(customer[2] for customer in customers)
+    in_flight = deque()
+    if progress:
+        progress(skipped, len(customers), failed)
+
+    new_ledger = not os.path.exists(ledger_path) or os.path.getsize(ledger_path) == 0
+    if not new_ledger:
+        with open(ledger_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            torn = f.read(1) != b'\n'
+    with open(ledger_path, 'a', newline='', encoding='utf-8') as ledger_file:
+        ledger = csv.DictWriter(ledger_file, fieldnames=LEDGER_FIELDS)
+        if new_ledger:
+            ledger.writeheader()
+        elif torn:
+            ledger_file.write('\r\n')  # end the torn line so the next row starts clean
+
+        def finish_oldest():
+            nonlocal rendered, failed
+            statement, future = in_flight.popleft()
+            row = {
+                'customer_name': statement.customer,
+                'bill_count': statement.bill_count,
+                'total_amount': f"{statement.total_amount:.2f}",
+                'date_range': statement.date_range,
+                'pdf_path': '',
+                'status': 'ok',
+                'error': '',
+            }
+            try:
+                row['pdf_path'] = future.result()
+                rendered += 1
+            except Exception as e:
+                row['status'] = 'failed'
+                row['error'] = str(e)
+                failed += 1
+            row['finished_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            ledger.writerow(row)
+            # On disk before the next statement, so a crash never loses a finished one
+            ledger_file.flush()
+            os.fsync(ledger_file.fileno())
+            if progress:
+                progress(skipped + rendered + failed, len(customers), failed)
+
+        for statement in consolidate_customers(todo, start_date, end_date, db=db):
+            filename = statement_filename(folder, statement.customer, start_date, end_date)
+            future = engine.submit(0, statement.customer, statement.items, statement.total_amount,
+                                   title=title, date_range=statement.date_range, filename=filename)
+            in_flight.append((statement, future))
+            if len(in_flight) >= max_in_flight:
+                finish_oldest()
+        while in_flight:
+            finish_oldest()
+
+    return StatementResult(folder, ledger_path, len(customers), rendered, skipped, failed,
+                           total_amount, time.perf_counter() - started)
+
+
+def format_statement_result(result):
+    """Summary of a statement run for the CLI and the History screen."""
+    return (
+        f"{result.customers} customer(s), total {result.total_amount:,.2f}: {result.rendered} statement(s) rendered, "
+        f"{result.skipped} already done, {result.failed} failed in {result.elapsed:.1f}s.\nLedger: {result.ledger_path}"
+    )
+
+
+def format_result(result):
+    """One-line summary for the CLI and the History screen."""
+    return (
+        f"{result.rendered} bill(s) reprinted, {result.failed} failed in {result.elapsed:.1f}s "
+        f"({result.bills_per_sec:.1f} bills/sec).\nManifest: {result.manifest_path}"
+    )
+
+
+# --- COMMAND LINE ---
+
+def add_batch_commands(commands):
+    """Adds the 'reprint', 'dayend' and 'statements' sub-commands to an argparse subparsers object."""
+    reprint = commands.add_parser('reprint', help="Re-render invoice PDFs for a date range and/or customers")
+    reprint.add_argument('--from', dest='start_date', help="first day, YYYY-MM-DD")
+    reprint.add_argument('--to', dest='end_date', help="last day (inclusive), YYYY-MM-DD")
+    reprint.add_argument('--customer', dest='customers', action='append', help="customer name (repeatable)")
+    dayend = commands.add_parser('dayend', help="Print all bills of one day into a single PDF")
+    dayend.add_argument('--date', dest='day', help="day to print, YYYY-MM-DD (default: today)")
+    dayend.add_argument('--no-summary', dest='summary', action='store_false', help="skip the summary page")
+    statements = commands.add_parser('statements', help="Consolidated statements for every customer with bills in a period")
+    period = statements.add_mutually_exclusive_group()
+    period.add_argument('--week', metavar='DAY', help="the Monday-Sunday week containing DAY (default: this week)")
+    period.add_argument('--month', metavar='YYYY-MM', help="a calendar month")
+    statements.add_argument('--from', dest='start_date', help="first day, YYYY-MM-DD (instead of --week/--month)")
+    statements.add_argument('--to', dest='end_date', help="last day (inclusive), YYYY-MM-DD")
+    for command in (reprint, dayend, statements):
+        command.add_argument('--workers', type=int, help="render processes (default: SVS_PDF_WORKERS)")
+        command.set_defaults(handler=run_batch_command)
+
+
+def statement_period(args):
+    """(start, end, title) for the parsed 'statements' options."""
+    if args.month:
+        return month_window(f"{args.month}-01") + ("MONTHLY STATEMENT",)
+    if args.start_date or args.end_date:
+        return resolve_window(args.start_date, args.end_date) + ("CONSOLIDATED STATEMENT",)
+    return week_window(args.week) + ("WEEKLY STATEMENT",)
+
+
+def run_batch_command(args):
+    """Runs a parsed 'reprint', 'dayend' or 'statements' command; returns the exit code."""
+    engine = RenderEngine(args.workers) if args.workers is not None else get_render_engine()
+    try:
+        if args.command == 'statements':
+            start_date, end_date, title = statement_period(args)
+            result = run_statements(start_date, end_date, title, engine=engine)
+        elif args.command == 'dayend':
+            result = print_day_end(args.day, args.summary, engine=engine)
+        else:
+            result = reprint_bills(args.start_date, args.end_date, args.customers, engine=engine)
+    finally:
+        engine.shutdown()
+
+    if args.command == 'statements':
+        print(format_statement_result(result))
+        return 1 if result.failed else 0
+    if args.command == 'dayend':
+        if result.pdf_path is None:
+            print("No bills found for that day.")
+            return 1
+        print(f"{result.bill_count} bill(s), total {result.total_amount:.2f}, in {result.elapsed:.1f}s.\nPDF: {result.pdf_path}")
+        return 0
+    print(format_result(result))
+    return 1 if result.failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SVS billing batch jobs")
+    add_batch_commands(parser.add_subparsers(dest='command', required=True))
+    return run_batch_command(parser.parse_args(argv))
+
+
+if __name__ == '__main__':
+    import multiprocessing
+    multiprocessing.freeze_support()
+    raise SystemExit(main())
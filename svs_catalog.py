@@ -0,0 +1,103 @@
+"""In-memory product catalog.
+
+The billing screen used to run a SELECT for every product picked from the
+dropdown and re-read the whole product table on every screen switch.
+ProductCatalog keeps the products in memory: a name -> (id, rate) dict and
+the sorted display list. ``generation`` goes up on every reload, so screens
+can tell whether their copy of the list is stale.
+
+It is invalidated directly by save_product()/delete_product() (svs_core).
+Edits made by another process (a second counter, the HTTP service) are
+caught by ``refresh_if_changed()``: triggers bump PRODUCTS_VERSION_KEY in
+schema_meta on every products write, and comparing it costs one primary-key
+lookup.
+"""
+import threading
+from collections import namedtuple
+
+from svs_db import get_db, get_meta, PRODUCTS_VERSION_KEY
+
+# One immutable snapshot, swapped in whole so readers never see a half-built catalog
+_Snapshot = namedtuple('_Snapshot', 'db version by_name names')
+
+
+class ProductCatalog:
+    """Cached product master; lookups do no database I/O.
+
+    db defaults to the app-wide database (svs_db.get_db()); pointing the app
+    at another database (svs_db.configure) is noticed on the next access.
+    """
+
+    def __init__(self, db=None):
+        self._db = db
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def _current(self):
+        snapshot = self._snapshot
+        if snapshot is None or (self._db is None and snapshot.db is not get_db()):
+            snapshot = self.reload()
+        return snapshot
+
+    def reload(self):
+        """Reads the product table into a fresh snapshot."""
+        db = self._db or get_db()
+        with self._lock:
+            version = get_meta(PRODUCTS_VERSION_KEY, db=db)
+            rows = db.query("SELECT id, name, rate_per_kg FROM products ORDER BY name")
+            snapshot = _Snapshot(db, version, {name: (pid, rate) for pid, name, rate in rows},
+                                 [name for _pid, name, _rate in rows])
+            self._snapshot = snapshot
+            self.generation += 1
+        return snapshot
+
+    def invalidate(self):
+        """Drops the cache; the next lookup reloads it."""
+        self._snapshot = None
+
+    def refresh_if_changed(self):
+        """Reloads if any process changed the products; returns True if it did."""
+        snapshot = self._snapshot
+        db = self._db or get_db()
+        if snapshot is not None and snapshot.db is db and get_meta(PRODUCTS_VERSION_KEY, db=db) == snapshot.version:
+            return False
+        self.reload()
+        return True
+
+    # --- LOOKUPS ---
+
+    def names(self):
+        """Product names in display (name) order."""
+        return self._current().names
+
+    def products(self):
+        """(name, rate_per_kg) rows in name order, like get_products()."""
+        snapshot = self._current()
+        return [(name, snapshot.by_name[name][1]) for name in snapshot.names]
+
+    def by_name(self):
+        """The name -> (id, rate_per_kg) dict itself; treat it as read-only."""
+        return self._current().by_name
+
+    def get(self, name):
+        """(id, rate_per_kg) of a product, or None."""
+        return self._current().by_name.get(name)
+
+    def rate(self, name, default=0.0):
+        entry = self._current().by_name.get(name)
+        return entry[1] if entry else default
+
+    def __contains__(self, name):
+        return name in self._current().by_name
+
+    def __len__(self):
+        return len(self._current().names)
+
+
+_catalog = ProductCatalog()
+
+
+def get_catalog():
+    """Returns the app-wide ProductCatalog."""
+    return _catalog
@@ -0,0 +1,292 @@
+"""Headless command line for the SVS billing app.
+
+Uses the same database and PDF code as the Tk app (svs_core, svs_render),
+so nightly jobs can run under cron and the core can be load-tested without
+a display.
+
+    python svs_cli.py bill --customer "HEMA" --items bill.csv
+    python svs_cli.py consolidate --customer "HEMA" --from 2025-01-01 --to 2025-01-07
+    python svs_cli.py dashboard --json
+    python svs_cli.py export --out history.csv --from 2025-01-01
+    python svs_cli.py undo [--list] / compact --keep-days 30
+    python svs_cli.py maintain [--all | --task backup] / maintain --report
+    python svs_cli.py archive [--before 2025-01-01] / archive --list
+    python svs_cli.py serve --port 8765          (see svs_server.py)
+    python svs_cli.py reprint / dayend / statements ...   (see svs_batch.py)
+
+--db PATH (or the DB_NAME environment variable) selects the database.
+"""
+import argparse
+import csv
+import json
+import sys
+
+import svs_db
+from svs_archive import archive_bills, default_cutoff, format_archive_result, list_archives
+from svs_batch import add_batch_commands
+from svs_core import setup_database_and_folders, make_bill_item, save_bill, get_dashboard_summary
+from svs_consolidate import consolidate_customer, delete_consolidated
+from svs_render import RenderEngine, get_render_engine
+from svs_sales import iter_bills_with_items
+from svs_maintenance import SCHEDULED_TASK_NAMES, TASK_NAMES, MaintenanceScheduler, maintenance_report
+from svs_server import DEFAULT_HOST, DEFAULT_PORT, serve
+from svs_undo import UNDO_KEEP_DAYS, compact, undo_last, undo_stack
+
+
+# --- INPUT ---
+
+def read_items_file(path):
+    """Reads bill lines from a .json or .csv file.
+
+    JSON: a list of {"name", "quantity", "rate"?} objects or [name, quantity, rate?]
+    lists. CSV: a header row with name,quantity[,rate]. "-" reads JSON from stdin.
+    Returns (name, quantity, rate) tuples, rate None when not given.
+    """
+    if path == '-' or path.lower().endswith('.json'):
+        if path == '-':
+            rows = json.load(sys.stdin)
+        else:
+            with open(path, encoding='utf-8') as f:
+                rows = json.load(f)
+        lines = []
+        for row in rows:
+            if isinstance(row, dict):
+                lines.append((row['name'], row['quantity'], row.get('rate')))
+            else:
+                lines.append((row[0], row[1], row[2] if len(row) > 2 else None))
+        return lines
+
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return [(row['name'], row['quantity'], row.get('rate') or None) for row in csv.DictReader(f)]
+
+
+def _engine(args):
+    return RenderEngine(args.workers) if args.workers is not None else get_render_engine()
+
+
+# --- COMMANDS ---
+
+def cmd_bill(args):
+    items = [make_bill_item(name, quantity, rate) for name, quantity, rate in read_items_file(args.items)]
+    if not items:
+        raise ValueError("Bill is empty.")
+    total_amount = sum(item[3] for item in items)
+    bill_id, _customer_added = save_bill(args.customer, items, total_amount)
+    print(f"Bill (ID: {bill_id}) saved for {args.customer}: {len(items)} item(s), total {total_amount:.2f}")
+    if not args.no_pdf:
+        engine = _engine(args)
+        try:
+            print(f"PDF: {engine.render(bill_id, args.customer, items, total_amount)}")
+        finally:
+            engine.shutdown()
+    return 0
+
+
+def cmd_consolidate(args):
+    result = consolidate_customer(args.customer, args.start_date, args.end_date)
+    window = f"{result.start_date} to {result.end_date}"
+    if not result.bill_count:
+        print(f"No saved bills found for customer: {args.customer} ({window}).")
+        return 1
+    engine = _engine(args)
+    try:
+        path = engine.render(0, args.customer, result.items, result.total_amount,
+                             title="WEEKLY CONSOLIDATED INVOICE", date_range=result.date_range)
+    finally:
+        engine.shutdown()
+    print(f"{result.bill_count} bill(s) for {args.customer} ({result.date_range}), total {result.total_amount:.2f}\nPDF: {path}")
+    if args.delete:
+        print(f"{delete_consolidated(result)} original bill(s) deleted.")
+    return 0
+
+
+def cmd_undo(args):
+    if args.list:
+        for entry in undo_stack():
+            print(f"{entry.created_at}  {entry.action} ({entry.bill_count} bill(s))")
+        return 0
+    entry = undo_last()
+    if entry is None:
+        print("Nothing to undo.")
+        return 1
+    print(f"Undone: {entry.action} ({entry.bill_count} bill(s) restored).")
+    return 0
+
+
+def cmd_compact(args):
+    result = compact(args.keep_days, vacuum=not args.no_vacuum)
+    print(f"{result.purged_bills} deleted bill(s) purged, {result.dropped_entries} undo step(s) expired"
+          + (", database vacuumed." if result.vacuumed else "."))
+    return 0
+
+
+def cmd_maintain(args):
+    if args.report:
+        print(f"{'task':<10}{'runs':>6}{'failed':>8}{'avg ms':>10}{'max ms':>10}  last run")
+        for cost in maintenance_report(args.since):
+            print(f"{cost.task:<10}{cost.runs:>6}{cost.failures:>8}{cost.avg_ms:>10.1f}{cost.max_ms:>10.1f}  {cost.last_run}")
+        return 0
+    scheduler = MaintenanceScheduler()
+    names = SCHEDULED_TASK_NAMES if args.all else args.tasks or scheduler.due()
+    if not names:
+        print("Nothing due.")
+        return 0
+    runs = scheduler.run(names)
+    for run in runs:
+        print(f"{run.task:<10}{run.status:<8}{run.duration_ms:>10.1f} ms  {run.detail}")
+    return 1 if any(run.status != 'ok' for run in runs) else 0
+
+
+def cmd_archive(args):
+    if args.list:
+        for info in reversed(list_archives()):
+            print(f"{info.file_name}  {info.bill_count} bills  {info.total_amount:,.2f}  "
+                  f"{info.first_date} to {info.last_date}  (archived {info.archived_at})")
+        return 0
+    print(format_archive_result(archive_bills(args.before)))
+    return 0
+
+
+def cmd_dashboard(args):
+    summary = get_dashboard_summary()
+    if args.json:
+        print(json.dumps({name: {'total_amount': total, 'bill_count': count}
+                          for name, (total, count) in summary.items()}))
+    else:
+        for name, (total, count) in summary.items():
+            print(f"{name:<11} {total:>12,.2f}  ({count} bills)")
+    return 0
+
+
+EXPORT_FIELDS = ['bill_id', 'transaction_date', 'customer_name', 'total_amount']
+EXPORT_ITEM_FIELDS = ['product_name', 'quantity_kg', 'rate', 'total']
+
+
+def export_history(out, fmt='csv', start_date=None, end_date=None, customers=None, with_items=False):
+    """Streams bills to an open text file; returns the number of bills written.
+
+    CSV has one row per bill, or one per line item with with_items. JSON is
+    one object per line (JSON Lines), with an "items" list when asked.
+    """
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(EXPORT_FIELDS + (EXPORT_ITEM_FIELDS if with_items else []))
+    for bill in iter_bills_with_items(start_date, end_date, customers):
+        header = [bill.bill_id, bill.transaction_date, bill.customer_name, bill.total_amount]
+        if fmt == 'csv':
+            if with_items:
+                writer.writerows(header + list(item) for item in bill.items)
+            else:
+                writer.writerow(header)
+        else:
+            record = dict(zip(EXPORT_FIELDS, header))
+            if with_items:
+                record['items'] = [dict(zip(EXPORT_ITEM_FIELDS, item)) for item in bill.items]
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        count += 1
+    return count
+
+
+def cmd_export(args):
+    fmt = args.format or ('json' if args.out.lower().endswith(('.json', '.jsonl')) else 'csv')
+    if args.out == '-':
+        count = export_history(sys.stdout, fmt, args.start_date, args.end_date, args.customers, args.items)
+    else:
+        with open(args.out, 'w', newline='', encoding='utf-8') as out:
+            count = export_history(out, fmt, args.start_date, args.end_date, args.customers, args.items)
+    print(f"{count} bill(s) exported to {args.out}", file=sys.stderr)
+    return 0
+
+
+def cmd_serve(args):
+    serve(args.host, args.port, _engine(args))
+    return 0
+
+
+# --- ENTRY POINT ---
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="SVS billing app, without the GUI")
+    parser.add_argument('--db', help="database file (default: DB_NAME or svs_sales_db.db)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    bill = commands.add_parser('bill', help="Create a bill from a JSON/CSV line list")
+    bill.add_argument('--customer', required=True)
+    bill.add_argument('--items', required=True, help="items file (.json or .csv), '-' for JSON on stdin")
+    bill.add_argument('--no-pdf', action='store_true', help="save only, do not render the invoice")
+    bill.set_defaults(handler=cmd_bill)
+
+    consolidate = commands.add_parser('consolidate', help="Consolidated (weekly) invoice for a customer")
+    consolidate.add_argument('--customer', required=True)
+    consolidate.add_argument('--from', dest='start_date', help="first day, YYYY-MM-DD (default: this Monday)")
+    consolidate.add_argument('--to', dest='end_date', help="last day (inclusive), YYYY-MM-DD (default: a week from --from)")
+    consolidate.add_argument('--delete', action='store_true', help="delete the merged bills afterwards")
+    consolidate.set_defaults(handler=cmd_consolidate)
+
+    for command in (bill, consolidate):
+        command.add_argument('--workers', type=int, help="render processes (default: SVS_PDF_WORKERS)")
+
+    undo = commands.add_parser('undo', help="Restore the bills of the most recent delete")
+    undo.add_argument('--list', action='store_true', help="only list the undoable deletes, newest first")
+    undo.set_defaults(handler=cmd_undo)
+
+    compact_command = commands.add_parser('compact', help="Purge expired deleted bills and vacuum")
+    compact_command.add_argument('--keep-days', type=int, default=UNDO_KEEP_DAYS,
+                                 help=f"keep deletes undoable this long (default: {UNDO_KEEP_DAYS})")
+    compact_command.add_argument('--no-vacuum', action='store_true')
+    compact_command.set_defaults(handler=cmd_compact)
+
+    maintain = commands.add_parser('maintain', help="Run due maintenance: check, backup, archive, optimize, compact, vacuum")
+    maintain.add_argument('--task', dest='tasks', action='append', choices=TASK_NAMES, help="run this task now (repeatable)")
+    maintain.add_argument('--all', action='store_true', help="run every scheduled task now")
+    maintain.add_argument('--report', action='store_true', help="show the recorded time per task instead")
+    maintain.add_argument('--since', help="report runs from this day on, YYYY-MM-DD")
+    maintain.set_defaults(handler=cmd_maintain)
+
+    archive = commands.add_parser('archive', help="Move old years of bills into svs_sales_YYYY.db files")
+    archive.add_argument('--before', help=f"archive bills dated before this day, YYYY-MM-DD (default: {default_cutoff()})")
+    archive.add_argument('--list', action='store_true', help="only list the archive files")
+    archive.set_defaults(handler=cmd_archive)
+
+    dashboard = commands.add_parser('dashboard', help="Today / This Week / This Month totals")
+    dashboard.add_argument('--json', action='store_true')
+    dashboard.set_defaults(handler=cmd_dashboard)
+
+    export = commands.add_parser('export', help="Export sales history as CSV or JSON Lines")
+    export.add_argument('--out', required=True, help="output file, '-' for stdout")
+    export.add_argument('--format', choices=['csv', 'json'], help="default: from the file extension")
+    export.add_argument('--from', dest='start_date', help="first day, YYYY-MM-DD")
+    export.add_argument('--to', dest='end_date', help="last day (inclusive), YYYY-MM-DD")
+    export.add_argument('--customer', dest='customers', action='append', help="customer name (repeatable)")
+    export.add_argument('--items', action='store_true', help="include line items")
+    export.set_defaults(handler=cmd_export)
+
+    serve = commands.add_parser('serve', help="Run the local HTTP/JSON billing API for other counters")
+    serve.add_argument('--host', default=DEFAULT_HOST, help="address to listen on (default: this PC only)")
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve.add_argument('--workers', type=int, help="render processes (default: SVS_PDF_WORKERS)")
+    serve.set_defaults(handler=cmd_serve)
+
+    add_batch_commands(commands)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.db:
+        svs_db.configure(args.db)
+    setup_database_and_folders()
+    try:
+        return args.handler(args)
+    except (ValueError, KeyError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        svs_db.get_db().close()
+
+
+if __name__ == '__main__':
+    import multiprocessing
+    multiprocessing.freeze_support()
+    raise SystemExit(main())
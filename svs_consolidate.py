@@ -0,0 +1,245 @@
+"""Weekly (date-windowed) consolidation of a customer's bills.
+
+The weekly bill used to fetch every bill the customer ever had, decode each
+items_json and parse the bill date twice per line item. consolidate_customer()
+instead covers an explicit window, the current week (Monday to Sunday) by
+default, and streams the bills and their lines from one cursor over
+idx_live_bills_customer_date. Lines are summed per (product, rate) as
+they arrive, so memory grows with the number of distinct products (plus one
+bill id per bill, for delete_consolidated()), not with the bills' lines.
+Each day's label is parsed once.
+
+consolidate_customers() does the same for many customers in one pass over
+sales_history, grouped by customer, for the all-customers statement run
+(svs_batch.run_statements). Windows reaching into archived years also read
+those years' archive files (svs_archive).
+"""
+import heapq
+import json
+from collections import namedtuple
+from datetime import date, timedelta
+from itertools import chain
+
+from svs_archive import archive_schemas, qualify
+from svs_db import get_db
+from svs_sales import parse_items_json, stream_rows
+from svs_undo import delete_bills
+
+# One customer's bills in [start, end + 1 day), oldest first; bills that are
+# not migrated yet have no sales_items rows and come back once with NULL lines
+CONSOLIDATE_SQL = '''
+    SELECT h.customer_name, h.bill_id, h.transaction_date, h.total_amount, h.items_json,
+           i.product_name, i.quantity_kg, i.rate, i.total
+    FROM sales_history h
+    LEFT JOIN sales_items i ON i.bill_id = h.bill_id
+    WHERE h.customer_name = ? AND h.transaction_date >= ? AND h.transaction_date < ?
+      AND h.deleted_at IS NULL
+    ORDER BY h.transaction_date, h.bill_id
+'''
+
+# Statement run: the same for many customers (a JSON array) in one pass,
+# grouped by customer. The IN list is sorted, so the index seeks come back
+# in customer order without a sort.
+CONSOLIDATE_MANY_SQL = '''
+    SELECT h.customer_name, h.bill_id, h.transaction_date, h.total_amount, h.items_json,
+           i.product_name, i.quantity_kg, i.rate, i.total
+    FROM sales_history h
+    LEFT JOIN sales_items i ON i.bill_id = h.bill_id
+    WHERE h.customer_name IN (SELECT value FROM json_each(?))
+      AND h.transaction_date >= ? AND h.transaction_date < ? AND h.deleted_at IS NULL
+    ORDER BY h.customer_name, h.transaction_date, h.bill_id
+'''
+
+# Customers with bills in a window, with their bill count and total, from
+# one rollup row per day and customer
+ACTIVE_CUSTOMERS_SQL = '''
+    SELECT customer_name, SUM(bill_count), TOTAL(total_amount)
+    FROM daily_sales_rollup
+    WHERE sale_date >= ? AND sale_date <= ?
+    GROUP BY customer_name
+    HAVING SUM(bill_count) > 0
+    ORDER BY customer_name
+'''
+
+# items are invoice line dicts (name, quantity, rate, total, dates) for the
+# PDF; start_date/end_date are the window ('YYYY-MM-DD', inclusive) and
+# date_range the first to last bill date actually found; bill_ids are the
+# bills summed, so exactly those are deleted once the PDF is made
+Consolidation = namedtuple(
+    'Consolidation',
+    'customer start_date end_date items total_amount bill_count bill_ids date_range',
+)
+
+
+def week_window(day=None):
+    """(monday, sunday) of the week containing day (default today), as 'YYYY-MM-DD'."""
+    day = date.fromisoformat(str(day)[:10]) if day else date.today()
+    monday = day - timedelta(days=day.weekday())
+    return monday.isoformat(), (monday + timedelta(days=6)).isoformat()
+
+
+def month_window(day=None):
+    """(first, last) day of the month containing day (default today), as 'YYYY-MM-DD'."""
+    day = date.fromisoformat(str(day)[:10]) if day else date.today()
+    first = day.replace(day=1)
+    last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return first.isoformat(), last.isoformat()
+
+
+def resolve_window(start_date=None, end_date=None):
+    """Fills in a missing end of the window: one week from start, or up to end."""
+    if not start_date and not end_date:
+        return week_window()
+    if not end_date:
+        end_date = date.fromisoformat(str(start_date)[:10]) + timedelta(days=6)
+    elif not start_date:
+        start_date = date.fromisoformat(str(end_date)[:10]) - timedelta(days=6)
+    return str(start_date)[:10], str(end_date)[:10]
+
+
+class Consolidator:
+    """Running per-(product, rate) totals, fed one bill at a time."""
+
+    def __init__(self):
+        self.lines = {}
+        self.total_amount = 0.0
+        self.bill_count = 0
+        self.bill_ids = []
+        self.first_day = self.last_day = None
+        self._labels = {}  # 'YYYY-MM-DD' -> '07 Jan'
+
+    def start_bill(self, bill_id, transaction_date, total_amount):
+        """Counts a bill's header; returns the date label for its lines."""
+        day = transaction_date[:10]
+        label = self._labels.get(day)
+        if label is None:
+            label = self._labels[day] = date.fromisoformat(day).strftime('%d %b')
+            if self.first_day is None or day < self.first_day:
+                self.first_day = day
+            if self.last_day is None or day > self.last_day:
+                self.last_day = day
+        self.total_amount += total_amount
+        self.bill_count += 1
+        self.bill_ids.append(bill_id)
+        return label
+
+    def add_line(self, name, quantity, rate, total, label):
+        # Same product at the same price goes on one invoice line
+        line = self.lines.get((name, rate))
+        if line is None:
+            line = self.lines[(name, rate)] = {'name': name, 'quantity': 0.0, 'rate': rate, 'total': 0.0, 'dates': []}
+        line['quantity'] += quantity
+        line['total'] += total
+        dates = line['dates']
+        if not dates or dates[-1] != label:
+            dates.append(label)
+
+    def add_bill(self, bill_id, transaction_date, total_amount, items):
+        label = self.start_bill(bill_id, transaction_date, total_amount)
+        for name, quantity, rate, total in items:
+            self.add_line(name, quantity, rate, total, label)
+
+    def date_range(self):
+        if self.first_day is None:
+            return ""
+        first, last = (date.fromisoformat(day).strftime('%d-%b-%Y') for day in (self.first_day, self.last_day))
+        return f"{first} to {last}"
+
+
+def _day_after(day):
+    return (date.fromisoformat(str(day)[:10]) + timedelta(days=1)).isoformat()
+
+
+def _consolidations(rows, start_date, end_date):
+    """Turns (customer, bill, line) rows grouped by customer into Consolidations."""
+    customer = consolidator = None
+    current_id = label = None
+    for customer_name, bill_id, transaction_date, total_amount, items_json, name, quantity, rate, total in rows:
+        if customer_name != customer:
+            if consolidator is not None:
+                yield _result(customer, start_date, end_date, consolidator)
+            customer, consolidator = customer_name, Consolidator()
+            add_line = consolidator.add_line
+        if bill_id != current_id:
+            current_id = bill_id
+            label = consolidator.start_bill(bill_id, transaction_date, total_amount)
+            if name is None:
+                for item in parse_items_json(items_json):  # not migrated yet
+                    add_line(*item, label)
+                continue
+        add_line(name, quantity, rate, total, label)
+    if consolidator is not None:
+        yield _result(customer, start_date, end_date, consolidator)
+
+
+def _result(customer, start_date, end_date, consolidator):
+    return Consolidation(customer, start_date, end_date, list(consolidator.lines.values()),
+                         consolidator.total_amount, consolidator.bill_count,
+                         consolidator.bill_ids, consolidator.date_range())
+
+
+def consolidate_customer(customer, start_date=None, end_date=None, db=None):
+    """Consolidates a customer's bills in a window (default: this week).
+
+    start_date/end_date are 'YYYY-MM-DD' and inclusive; see resolve_window()
+    for a window given by one end only. Returns a Consolidation
+    (bill_count 0 when the customer has no bills in the window).
+    """
+    start_date, end_date = resolve_window(start_date, end_date)
+    params = (customer, start_date, _day_after(end_date))
+    # Archived years first, so the bills still come oldest first
+    rows = chain.from_iterable(stream_rows(qualify(CONSOLIDATE_SQL, schema), params, db)
+                               for schema in _schemas(start_date, end_date, db))
+    for result in _consolidations(rows, start_date, end_date):
+        return result
+    return Consolidation(customer, start_date, end_date, [], 0.0, 0, [], "")
+
+
+def _schemas(start_date, end_date, db=None):
+    """The archives overlapping the window (oldest first), then the hot database."""
+    return archive_schemas(start_date, end_date, db) + ['main']
+
+
+def active_customers(start_date, end_date, db=None):
+    """(customer, bill_count, total_amount) for every customer with bills in the window."""
+    db = db or get_db()
+    params = (str(start_date)[:10], str(end_date)[:10])
+    schemas = _schemas(*params, db)
+    if len(schemas) == 1:
+        return db.query(ACTIVE_CUSTOMERS_SQL, params)
+    totals = {}
+    for schema in schemas:
+        for customer, bill_count, total_amount in db.query(qualify(ACTIVE_CUSTOMERS_SQL, schema), params):
+            count, amount = totals.get(customer, (0, 0.0))
+            totals[customer] = (count + bill_count, amount + total_amount)
+    return [(customer, *totals[customer]) for customer in sorted(totals)]
+
+
+def consolidate_customers(customers, start_date=None, end_date=None, db=None):
+    """Yields a Consolidation per customer with bills in the window, in name order.
+
+    One streamed query covers all the customers; only the customer being
+    summed is held in memory.
+    """
+    start_date, end_date = resolve_window(start_date, end_date)
+    customers = sorted(set(customers))
+    if not customers:
+        return
+    params = (json.dumps(customers), start_date, _day_after(end_date))
+    # Each stream is in customer order; merged, a customer's archived bills come first
+    rows = heapq.merge(*(stream_rows(qualify(CONSOLIDATE_MANY_SQL, schema), params, db)
+                         for schema in _schemas(start_date, end_date, db)), key=lambda row: row[0])
+    yield from _consolidations(rows, start_date, end_date)
+
+
+def delete_consolidated(consolidation, db=None):
+    """Deletes the bills merged into a Consolidation as one undo step; returns how many.
+
+    Only the bills it summed are deleted: bills saved or edited since are
+    kept. Archived bills are read-only and stay where they are.
+    """
+    if not consolidation.bill_ids:
+        return 0
+    entry = delete_bills(consolidation.bill_ids,
+                         f"Weekly bill {consolidation.customer} {consolidation.start_date} to {consolidation.end_date}", db=db)
+    return entry.bill_count if entry else 0
@@ -0,0 +1,317 @@
+"""GUI-free core of the SVS billing app.
+
+Everything the screens do to the shop's data lives here: database setup and
+seeding, the product and customer masters, saving/deleting bills,
+consolidation and dashboard totals. Scripts, the batch jobs and the PDF
+workers can import it without loading Tk, and PDF engines (ReportLab,
+WeasyPrint) are only imported when a PDF is actually rendered.
+"""
+import os
+from datetime import datetime, timedelta
+
+from svs_db import (get_db, create_schema, read_meta, set_meta,
+                    SCHEMA_VERSION, SCHEMA_VERSION_KEY)
+from svs_archive import find_archived_bill
+from svs_catalog import get_catalog
+from svs_consolidate import Consolidator
+# Soft delete and the undo stack (delete_bills, undo_last, undo_stack are re-exported)
+from svs_undo import delete_bills, soft_delete, undo_last, undo_stack  # noqa: F401 (re-exported)
+from svs_sales import (load_bill_items, load_archived_bill_items, save_bill_items,  # noqa: F401 (re-exported)
+                       get_sales_summary, get_customer_bills)
+# Re-exported so the screens and scripts have a single import point
+from svs_fonts import BASE_PATH  # noqa: F401 (re-exported)
+from svs_pdf import (COMPANY_NAME, COMPANY_ADDRESS, COMPANY_PHONE,  # noqa: F401 (re-exported)
+                     make_pdf_filename, format_quantity, generate_pdf_invoice)
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+# --- SEED DATA ---
+# Starter products and customers, inserted once per database (see SEED_VERSION).
+INITIAL_PRODUCTS = [
+    ('Tomato (தக்காளி)', 25.00), ('Onion (வெங்காயம்)', 35.00), ('Potato (உருளைக்கிழங்கு)', 20.00),
+    ('Carrot (கேரட்)', 40.00), ('Brinjal (கத்திரிக்காய்)', 30.00), ('Ladies Finger (வெண்டைக்காய்)', 35.00),
+    ('Cabbage (முட்டைக்கோசு)', 28.00), ('Cauliflower (பூக்கோசு)', 32.00), ('Beans (பீன்ஸ்)', 50.00),
+    ('Drumstick (முருங்கைக்காய்)', 45.00), ('Cucumber (வெள்ளரிக்காய்)', 25.00), ('Snake Gourd (புடலங்காய்)', 30.00),
+    ('Ridge Gourd (பீர்க்கங்காய்)', 35.00), ('Bottle Gourd (சுரைக்காய்)', 28.00), ('Bitter Gourd (பாகற்காய்)', 40.00),
+    ('Pumpkin (பூசணிக்காய்)', 25.00), ('Ash Gourd (பூசணிக்காய் வெள்ளை)', 20.00), ('Chow Chow (சௌ சௌ)', 25.00),
+    ('Cluster Beans (கொத்தவரங்காய்)', 45.00), ('Broad Beans (அவரைக்காய்)', 45.00), ('Green Peas (பட்டாணி)', 60.00),
+    ('Coriander Leaves (கொத்தமல்லி)', 80.00), ('Mint Leaves (புதினா)', 50.00), ('Spinach (பசலைக் கீரை)', 20.00),
+    ('Curry Leaves (கருவேப்பிலை)', 100.00), ('Small Onion (சின்ன வெங்காயம்)', 45.00), ('Garlic (பூண்டு)', 130.00),
+    ('Ginger (இஞ்சி)', 120.00), ('Green Chilli (பச்சை மிளகாய்)', 70.00), ('Red Chilli (சிவப்பு மிளகாய்)', 150.00),
+    ('Beetroot (பீட்ரூட்)', 30.00), ('Radish (முள்ளங்கி)', 25.00), ('Sweet Potato (சக்கரைவள்ளிக்கிழங்கு)', 35.00),
+    ('Turnip (நூல்கோசு)', 30.00), ('Yam (சேணைக்கிழங்கு)', 40.00), ('Raw Banana (வாழைக்காய்)', 35.00),
+    ('Plantain Stem (வாழைத்தண்டு)', 30.00), ('Plantain Flower (வாழைப்பூ)', 35.00), ('Colocasia (சேப்பங்கிழங்கு)', 45.00),
+    ('Turmeric Root (மஞ்சள் வேர்)', 80.00), ('Coconut (தேங்காய்)', 30.00), ('Capsicum (குடைமிளகாய்)', 60.00),
+    ('Mushroom (காளான்)', 120.00), ('Spring Onion (வசந்த வெங்காயம்)', 40.00), ('Sweet Corn (இனிப்பு சோளம்)', 45.00),
+    ('Ivy Gourd (கோவைக்காய்)', 40.00), ('Avarai Kai (அவரைக்காய்)', 40.00), ('Raw Mango (மாவடைக்காய்)', 50.00),
+    ('Tapioca (மரவள்ளிக்கிழங்கு)', 30.00), ('Banana (வாழைப்பழம்)', 45.00), ('Apple (ஆப்பிள்)', 180.00),
+    ('Orange (ஆரஞ்சு)', 90.00), ('Mango (மாம்பழம்)', 70.00), ('Papaya (பப்பாளி)', 35.00),
+    ('Guava (கொய்யாப்பழம்)', 50.00), ('Pineapple (அன்னாசிப்பழம்)', 60.00), ('Watermelon (தர்பூசணிப்பழம்)', 25.00),
+    ('Muskmelon (கீரிப்பழம்)', 40.00), ('Grapes (திராட்சைப்பழம்)', 120.00), ('Pomegranate (மாதுளைப்பழம்)', 160.00),
+    ('Sweet Lime (சாத்துக்குடி)', 70.00), ('Lemon (எலுமிச்சை)', 80.00), ('Sapota (சப்போட்டா)', 60.00),
+    ('Jackfruit (பலாப்பழம்)', 45.00), ('Custard Apple (சீதாப்பழம்)', 90.00), ('Dates (பேரிச்சம்பழம்)', 180.00),
+    ('Fig (அத்திப்பழம்)', 150.00), ('Strawberry (ஸ்ட்ராபெர்ரி)', 250.00), ('Black Grapes (கருப்பு திராட்சை)', 130.00),
+    ('Tender Coconut (இளநீர்)', 40.00), ('Wood Apple (விலாம்பழம்)', 35.00), ('Amla (நெல்லிக்காய்)', 60.00),
+    ('Rose Apple (ஜம்புலம்)', 70.00), ('Plum (அலுபாலாபழம்)', 120.00), ('Cherry (செர்ரி)', 300.00),
+    ('Blueberry (நீலப்பழம்)', 400.00), ('Litchi (லிச்சி)', 150.00), ('Dragon Fruit (பித்தா பழம்)', 180.00),
+    ('Pear (பேரிக்காய்)', 120.00), ('Kiwi (கிவி)', 200.00), ('Avocado (வெண்ணெய்ப்பழம்)', 160.00),
+    ('Blackberry (கரும்பழம்)', 180.00)
+]
+INITIAL_CUSTOMERS = [('RAMARAJA BHAVAN',), ('IYARKAI ',), ('LITTLE ARABIA',), ('HEMA',)]
+
+# Bump when the seed lists above change; the new rows are then added on next launch.
+SEED_VERSION = 1
+SEED_VERSION_KEY = 'seed_version'
+
+
+# Set up the necessary folders and database tables
+def setup_database_and_folders():
+    """Initializes the database and creates required tables (Products, Sales, Sale Items, Customers).
+
+    Schema creation and seeding are versioned in schema_meta, so once a
+    database is current a launch costs a single metadata read.
+    """
+    os.makedirs('Invoices', exist_ok=True)  # Create folder for PDF invoices
+    db = get_db()
+    versions = read_meta((SCHEMA_VERSION_KEY, SEED_VERSION_KEY), db=db)
+    schema_current = int(versions.get(SCHEMA_VERSION_KEY, 0)) >= SCHEMA_VERSION
+    seed_current = int(versions.get(SEED_VERSION_KEY, 0)) >= SEED_VERSION
+    if schema_current and seed_current:
+        return
+
+    # Schema and seed statements run in one transaction on the shared connection
+    with db.transaction() as conn:
+        if not schema_current:
+            # Tables for products, customers, bills and bill line items (see svs_db.py)
+            create_schema(conn)
+            set_meta(conn, SCHEMA_VERSION_KEY, SCHEMA_VERSION)
+
+        if not seed_current:
+            # INSERT OR IGNORE leaves existing products/customers (and their edited rates) alone
+            conn.executemany("INSERT OR IGNORE INTO products (name, rate_per_kg) VALUES (?, ?)", INITIAL_PRODUCTS)
+            conn.executemany("INSERT OR IGNORE INTO customers (name) VALUES (?)", INITIAL_CUSTOMERS)
+            set_meta(conn, SEED_VERSION_KEY, SEED_VERSION)
+    get_catalog().invalidate()
+
+
+# --- PRODUCTS & CUSTOMERS ---
+
+def get_products():
+    """Fetches all product data from the database."""
+    return get_db().query("SELECT name, rate_per_kg FROM products ORDER BY name")
+
+
+def get_product_rate(name):
+    """Rate per kg of one product (0.0 if unknown), from the in-memory catalog."""
+    return get_catalog().rate(name)
+
+
+def save_product(name, rate):
+    """Adds a product or updates its rate."""
+    # Upsert on the UNIQUE name so an existing product keeps its id
+    # (sales_items.product_id references it; INSERT OR REPLACE would re-number it)
+    get_db().execute('''
+        INSERT INTO products (name, rate_per_kg)
+        VALUES (?, ?)
+        ON CONFLICT(name) DO UPDATE SET rate_per_kg = excluded.rate_per_kg
+    ''', (name, rate))
+    get_catalog().invalidate()
+
+
+def delete_product(name):
+    get_db().execute("DELETE FROM products WHERE name = ?", (name,))
+    get_catalog().invalidate()
+
+
+def get_customers():
+    """Fetches all customer names from the database."""
+    return [c[0] for c in get_db().query("SELECT name FROM customers ORDER BY name")]
+
+
+def save_customer(name):
+    # Use INSERT OR REPLACE to update if the name already exists
+    get_db().execute("INSERT OR REPLACE INTO customers (name) VALUES (?)", (name,))
+
+
+def delete_customer(name):
+    get_db().execute("DELETE FROM customers WHERE name = ?", (name,))
+
+
+# --- BILLS ---
+
+def make_bill_item(name, quantity, rate=None):
+    """Builds a (name, quantity_kg, rate_per_kg, total) bill line.
+
+    rate defaults to the product's rate in the master list; ValueError for
+    bad quantities or an unknown product without a rate.
+    """
+    quantity = float(quantity)
+    if quantity <= 0:
+        raise ValueError(f"Quantity must be greater than zero ({name}).")
+    if rate in (None, ''):
+        product = get_catalog().get(name)
+        if product is None:
+            raise ValueError(f"Unknown product '{name}'; give its rate.")
+        rate = product[1]
+    rate = float(rate)
+    return (name, quantity, rate, quantity * rate)
+
+
+class BillLines:
+    """The lines of the bill being entered, their total and the rows showing them.
+
+    ``view`` draws the rows: make_bill_row() builds one, fill_bill_row(row,
+    item) writes a line into it, show_bill_row(row) adds it at the bottom of
+    the list and hide_bill_row(row) takes it out. rows[i] always shows
+    items[i]; hidden rows are pooled and reused before new ones are built.
+    """
+
+    def __init__(self, view):
+        self.view = view
+        self.items = []
+        self.total = 0.0
+        self.rows = []
+        self._pool = []
+
+    def add(self, item):
+        """Appends a (name, quantity, rate, total) line and shows it in one more row."""
+        self.items.append(item)
+        self.total += item[3]
+        self._show(item)
+
+    def remove(self, index):
+        """Removes the line at index and hides its row; returns the line."""
+        item = self.items.pop(index)
+        self.total -= item[3]
+        self._hide(index)
+        return item
+
+    def index_of(self, row):
+        """Where a shown row is now; rows below a removed one move up."""
+        return self.rows.index(row)
+
+    def load(self, items=()):
+        """Replaces every line (a bill loaded for editing, or none to clear the bill)."""
+        self.items = [tuple(item) for item in items]
+        self.total = sum(item[3] for item in self.items)
+        self.refresh()
+
+    def refresh(self):
+        """Re-fills the shown rows from items, showing or hiding rows as needed."""
+        for row, item in zip(self.rows, self.items):
+            self.view.fill_bill_row(row, item)
+        for item in self.items[len(self.rows):]:
+            self._show(item)
+        while len(self.rows) > len(self.items):
+            self._hide(len(self.rows) - 1)
+
+    def _show(self, item):
+        row = self._pool.pop() if self._pool else self.view.make_bill_row()
+        self.view.fill_bill_row(row, item)
+        self.view.show_bill_row(row)
+        self.rows.append(row)
+
+    def _hide(self, index):
+        row = self.rows.pop(index)
+        self.view.hide_bill_row(row)
+        self._pool.append(row)
+
+
+def save_bill(customer, items, total_amount, bill_id=None):
+    """Saves a new bill (or replaces bill_id) with its line items.
+
+    The customer is added to the master list if new; everything commits in
+    one transaction. Returns (bill_id, customer_added).
+    """
+    current_datetime = datetime.now().strftime(DATE_FORMAT)
+    with get_db().transaction() as conn:
+        cursor = conn.execute("INSERT OR IGNORE INTO customers (name) VALUES (?)", (customer,))
+        customer_added = cursor.rowcount > 0
+
+        if bill_id:
+            conn.execute('''
+                UPDATE sales_history SET transaction_date=?, customer_name=?, total_amount=?, items_json=''
+                WHERE bill_id=?
+            ''', (current_datetime, customer, total_amount, bill_id))
+        else:
+            cursor = conn.execute('''
+                INSERT INTO sales_history (transaction_date, customer_name, total_amount, items_json)
+                VALUES (?, ?, ?, '')
+            ''', (current_datetime, customer, total_amount))
+            bill_id = cursor.lastrowid
+
+        save_bill_items(conn, bill_id, items)
+    return bill_id, customer_added
+
+
+def get_bill(bill_id):
+    """One live or archived bill as (bill_id, date, customer, total, items), or None."""
+    db = get_db()
+    row = db.query_one(
+        "SELECT bill_id, transaction_date, customer_name, total_amount, items_json FROM sales_history"
+        " WHERE bill_id = ? AND deleted_at IS NULL",
+        (bill_id,),
+    )
+    if row is not None:
+        return row[:4] + (load_bill_items(bill_id, row[4]),)
+    schema = find_archived_bill(bill_id, db)
+    if schema is None:
+        return None
+    row = db.query_one(
+        f"SELECT bill_id, transaction_date, customer_name, total_amount FROM {schema}.sales_history WHERE bill_id = ?",
+        (bill_id,),
+    )
+    return row + (load_archived_bill_items(bill_id, schema, db),)
+
+
+def get_sales_history():
+    """All live bills, newest first, as (bill_id, date, customer, total, items_json)."""
+    return get_db().query(
+        "SELECT bill_id, transaction_date, customer_name, total_amount, items_json FROM sales_history"
+        " WHERE deleted_at IS NULL ORDER BY bill_id DESC"
+    )
+
+
+# Deletes only tombstone bills (see svs_undo); undo_last() brings them back
+def delete_bill(bill_id):
+    """Deletes one bill; returns its UndoEntry (None if it was already gone)."""
+    return delete_bills([bill_id])
+
+
+def clear_history():
+    """Deletes every bill as one undoable step; returns the UndoEntry or None."""
+    return soft_delete("1", (), "Clear all history")
+
+
+# --- CONSOLIDATION & REPORTS ---
+
+def consolidate_bills(sales):
+    """Merges bills into one set of invoice lines.
+
+    sales are (bill_id, transaction_date, total_amount, items_json) rows,
+    oldest first (see get_customer_bills). Lines with the same product and
+    rate are summed. Returns (items, grand_total, date_range). For a
+    customer's week, svs_consolidate.consolidate_customer() streams instead.
+    """
+    consolidator = Consolidator()
+    for bill_id, date, total_amount, items_json in sales:
+        consolidator.add_bill(bill_id, date, total_amount, load_bill_items(bill_id, items_json))
+    return list(consolidator.lines.values()), consolidator.total_amount, consolidator.date_range()
+
+
+def get_dashboard_summary(now=None):
+    """Today / This Week / This Month totals (safe to call from a worker thread)."""
+    now = now or datetime.now()
+
+    # Today's data
+    today_start = now.strftime('%Y-%m-%d')
+
+    # Week's data (Start of week is Monday)
+    week_start = (now - timedelta(days=now.weekday())).strftime('%Y-%m-%d')
+
+    # Month's data
+    month_start = now.replace(day=1).strftime('%Y-%m-%d')
+
+    # One parameterized query over the small daily_sales_rollup table
+    return get_sales_summary(today_start, week_start, month_start)
@@ -0,0 +1,437 @@
+"""Shared SQLite connection layer for the SVS billing app.
+
+Screens used to open and close their own ``sqlite3.connect(DB_NAME)`` for every
+query. This module keeps long-lived connections instead (one per thread, so
+background workers never share a cursor with the Tk main loop), opens them
+with WAL journaling and tuned pragmas, and offers a small transaction API so
+multi-statement writes such as finalizing a bill commit atomically.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_NAME = os.getenv('DB_NAME', 'svs_sales_db.db')
+
+# --- CONNECTION TUNING ---
+# Page cache per connection in KiB and the memory-mapped I/O window in bytes.
+# Both can be overridden from the environment on low-memory shop PCs.
+CACHE_SIZE_KB = int(os.getenv('SVS_DB_CACHE_KB', '16384'))
+MMAP_SIZE = int(os.getenv('SVS_DB_MMAP_SIZE', str(128 * 1024 * 1024)))
+# Compiled statements kept per connection, so repeated queries skip re-parsing.
+STATEMENT_CACHE_SIZE = 256
+# How long a writer waits for another connection's lock before giving up.
+BUSY_TIMEOUT_SECONDS = 5.0
+
+
+class Database:
+    """Long-lived connection manager for one SQLite file.
+
+    Each thread lazily gets its own connection, opened once and reused for the
+    lifetime of the app. ``transaction()`` wraps several statements in a single
+    ``BEGIN IMMEDIATE`` / ``COMMIT`` and nests safely.
+    """
+
+    def __init__(self, path=None, cache_size_kb=CACHE_SIZE_KB, mmap_size=MMAP_SIZE):
+        self.path = path or DB_NAME
+        self.cache_size_kb = int(cache_size_kb)
+        self.mmap_size = int(mmap_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        # Bumped by close() so threads notice their cached connection is gone.
+        self._generation = 0
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT_SECONDS,
+            isolation_level=None,  # autocommit; transactions are explicit below
+            cached_statements=STATEMENT_CACHE_SIZE,
+            check_same_thread=False,
+        )
+        # Lets maintenance hand free pages back a few at a time (PRAGMA
+        # incremental_vacuum). Takes effect on new files; older ones switch over
+        # at their next VACUUM (see svs_maintenance).
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{self.cache_size_kb}")
+        conn.execute(f"PRAGMA mmap_size={self.mmap_size}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def connection(self):
+        """Returns this thread's connection, opening it on first use."""
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            conn = self._open()
+            with self._lock:
+                self._connections.append(conn)
+            local.conn = conn
+            local.depth = 0
+            local.generation = self._generation
+        return local.conn
+
+    # --- QUERY HELPERS ---
+
+    def execute(self, sql, params=()):
+        """Executes one statement and returns the cursor."""
+        return self.connection().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.connection().executemany(sql, seq_of_params)
+
+    def query(self, sql, params=()):
+        """Runs a SELECT and returns all rows."""
+        return self.connection().execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=()):
+        """Runs a SELECT and returns the first row (or None)."""
+        return self.connection().execute(sql, params).fetchone()
+
+    @contextmanager
+    def transaction(self):
+        """Groups statements into one atomic write.
+
+        Yields the thread's connection. The transaction commits when the block
+        exits normally and rolls back on any exception. Nested blocks join the
+        outermost transaction.
+        """
+        conn = self.connection()
+        local = self._local
+        if local.depth:
+            local.depth += 1
+            try:
+                yield conn
+            finally:
+                local.depth -= 1
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            local.depth = 0
+
+    def close(self):
+        """Closes every connection opened by this manager."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+
+# --- SCHEMA ---
+
+# Tables are created idempotently on every launch by create_schema().
+SCHEMA_STATEMENTS = [
+    # Table for customizable product names and base prices
+    '''
+    CREATE TABLE IF NOT EXISTS products (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        rate_per_kg REAL NOT NULL
+    )
+    ''',
+    # Customer Master
+    '''
+    CREATE TABLE IF NOT EXISTS customers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL
+    )
+    ''',
+    # Bill headers. items_json is kept only so databases and backups written
+    # by older versions still load; line items now live in sales_items.
+    # Deleted bills stay as tombstones (deleted_at set) until compaction, so
+    # deletes can be undone; deleted_by is the undo_log entry that hid them.
+    '''
+    CREATE TABLE IF NOT EXISTS sales_history (
+        bill_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        transaction_date TEXT NOT NULL,
+        customer_name TEXT NOT NULL,
+        total_amount REAL NOT NULL,
+        items_json TEXT NOT NULL, -- Legacy JSON line items ('' once migrated)
+        deleted_at TEXT, -- NULL while the bill is live
+        deleted_by INTEGER -- undo_log.undo_id
+    )
+    ''',
+    # One row per bill line
+    '''
+    CREATE TABLE IF NOT EXISTS sales_items (
+        bill_id INTEGER NOT NULL REFERENCES sales_history(bill_id) ON DELETE CASCADE,
+        line_no INTEGER NOT NULL,
+        product_id INTEGER REFERENCES products(id) ON DELETE SET NULL,
+        product_name TEXT NOT NULL,
+        quantity_kg REAL NOT NULL,
+        rate REAL NOT NULL,
+        total REAL NOT NULL,
+        PRIMARY KEY (bill_id, line_no)
+    )
+    ''',
+    # Date-range scans (dashboard) and per-customer history (weekly bill).
+    # total_amount rides along so dashboard totals are answered from the index.
+    # Partial indexes: they hold live bills only, so queries that say
+    # "deleted_at IS NULL" never step over tombstones. deleted_at (always NULL
+    # in them) is carried in the date index so SQLite still sees it as covering.
+    "DROP INDEX IF EXISTS idx_sales_history_date",
+    "DROP INDEX IF EXISTS idx_sales_history_customer_date",
+    "DROP INDEX IF EXISTS idx_sales_history_customer",
+    "CREATE INDEX IF NOT EXISTS idx_live_bills_date ON sales_history(transaction_date, total_amount, deleted_at) WHERE deleted_at IS NULL",
+    "CREATE INDEX IF NOT EXISTS idx_live_bills_customer_date ON sales_history(customer_name, transaction_date) WHERE deleted_at IS NULL",
+    # History search by customer uses idx_live_bills_customer_date too; a
+    # separate (customer_name) index only added a write to every bill save
+    "DROP INDEX IF EXISTS idx_live_bills_customer",
+    # Tombstones by undo entry, for undo and compaction
+    "CREATE INDEX IF NOT EXISTS idx_deleted_bills ON sales_history(deleted_by) WHERE deleted_at IS NOT NULL",
+    # Bills whose lines are still only in items_json (empty once migrated),
+    # so product search can read them too without scanning every bill
+    "CREATE INDEX IF NOT EXISTS idx_legacy_bills ON sales_history(bill_id) WHERE items_json != ''",
+    "CREATE INDEX IF NOT EXISTS idx_sales_items_product_name ON sales_items(product_name)",
+    "CREATE INDEX IF NOT EXISTS idx_sales_items_product_id ON sales_items(product_id)",
+    # Small key/value store for schema versions and migration progress
+    '''
+    CREATE TABLE IF NOT EXISTS schema_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+    ''',
+    # Undo stack for deletes: one entry per user action (a bill, a weekly
+    # consolidation, clearing the history), newest undone first
+    '''
+    CREATE TABLE IF NOT EXISTS undo_log (
+        undo_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at TEXT NOT NULL,
+        action TEXT NOT NULL,
+        bill_count INTEGER NOT NULL
+    )
+    ''',
+    # One row per maintenance task run (backup, integrity check, ...), with
+    # how long it took; see svs_maintenance.py
+    '''
+    CREATE TABLE IF NOT EXISTS maintenance_log (
+        run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task TEXT NOT NULL,
+        started_at TEXT NOT NULL,
+        duration_ms REAL NOT NULL,
+        status TEXT NOT NULL, -- 'ok' or 'failed'
+        detail TEXT NOT NULL DEFAULT ''
+    )
+    ''',
+    "CREATE INDEX IF NOT EXISTS idx_maintenance_log_task ON maintenance_log(task, status, started_at)",
+    # One row per cold-storage file (svs_sales_YYYY.db) holding a year's
+    # archived bills; dates are 'YYYY-MM-DD'. See svs_archive.py
+    '''
+    CREATE TABLE IF NOT EXISTS sales_archives (
+        year INTEGER PRIMARY KEY,
+        file_name TEXT NOT NULL,
+        bill_count INTEGER NOT NULL,
+        total_amount REAL NOT NULL,
+        first_date TEXT,
+        last_date TEXT,
+        first_bill_id INTEGER,
+        last_bill_id INTEGER,
+        archived_at TEXT NOT NULL
+    )
+    ''',
+    # Per-day, per-customer sales totals of live bills for the dashboard. Kept
+    # current by the triggers below on every insert/update/delete of
+    # sales_history; a tombstone counts as deleted. The triggers are dropped
+    # and recreated so databases with the older versions pick up the new ones.
+    '''
+    CREATE TABLE IF NOT EXISTS daily_sales_rollup (
+        sale_date TEXT NOT NULL, -- YYYY-MM-DD
+        customer_name TEXT NOT NULL,
+        bill_count INTEGER NOT NULL,
+        total_amount REAL NOT NULL,
+        PRIMARY KEY (sale_date, customer_name)
+    ) WITHOUT ROWID
+    ''',
+    "DROP TRIGGER IF EXISTS trg_rollup_insert",
+    "DROP TRIGGER IF EXISTS trg_rollup_delete",
+    "DROP TRIGGER IF EXISTS trg_rollup_update",
+    '''
+    CREATE TRIGGER trg_rollup_insert AFTER INSERT ON sales_history
+    WHEN NEW.deleted_at IS NULL
+    BEGIN
+        INSERT INTO daily_sales_rollup (sale_date, customer_name, bill_count, total_amount)
+        VALUES (substr(NEW.transaction_date, 1, 10), NEW.customer_name, 1, NEW.total_amount)
+        ON CONFLICT (sale_date, customer_name) DO UPDATE SET
+            bill_count = bill_count + 1,
+            total_amount = total_amount + excluded.total_amount;
+    END
+    ''',
+    '''
+    CREATE TRIGGER trg_rollup_delete AFTER DELETE ON sales_history
+    WHEN OLD.deleted_at IS NULL
+    BEGIN
+        UPDATE daily_sales_rollup
+        SET bill_count = bill_count - 1, total_amount = total_amount - OLD.total_amount
+        WHERE sale_date = substr(OLD.transaction_date, 1, 10) AND customer_name = OLD.customer_name;
+        DELETE FROM daily_sales_rollup
+        WHERE sale_date = substr(OLD.transaction_date, 1, 10) AND customer_name = OLD.customer_name
+          AND bill_count <= 0;
+    END
+    ''',
+    # Edits, soft deletes and undo: take the old row out if it was live, put
+    # the new one in if it is live
+    '''
+    CREATE TRIGGER trg_rollup_update
+    AFTER UPDATE OF transaction_date, customer_name, total_amount, deleted_at ON sales_history
+    BEGIN
+        UPDATE daily_sales_rollup
+        SET bill_count = bill_count - 1, total_amount = total_amount - OLD.total_amount
+        WHERE OLD.deleted_at IS NULL
+          AND sale_date = substr(OLD.transaction_date, 1, 10) AND customer_name = OLD.customer_name;
+        DELETE FROM daily_sales_rollup
+        WHERE sale_date = substr(OLD.transaction_date, 1, 10) AND customer_name = OLD.customer_name
+          AND bill_count <= 0;
+        INSERT INTO daily_sales_rollup (sale_date, customer_name, bill_count, total_amount)
+        SELECT substr(NEW.transaction_date, 1, 10), NEW.customer_name, 1, NEW.total_amount
+        WHERE NEW.deleted_at IS NULL
+        ON CONFLICT (sale_date, customer_name) DO UPDATE SET
+            bill_count = bill_count + 1,
+            total_amount = total_amount + excluded.total_amount;
+    END
+    ''',
+    # Change counter for the product master, so cached catalogs in other
+    # processes can tell the products changed (see svs_catalog.py)
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_products_version_insert AFTER INSERT ON products
+    BEGIN
+        INSERT INTO schema_meta (key, value) VALUES ('products_version', 1)
+        ON CONFLICT (key) DO UPDATE SET value = value + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_products_version_update AFTER UPDATE ON products
+    BEGIN
+        INSERT INTO schema_meta (key, value) VALUES ('products_version', 1)
+        ON CONFLICT (key) DO UPDATE SET value = value + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_products_version_delete AFTER DELETE ON products
+    BEGIN
+        INSERT INTO schema_meta (key, value) VALUES ('products_version', 1)
+        ON CONFLICT (key) DO UPDATE SET value = value + 1;
+    END
+    ''',
+]
+
+# Bump whenever SCHEMA_STATEMENTS change so existing databases pick them up.
+# Launches that find this version in schema_meta skip the DDL entirely.
+SCHEMA_VERSION = 8
+SCHEMA_VERSION_KEY = 'schema_version'
+# schema_meta key counting writes to the products table (kept by triggers)
+PRODUCTS_VERSION_KEY = 'products_version'
+
+# schema_meta key set once daily_sales_rollup has been filled from existing bills
+ROLLUP_BACKFILL_KEY = 'daily_sales_rollup_backfilled'
+
+
+# Columns added to existing tables after their first release, as
+# (table, column, declaration); new databases get them from the DDL above
+ADDED_COLUMNS = [
+    ('sales_history', 'deleted_at', 'TEXT'),
+    ('sales_history', 'deleted_by', 'INTEGER'),
+]
+
+
+def add_missing_columns(conn):
+    """ALTERs tables created by older versions to have every ADDED_COLUMNS column."""
+    for table, column, declaration in ADDED_COLUMNS:
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if columns and column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+
+def create_schema(conn):
+    """Creates all tables, indexes and triggers that do not exist yet."""
+    add_missing_columns(conn)
+    for statement in SCHEMA_STATEMENTS:
+        conn.execute(statement)
+    if get_meta(ROLLUP_BACKFILL_KEY, db=conn) is None:
+        rebuild_daily_rollup(conn)
+        set_meta(conn, ROLLUP_BACKFILL_KEY, 1)
+
+
+def rebuild_daily_rollup(conn):
+    """Recomputes daily_sales_rollup from sales_history (inside a transaction)."""
+    conn.execute("DELETE FROM daily_sales_rollup")
+    conn.execute('''
+        INSERT INTO daily_sales_rollup (sale_date, customer_name, bill_count, total_amount)
+        SELECT substr(transaction_date, 1, 10), customer_name, COUNT(*), TOTAL(total_amount)
+        FROM sales_history
+        WHERE deleted_at IS NULL
+        GROUP BY 1, 2
+    ''')
+
+
+def get_meta(key, default=None, db=None):
+    """Reads a value from schema_meta (db may be a Database or a connection)."""
+    row = (db or get_db()).execute("SELECT value FROM schema_meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def read_meta(keys, db=None):
+    """Reads several schema_meta values in one query.
+
+    Returns a dict of the keys that are present; an empty dict when the
+    database predates schema_meta.
+    """
+    keys = list(keys)
+    placeholders = ','.join('?' * len(keys))
+    try:
+        rows = (db or get_db()).execute(
+            f"SELECT key, value FROM schema_meta WHERE key IN ({placeholders})", keys
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return {}  # no such table yet
+    return dict(rows)
+
+
+def set_meta(conn, key, value):
+    """Writes a value to schema_meta (inside the caller's transaction)."""
+    conn.execute(
+        "INSERT INTO schema_meta (key, value) VALUES (?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (key, str(value)),
+    )
+
+
+# --- DEFAULT DATABASE ---
+
+_default_db = None
+_default_lock = threading.Lock()
+
+
+def get_db():
+    """Returns the app-wide Database for DB_NAME, creating it on first use."""
+    global _default_db
+    if _default_db is None:
+        with _default_lock:
+            if _default_db is None:
+                _default_db = Database(DB_NAME)
+    return _default_db
+
+
+def configure(path=None, **options):
+    """Replaces the app-wide Database (e.g. to point tests at a temp file)."""
+    global _default_db
+    with _default_lock:
+        if _default_db is not None:
+            _default_db.close()
+        _default_db = Database(path, **options)
+    return _default_db
@@ -0,0 +1,207 @@
+"""Tamil font discovery and lazy ReportLab registration.
+
+Finding the invoice font means listing several folders and matching file
+names, and registering it parses the whole TTF. Neither should happen while
+the app is starting, so:
+
+* the chosen font paths are remembered in a small JSON manifest together with
+  the mtimes of the searched font folders and font files; a later launch
+  only stats those few paths and rescans when one of them changed (the app
+  folder itself is not watched since the database lives there: delete the
+  manifest after dropping a new font next to the exe);
+* ReportLab registration happens on the first PDF render (``register_fonts``).
+"""
+import json
+import os
+import sys
+import threading
+
+# Support PyInstaller/standalone executable resource paths.
+# When PyInstaller bundles the app, it extracts files to a temporary folder
+# and sets sys._MEIPASS. Use BASE_PATH for all resource lookups so fonts,
+# DB and other data are found both when running normally and when frozen.
+if getattr(sys, 'frozen', False):
+    BASE_PATH = getattr(sys, '_MEIPASS', os.path.dirname(__file__))
+else:
+    BASE_PATH = os.path.dirname(__file__)
+
+# Written next to the database (the working directory), never into the
+# read-only PyInstaller bundle.
+FONT_MANIFEST_PATH = os.getenv('SVS_FONT_MANIFEST', 'svs_fonts.json')
+# Bump when discovery rules change so old manifests are ignored.
+MANIFEST_VERSION = 1
+
+# ReportLab name of the Tamil font; bold is registered as '<name>-Bold'
+PDF_FONT_NAME = 'TamilFont'
+
+# Look for font files (.ttf or .otf) in a few likely places including repo root.
+CANDIDATE_DIRS = [
+    os.path.join(BASE_PATH),
+    os.path.join(BASE_PATH, 'Noto_Sans_Tamil'),
+    os.path.join(BASE_PATH, 'Noto_Sans_Tamil', 'static'),
+    os.path.join(BASE_PATH, 'NotoSansTamil'),
+]
+
+# Exact filename preference, then any name containing one of the keywords
+PREFERRED_NAMES = [
+    'vanavil-avvaiyar regular.otf',
+    'notosanstamil-variablefont_wdth,wght.ttf',
+    'lohit-tamil.ttf',
+]
+PREFERRED_KEYWORDS = ('vanavil', 'noto', 'tamil', 'lohit')
+
+
+# --- DISCOVERY ---
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _font_files(directory):
+    if not os.path.isdir(directory):
+        return []
+    return [f for f in os.listdir(directory) if f.lower().endswith(('.ttf', '.otf'))]
+
+
+def _choose(font_candidates):
+    low_candidates = [f.lower() for f in font_candidates]
+    for pn in PREFERRED_NAMES:
+        if pn in low_candidates:
+            return font_candidates[low_candidates.index(pn)]
+    for f in font_candidates:
+        if any(k in f.lower() for k in PREFERRED_KEYWORDS):
+            return f
+    return font_candidates[0]
+
+
+def discover_fonts():
+    """Scans the candidate folders and returns a fresh manifest dict.
+
+    ``regular``/``bold`` are font paths (or None); ``watched`` maps every
+    folder and file the choice depended on to its mtime.
+    """
+    searched = list(CANDIDATE_DIRS)
+    font_dir, font_candidates = None, []
+    for d in CANDIDATE_DIRS:
+        files = _font_files(d)
+        if files:
+            font_dir, font_candidates = d, files
+            break
+
+    if font_dir is None:
+        # As a last attempt, check current working directory
+        pwd = os.getcwd()
+        searched.append(pwd)
+        files = _font_files(pwd)
+        if files:
+            font_dir, font_candidates = pwd, files
+
+    regular = os.path.join(font_dir, _choose(font_candidates)) if font_candidates else None
+
+    if getattr(sys, 'frozen', False) and (regular is None or not os.path.exists(regular)):
+        # Look for font in the PyInstaller _MEIPASS directory when running as exe
+        for font_name in ['NotoSansTamil-Regular.ttf', 'Lohit-Tamil.ttf']:
+            potential_path = os.path.join(BASE_PATH, 'Noto_Sans_Tamil', font_name)
+            if os.path.exists(potential_path):
+                regular = potential_path
+                break
+
+    # A Bold variant is only used if a separate bold TTF sits next to it
+    bold = None
+    for f in font_candidates:
+        if 'bold' in f.lower() and f.lower().endswith('.ttf'):
+            bold = os.path.join(font_dir, f)
+            break
+
+    # Folder mtimes change when fonts are added or removed. The app folder
+    # and working directory also change with every database write, so only
+    # the chosen files are checked there.
+    busy = {os.path.abspath(BASE_PATH), os.path.abspath(os.getcwd())}
+    watched = {path: _mtime(path) for path in searched if os.path.abspath(path) not in busy}
+    for path in (regular, bold):
+        if path:
+            watched[path] = _mtime(path)
+    return {'version': MANIFEST_VERSION, 'regular': regular, 'bold': bold, 'watched': watched}
+
+
+def _load_manifest(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return None
+    # Stale if any searched folder or chosen font was added, removed or changed
+    for watched_path, mtime in manifest.get('watched', {}).items():
+        if _mtime(watched_path) != mtime:
+            return None
+    return manifest
+
+
+_resolved = None
+_registered = None
+_lock = threading.RLock()
+
+
+def resolve_fonts(manifest_path=None):
+    """Returns the font manifest, from the cache file when it is still valid."""
+    global _resolved
+    with _lock:
+        if _resolved is None:
+            manifest_path = manifest_path or FONT_MANIFEST_PATH
+            manifest = _load_manifest(manifest_path)
+            if manifest is None:
+                manifest = discover_fonts()
+                try:
+                    with open(manifest_path, 'w', encoding='utf-8') as f:
+                        json.dump(manifest, f, indent=1)
+                except OSError:
+                    pass  # read-only folder: just rescan next launch
+            _resolved = manifest
+        return _resolved
+
+
+def get_font_file():
+    """Path of the Tamil font used for PDFs, or None."""
+    return resolve_fonts()['regular']
+
+
+# --- REPORTLAB REGISTRATION ---
+
+def register_fonts():
+    """Registers the Tamil font with ReportLab on first use.
+
+    Returns (font_name, bold_name) for the drawing code; both fall back to
+    Helvetica when no usable font is found.
+    """
+    global _registered
+    if _registered is not None:
+        return _registered
+    with _lock:
+        if _registered is None:
+            _registered = _register(resolve_fonts())
+    return _registered
+
+
+def _register(manifest):
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    font_file, bold_path = manifest['regular'], manifest['bold']
+    try:
+        if font_file and os.path.exists(font_file):
+            # Register TTF with ReportLab
+            pdfmetrics.registerFont(TTFont(PDF_FONT_NAME, font_file))
+            # Register the Bold variant only if a separate bold file exists
+            if bold_path and os.path.exists(bold_path):
+                pdfmetrics.registerFont(TTFont(PDF_FONT_NAME + '-Bold', bold_path))
+                return PDF_FONT_NAME, PDF_FONT_NAME + '-Bold'
+            return PDF_FONT_NAME, PDF_FONT_NAME
+        print("ℹ️ No TTF/OTF font found for Tamil in project; PDF will use fallback fonts.")
+    except Exception as e:
+        print(f"❌ WARNING: Could not register Tamil TTF ('{font_file}') with ReportLab. Error: {e}")
+    return 'Helvetica', 'Helvetica-Bold'
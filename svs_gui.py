@@ -0,0 +1,1530 @@
+"""Tk screens of the SVS billing app.
+
+A thin customtkinter layer over svs_core: screens collect input, call the
+core functions and redraw. Imported by svs_billing_app.main() only, so the
+PDF worker processes and scripts never load Tk.
+"""
+import customtkinter as ctk
+from tkinter import messagebox
+import tkinter as tk
+from tkinter import ttk
+import sqlite3
+import time
+from datetime import datetime
+from svs_tasks import TaskRunner
+from svs_sales import migrate_items_json
+# Data access, bills and consolidation live in svs_core.py (no GUI imports)
+from svs_core import (COMPANY_NAME, format_quantity, load_bill_items, get_customers,
+                      get_product_rate, save_product, delete_product, save_customer,
+                      delete_customer, save_bill, delete_bill,
+                      undo_last, undo_stack, clear_history,
+                      get_dashboard_summary, BillLines)
+from svs_catalog import get_catalog
+from svs_archive import find_archived_bill
+from svs_consolidate import consolidate_customer, delete_consolidated, week_window
+from svs_undo import UNDO_KEEP_DAYS
+from svs_maintenance import BACKUP_DIR, IDLE_SECONDS, MaintenanceScheduler
+from svs_search import search_products
+from svs_history import HistoryFilter, HistoryPager
+from svs_render import get_render_engine
+from svs_batch import reprint_bills, print_day_end, format_result, run_statements, format_statement_result
+
+# --- UI THEME (unique style: dark navy + saffron accent) ---
+THEME_BG = "#0ADAFF"            # deep navy background
+THEME_MAIN = "#000000"          # main content background
+THEME_SIDEBAR = "#000000"       # sidebar background
+THEME_ACCENT = "#00bdf1"        # saffron / accent color
+THEME_ACCENT_HOVER = "#ffb07a"  # lighter accent for hover
+THEME_TEXT = "#e6edf3"          # primary text color
+THEME_MUTED = "#9aa6b2"         # muted text
+THEME_BUTTON_TEXT = "#000000"   # dark text for light buttons (used selectively)
+
+# How often the app checks whether maintenance is due (see svs_maintenance)
+MAINTENANCE_POLL_MS = 60000
+
+
+# --- MAIN APPLICATION CLASS ---
+
+class App(ctk.CTk):
+    def __init__(self):
+        super().__init__()
+        # Use COMPANY_NAME (env-backed) to avoid hard-coded personal/company data
+        try:
+            self.title(f"{COMPANY_NAME} Wholesale Billing System")
+        except Exception:
+            self.title("Wholesale Billing System")
+        # Ensure the window expands fully
+        self.geometry("900x600") 
+        # Apply unique appearance and use per-widget colors for a custom theme
+        ctk.set_appearance_mode("Dark")
+
+        # --- Data Variables ---
+        # (the bill being entered lives in billing_frame.lines)
+        self.customer_var = ctk.StringVar(value="Select Customer or Type Name") # FIX: Changed default text
+
+        # --- Grid Layout (2 columns for sidebar and main content) ---
+        # FIX: Ensure row 0 and column 1 take all available space
+        self.grid_columnconfigure(1, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        # --- Sidebar Frame ---
+        self.sidebar_frame = ctk.CTkFrame(self, width=140, corner_radius=0, fg_color=THEME_SIDEBAR)
+        # FIX: Removed rowspan=5 and grid_rowconfigure(5, weight=1) to shrink sidebar padding/space
+        self.sidebar_frame.grid(row=0, column=0, sticky="nsew")
+
+        # We need to configure grid rows for the buttons to maintain their size,
+        # and rely on the default behavior for spacing to be minimal.
+
+        self.logo_label = ctk.CTkLabel(self.sidebar_frame, text=COMPANY_NAME, font=ctk.CTkFont(size=16, weight="bold"), text_color=THEME_TEXT)
+        self.logo_label.grid(row=0, column=0, padx=20, pady=(20, 10))
+
+        # Navigation Buttons (Rows 1 through 5)
+        # FIX: Added Unicode Emojis for icons
+        self.dashboard_button = ctk.CTkButton(self.sidebar_frame, text="Dashboard ", command=self.show_dashboard_screen, fg_color=THEME_ACCENT, hover_color=THEME_ACCENT_HOVER, text_color=THEME_SIDEBAR)
+        self.dashboard_button.grid(row=1, column=0, padx=20, pady=10)
+
+        self.billing_button = ctk.CTkButton(self.sidebar_frame, text="New Bill", command=self.show_billing_screen, fg_color=THEME_ACCENT, hover_color=THEME_ACCENT_HOVER, text_color=THEME_SIDEBAR)
+        self.billing_button.grid(row=2, column=0, padx=20, pady=10)
+
+        self.customers_button = ctk.CTkButton(self.sidebar_frame, text="Customer Master", command=self.show_customer_master, fg_color=THEME_ACCENT, hover_color=THEME_ACCENT_HOVER, text_color=THEME_SIDEBAR)
+        self.customers_button.grid(row=3, column=0, padx=20, pady=10)
+
+        self.products_button = ctk.CTkButton(self.sidebar_frame, text="Product Master", command=self.show_product_screen, fg_color=THEME_ACCENT, hover_color=THEME_ACCENT_HOVER, text_color=THEME_SIDEBAR)
+        self.products_button.grid(row=4, column=0, padx=20, pady=10)
+
+        # FIX: The space issue comes from row 5 having weight=1.
+        # We set row 6 (the row after the last button) to take up all remaining space.
+        self.history_button = ctk.CTkButton(self.sidebar_frame, text="Bill History", command=self.show_history_screen, fg_color=THEME_ACCENT, hover_color=THEME_ACCENT_HOVER, text_color=THEME_SIDEBAR)
+        self.history_button.grid(row=5, column=0, padx=20, pady=10)
+
+        # Set the row AFTER the last button (row 6) to take up all vertical space.
+        self.sidebar_frame.grid_rowconfigure(6, weight=1)
+
+        # Background work (PDF rendering, report refresh) runs on worker threads;
+        # this button at the bottom of the sidebar shows pending/failed jobs.
+        self.tasks = TaskRunner(self.after)
+        self.task_status_button = ctk.CTkButton(self.sidebar_frame, text="", fg_color="transparent", hover_color=THEME_SIDEBAR, text_color=THEME_MUTED, command=self.retry_failed_tasks)
+        self.task_status_button.grid(row=7, column=0, padx=20, pady=(0, 20), sticky="ew")
+        self.tasks.add_listener(self.update_task_status)
+
+
+        # --- Main Content Frame ---
+        self.main_frame = ctk.CTkFrame(self, fg_color=THEME_MAIN)
+        self.main_frame.grid(row=0, column=1, sticky="nsew", padx=10, pady=10)
+        # FIX: Main frame must be configured to expand
+        self.main_frame.grid_columnconfigure(0, weight=1)
+        self.main_frame.grid_rowconfigure(0, weight=1)
+
+        # Initialize screens
+        self.dashboard_frame = None # NEW
+        self.billing_frame = None
+        self.customer_frame = None # NEW
+        self.product_frame = None
+        self.history_frame = None
+
+        # Show the default screen
+        self.show_dashboard_screen()
+
+        # Move legacy items_json bills into sales_items a batch at a time between UI events
+        self.after(500, self.migrate_items_step)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        # Start the PDF worker processes in the background before the first bill
+        self.tasks.submit("Start PDF workers", get_render_engine().warm_up)
+        # Backups, integrity check, ANALYZE, compaction and vacuum while the counter is idle
+        self.maintenance = MaintenanceScheduler()
+        self.maintenance_running = False
+        self.closing = False  # set by on_close so a running maintenance job stops at its next step
+        self.last_input = time.monotonic()
+        self.bind_all("<Any-KeyPress>", self.note_user_input, add="+")
+        self.bind_all("<Any-ButtonPress>", self.note_user_input, add="+")
+        self.after(MAINTENANCE_POLL_MS, self.maintenance_tick)
+
+    def note_user_input(self, event=None):
+        self.last_input = time.monotonic()
+
+    def is_idle(self):
+        """True once nobody has typed or clicked for IDLE_SECONDS (safe to call from workers)."""
+        return not self.closing and time.monotonic() - self.last_input >= IDLE_SECONDS
+
+    def maintenance_tick(self):
+        """Starts due maintenance in the background when the counter is idle."""
+        try:
+            if not self.maintenance_running and not self.tasks.pending and self.is_idle() and self.maintenance.due():
+                self.maintenance_running = True
+                self.tasks.submit(
+                    "Maintenance", lambda: self.maintenance.run_due(is_idle=self.is_idle),
+                    on_done=self.on_maintenance_done, on_error=self.on_maintenance_error,
+                )
+        except sqlite3.Error as e:
+            print(f"⚠️ maintenance check skipped: {e}")
+        self.after(MAINTENANCE_POLL_MS, self.maintenance_tick)
+
+    def on_maintenance_done(self, runs):
+        self.maintenance_running = False
+        for run in runs:
+            print(f"Maintenance {run.task}: {run.status} in {run.duration_ms:.0f} ms ({run.detail})")
+            if run.task == 'check' and run.status == 'failed':
+                messagebox.showwarning(
+                    "Database Check Failed",
+                    f"The sales database failed its integrity check:\n{run.detail}\n\n"
+                    f"Keep the app open and contact support. Recent backups are in '{BACKUP_DIR}'.",
+                )
+
+    def on_maintenance_error(self, error):
+        self.maintenance_running = False
+        print(f"⚠️ maintenance failed: {error}")
+
+    def migrate_items_step(self):
+        """Runs one migration batch and reschedules itself until nothing is left."""
+        try:
+            if migrate_items_json(max_batches=1):
+                self.after(50, self.migrate_items_step)
+        except sqlite3.Error as e:
+            print(f"⚠️ items_json migration paused: {e}")
+
+
+    # --- Background Tasks ---
+
+    def update_task_status(self, runner):
+        """Shows pending and failed background jobs in the sidebar."""
+        parts = []
+        if runner.pending:
+            parts.append(f"⏳ {runner.pending} pending")
+        if runner.failed:
+            parts.append(f"⚠️ {len(runner.failed)} failed (click to retry)")
+        self.task_status_button.configure(text="\n".join(parts), text_color="orange" if runner.failed else THEME_MUTED)
+
+    def retry_failed_tasks(self):
+        if self.tasks.failed:
+            errors = "\n".join(f"{label}: {error}" for label, error, _ in self.tasks.failed)
+            if messagebox.askyesno("Retry Failed Jobs", f"These background jobs failed:\n{errors}\n\nRetry them now?"):
+                self.tasks.retry_failed()
+
+    def render_invoice_async(self, bill_id, customer, items, total_amount, on_done=None, on_error=None, **pdf_options):
+        """Renders a bill PDF in the process-pool engine.
+
+        on_done(pdf_path) or on_error(exc) runs on the UI thread; without
+        on_error a failed render waits in the task status for a retry.
+        """
+        label = f"PDF for bill {bill_id}" if bill_id else f"PDF for {customer}"
+        self.tasks.submit(
+            label,
+            lambda: get_render_engine().render(bill_id, customer, items, total_amount, **pdf_options),
+            on_done=on_done,
+            on_error=on_error,
+        )
+
+    def on_close(self):
+        self.closing = True
+        self.tasks.shutdown(wait=True)  # let in-flight PDFs finish writing
+        get_render_engine().shutdown()
+        self.destroy()
+
+    # --- Screen Management ---
+
+    def hide_frames(self):
+        """Hides all non-sidebar frames."""
+        for frame in [self.dashboard_frame, self.billing_frame, self.customer_frame, self.product_frame, self.history_frame]:
+            if frame:
+                frame.grid_forget()
+                
+    def show_dashboard_screen(self):
+        self.hide_frames()
+        if self.dashboard_frame is None:
+            self.dashboard_frame = DashboardScreen(self.main_frame, self)
+        self.dashboard_frame.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
+        self.dashboard_frame.grid_columnconfigure(0, weight=1)
+        self.dashboard_frame.grid_rowconfigure(0, weight=1)
+        self.dashboard_frame.load_report_data() # Load data when switching to this screen
+
+
+    def show_billing_screen(self):
+        self.hide_frames()
+        if self.billing_frame is None:
+            self.billing_frame = BillingScreen(self.main_frame, self)
+        # FIX: Ensure it expands to fill the main_frame
+        self.billing_frame.grid(row=0, column=0, sticky="nsew", padx=5, pady=5) 
+        self.billing_frame.grid_columnconfigure(0, weight=1)
+        self.billing_frame.grid_rowconfigure(1, weight=1)
+        self.billing_frame.load_customer_options() # FIX: Load customer options
+        self.billing_frame.load_product_options()
+        self.billing_frame.update_bill_summary()
+        
+
+    def show_customer_master(self):
+        self.hide_frames()
+        if self.customer_frame is None:
+            self.customer_frame = CustomerMasterScreen(self.main_frame, self)
+        self.customer_frame.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
+        self.customer_frame.grid_columnconfigure(0, weight=1)
+        self.customer_frame.grid_rowconfigure(1, weight=1)
+        self.customer_frame.load_customers_to_view()
+
+    def show_product_screen(self):
+        self.hide_frames()
+        if self.product_frame is None:
+            self.product_frame = ProductMasterScreen(self.main_frame, self)
+        # FIX: Ensure it expands to fill the main_frame
+        self.product_frame.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
+        self.product_frame.grid_columnconfigure(0, weight=1)
+        self.product_frame.grid_rowconfigure(1, weight=1)
+        self.product_frame.load_products_to_view()
+
+    def show_history_screen(self):
+        self.hide_frames()
+        if self.history_frame is None:
+            self.history_frame = HistoryScreen(self.main_frame, self)
+        # FIX: Ensure it expands to fill the main_frame
+        self.history_frame.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
+        self.history_frame.grid_columnconfigure(0, weight=1)
+        self.history_frame.grid_rowconfigure(1, weight=1)
+        self.history_frame.load_sales_history()
+
+
+# --- DASHBOARD SCREEN CLASS (NEW) ---
+
+class DashboardScreen(ctk.CTkFrame):
+    def __init__(self, master, app_instance):
+        super().__init__(master)
+        self.app = app_instance
+        self.grid_columnconfigure((0, 1, 2), weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        ctk.CTkLabel(self, text="Sales Dashboard (விற்பனை அறிக்கை)", font=ctk.CTkFont(size=20, weight="bold")).grid(row=0, column=0, columnspan=3, padx=10, pady=(10, 20), sticky="w")
+        
+        # Data storage for the summary boxes
+        self.summary_labels = {}
+        
+        # Create summary boxes
+        timeframes = [("Today", "இன்று"), ("This Week", "இந்த வாரம்"), ("This Month", "இந்த மாதம்")]
+        
+        for i, (tf_en, tf_ta) in enumerate(timeframes):
+            # FIX: Changed fg_color to transparent and removed corner_radius for the look seen in the image
+            frame = ctk.CTkFrame(self, fg_color="transparent", corner_radius=0) 
+            frame.grid(row=1, column=i, padx=15, pady=15, sticky="nsew")
+            frame.grid_columnconfigure(0, weight=1)
+            
+            ctk.CTkLabel(frame, text=f"{tf_ta} ({tf_en})", font=ctk.CTkFont(size=16, weight="bold"), text_color="gray50").grid(row=0, column=0, padx=20, pady=10, sticky="w")
+            
+            # Amount Label
+            amount_label = ctk.CTkLabel(frame, text="₹0.00", font=ctk.CTkFont(size=28, weight="bold"), text_color="green")
+            amount_label.grid(row=1, column=0, padx=20, pady=5, sticky="w")
+            self.summary_labels[f'{tf_en}_amount'] = amount_label
+            
+            # Count Label
+            count_label = ctk.CTkLabel(frame, text="0 Bills", font=ctk.CTkFont(size=14), text_color="gray")
+            count_label.grid(row=2, column=0, padx=20, pady=(0, 10), sticky="w")
+            self.summary_labels[f'{tf_en}_count'] = count_label
+
+    def load_report_data(self):
+        """Calculates and updates the sales summary data for various timeframes."""
+        self.show_report_data(self.fetch_report_data())
+
+    def refresh_in_background(self):
+        """Re-queries the summary on a worker thread and updates the cards when done."""
+        self.app.tasks.submit("Dashboard refresh", self.fetch_report_data, on_done=self.show_report_data)
+
+    @staticmethod
+    def fetch_report_data():
+        """Queries Today / This Week / This Month totals (safe to call from a worker thread)."""
+        return get_dashboard_summary()
+
+    def show_report_data(self, summary):
+        """Updates the summary cards; must run on the UI thread."""
+        for tf_en, (total_amount, bill_count) in summary.items():
+            self.summary_labels[f'{tf_en}_amount'].configure(text=f"₹{total_amount:,.2f}")
+            self.summary_labels[f'{tf_en}_count'].configure(text=f"{bill_count} Bills")
+
+
+# --- BILLING SCREEN CLASS ---
+
+# Keys that move around the product box rather than change what was typed
+TYPE_AHEAD_IGNORED_KEYS = {'Return', 'KP_Enter', 'Tab', 'Escape', 'Up', 'Down', 'Left', 'Right',
+                           'Shift_L', 'Shift_R', 'Control_L', 'Control_R', 'Alt_L', 'Alt_R'}
+
+
+class BillingScreen(ctk.CTkFrame):
+    def __init__(self, master, app_instance):
+        super().__init__(master)
+        self.app = app_instance
+        
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+        
+        self.customer_options = get_customers() # Initial load of customer list
+        
+        # Store bill_id being edited, if any
+        self.editing_bill_id = None 
+
+        # Top Bar for Customer Input
+        customer_frame = ctk.CTkFrame(self)
+        customer_frame.grid(row=0, column=0, padx=10, pady=(10, 5), sticky="ew")
+        customer_frame.grid_columnconfigure((1, 2), weight=1)
+        customer_frame.grid_columnconfigure(0, weight=0)
+
+        ctk.CTkLabel(customer_frame, text="Customer Name:", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, padx=10, pady=10, sticky="w")
+        
+        # NEW: Dropdown for existing customers
+        self.customer_dropdown = ctk.CTkOptionMenu(customer_frame, variable=self.app.customer_var, values=self.customer_options, command=self.update_customer_entry, width=200)
+        self.customer_dropdown.grid(row=0, column=1, padx=10, pady=10, sticky="ew")
+        
+        # Entry for typing custom customer name
+        self.customer_entry = ctk.CTkEntry(customer_frame, textvariable=self.app.customer_var, width=400)
+        self.customer_entry.grid(row=0, column=2, padx=10, pady=10, sticky="ew")
+
+
+        # Line Item Entry Frame
+        item_frame = ctk.CTkFrame(self)
+        item_frame.grid(row=1, column=0, padx=10, pady=5, sticky="nsew")
+        # FIX: Adjusted weights to give Rate/Kg column less space
+        item_frame.grid_columnconfigure(0, weight=4) # Item Name (Dropdown)
+        item_frame.grid_columnconfigure(1, weight=1) # Rate/Kg (Editable)
+        item_frame.grid_columnconfigure(2, weight=2) # Quantity (Kg)
+        item_frame.grid_columnconfigure(3, weight=1) # Total
+        item_frame.grid_columnconfigure(4, weight=1) # Add Button
+
+        # Labels
+        ctk.CTkLabel(item_frame, text="Item Name", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, padx=5, pady=5)
+        ctk.CTkLabel(item_frame, text="Rate/Kg (₹)", font=ctk.CTkFont(weight="bold")).grid(row=0, column=1, padx=5, pady=5)
+        ctk.CTkLabel(item_frame, text="Quantity (Kg)", font=ctk.CTkFont(weight="bold")).grid(row=0, column=2, padx=5, pady=5)
+        ctk.CTkLabel(item_frame, text="Total (₹)", font=ctk.CTkFont(weight="bold")).grid(row=0, column=3, padx=5, pady=5)
+        ctk.CTkLabel(item_frame, text="Action", font=ctk.CTkFont(weight="bold")).grid(row=0, column=4, padx=5, pady=5)
+        
+        # Inputs
+        self.product_options = []
+        self.product_generation = None  # catalog generation the dropdown was filled from
+        self.selected_product = tk.StringVar()
+        self.rate_var = ctk.StringVar(value="0.00") # FIX: Variable to hold editable rate
+
+        # Use a ttk.Combobox for product selection (allows typing + dropdown, more comfortable than spin buttons)
+        self.item_dropdown = ttk.Combobox(item_frame, textvariable=self.selected_product, values=self.product_options)
+        self.item_dropdown.state(['!readonly'])  # allow typing
+        self.item_dropdown.grid(row=1, column=0, padx=5, pady=5, sticky="ew")
+        # Bind selection and typing events to update rate. Typing narrows the
+        # dropdown to type-ahead matches (English, Tamil or PLU code); Enter
+        # takes the best match and moves on to the quantity.
+        self.item_dropdown.bind('<<ComboboxSelected>>', self.on_product_selected)
+        self.item_dropdown.bind('<FocusOut>', lambda e: self.update_rate(self.resolve_product()))
+        self.item_dropdown.bind('<KeyRelease>', self.on_product_typed)
+        self.item_dropdown.bind('<Return>', self.on_product_enter)
+        
+        # FIX: Changed rate_label to an editable CTkEntry
+        self.rate_entry = ctk.CTkEntry(item_frame, textvariable=self.rate_var)
+        self.rate_entry.grid(row=1, column=1, padx=5, pady=5, sticky="ew")
+        self.rate_entry.bind("<KeyRelease>", self.calculate_total_price)
+        
+        self.quantity_entry = ctk.CTkEntry(item_frame, placeholder_text="e.g., 1.75 for 1kg 750g")
+        self.quantity_entry.grid(row=1, column=2, padx=5, pady=5, sticky="ew")
+        self.quantity_entry.bind("<KeyRelease>", self.calculate_total_price)
+        
+        self.line_total_label = ctk.CTkLabel(item_frame, text="0.00", text_color="cyan")
+        self.line_total_label.grid(row=1, column=3, padx=5, pady=5, sticky="ew")
+        
+        self.add_button = ctk.CTkButton(item_frame, text="Add Item", command=self.add_item_to_bill)
+        self.add_button.grid(row=1, column=4, padx=5, pady=5)
+
+        # Bill Display Area
+        ctk.CTkLabel(self, text="Current Bill Items", font=ctk.CTkFont(size=14, weight="bold")).grid(row=2, column=0, padx=10, pady=(10, 0), sticky="w")
+        
+        self.bill_display_frame = ctk.CTkScrollableFrame(self, label_text="Itemized List")
+        self.bill_display_frame.grid(row=3, column=0, padx=10, pady=5, sticky="nsew")
+        self.bill_display_frame.grid_columnconfigure(0, weight=1)
+        # The bill's lines and total, and the pooled row widgets showing them
+        self.lines = BillLines(self)
+
+        # Summary and Finalization
+        summary_frame = ctk.CTkFrame(self)
+        summary_frame.grid(row=4, column=0, padx=10, pady=(5, 10), sticky="ew")
+        summary_frame.grid_columnconfigure(0, weight=1)
+        summary_frame.grid_columnconfigure(1, weight=1)
+        
+        ctk.CTkLabel(summary_frame, text="GRAND TOTAL:").grid(row=0, column=0, padx=10, pady=10, sticky="e")
+        self.total_label = ctk.CTkLabel(summary_frame, text="₹0.00", font=ctk.CTkFont(size=20, weight="bold"), text_color="lightgreen")
+        self.total_label.grid(row=0, column=1, padx=(0, 20), pady=10, sticky="w")
+        
+        # Finalization Buttons
+        self.weekly_save_button = ctk.CTkButton(summary_frame, text="Save for Weekly Bill (No Print)", command=lambda: self.finalize_bill(print_immediately=False))
+        self.weekly_save_button.grid(row=1, column=0, padx=10, pady=10, sticky="ew")
+        
+        self.finalize_button = ctk.CTkButton(summary_frame, text="FINALIZE & PRINT BILL (PDF)", command=lambda: self.finalize_bill(print_immediately=True), fg_color="green", hover_color="#006400")
+        self.finalize_button.grid(row=1, column=1, padx=10, pady=10, sticky="ew")
+
+        # Non-blocking feedback for saved bills and background PDF renders
+        self.status_label = ctk.CTkLabel(summary_frame, text="", text_color=THEME_MUTED, anchor="w")
+        self.status_label.grid(row=2, column=0, columnspan=2, padx=10, pady=(0, 5), sticky="ew")
+        
+    def update_customer_entry(self, choice):
+        """Updates the entry field when a customer is selected from the dropdown."""
+        self.app.customer_var.set(choice)
+        
+    def load_customer_options(self):
+        """Loads customers from DB into the dropdown menu."""
+        customers = get_customers()
+        self.customer_dropdown.configure(values=customers)
+        
+        # Attempt to set default selection
+        if customers:
+            if self.app.customer_var.get() not in customers:
+                self.app.customer_var.set(customers[0])
+        else:
+            self.app.customer_var.set("Type Customer Name")
+        
+    def load_product_options(self):
+        """Loads products from the catalog into the dropdown menu.
+
+        Nothing is re-read or re-configured unless the product master changed
+        since the last call (catalog generation).
+        """
+        catalog = get_catalog()
+        catalog.refresh_if_changed()
+        if catalog.generation == self.product_generation:
+            return
+        self.product_generation = catalog.generation
+        self.product_options = catalog.names()
+        if self.product_options:
+            self.item_dropdown.configure(values=self.product_options)
+            self.selected_product.set(self.product_options[0])
+            self.update_rate(self.selected_product.get())
+
+    def on_product_typed(self, event):
+        """Shows the ranked matches for the typed text in the dropdown list."""
+        if event.keysym in TYPE_AHEAD_IGNORED_KEYS:
+            return
+        text = self.selected_product.get()
+        matches = search_products(text) if text.strip() else None
+        self.item_dropdown.configure(values=matches or self.product_options)
+
+    def resolve_product(self):
+        """Replaces partly typed text with its best match; returns the product name."""
+        text = self.selected_product.get().strip()
+        if text and text not in get_catalog():
+            matches = search_products(text, limit=1)
+            if matches:
+                self.selected_product.set(matches[0])
+        return self.selected_product.get()
+
+    def on_product_selected(self, event=None):
+        self.item_dropdown.configure(values=self.product_options)
+        self.update_rate(self.selected_product.get())
+
+    def on_product_enter(self, event=None):
+        self.resolve_product()
+        self.on_product_selected()
+        self.quantity_entry.focus_set()
+
+    def get_rate(self, item_name):
+        """Retrieves the rate per kg for a given item name (in memory, no DB query)."""
+        return get_product_rate(item_name)
+
+    def update_rate(self, item_name):
+        """Updates the rate display when a product is selected."""
+        rate = self.get_rate(item_name)
+        # FIX: Update the editable entry field
+        self.rate_var.set(f"{rate:.2f}") 
+        self.calculate_total_price(None) # Recalculate line total
+
+    def calculate_total_price(self, event):
+        """Calculates and updates the line total based on quantity and rate."""
+        try:
+            # FIX: Get rate from the editable entry field
+            rate = float(self.rate_var.get())
+            quantity = float(self.quantity_entry.get())
+            total = rate * quantity
+            self.line_total_label.configure(text=f"{total:.2f}")
+        except ValueError:
+            self.line_total_label.configure(text="0.00")
+            
+    def add_item_to_bill(self):
+        """Adds the current item entry to the bill list."""
+        item_name = self.resolve_product()
+        try:
+            # FIX: Get rate from the editable entry field
+            rate = float(self.rate_var.get())
+            quantity = float(self.quantity_entry.get())
+        except ValueError:
+            messagebox.showerror("Input Error", "Please enter valid Rate and Quantity (numbers).")
+            return
+            
+        if quantity <= 0:
+            messagebox.showerror("Input Error", "Quantity must be greater than zero.")
+            return
+
+        total_price = quantity * rate
+        
+        # Bill Item Format: (name, quantity_kg, rate_per_kg, total_price)
+        new_item = (item_name, quantity, rate, total_price)
+        self.quantity_entry.delete(0, 'end')
+        # Only the new row is drawn; existing rows are left alone
+        self.lines.add(new_item)
+        self.update_bill_totals()
+        
+        # Clear editing state if an item is added
+        self.editing_bill_id = None
+        self.finalize_button.configure(text="FINALIZE & PRINT BILL (PDF)")
+
+
+    def load_bill_for_edit(self, bill_data):
+        """Loads items from a historical bill into the current bill for editing."""
+        bill_id, customer, items_json, total_amount = bill_data
+        items = load_bill_items(bill_id, items_json)
+        
+        # Set editing state
+        self.editing_bill_id = bill_id
+        self.app.customer_var.set(customer)
+        self.finalize_button.configure(text=f"UPDATE BILL {bill_id} & PRINT")
+        
+        # Replace the current bill's lines; existing rows are re-filled
+        self.lines.load(items)
+        self.update_bill_totals()
+        self.app.show_billing_screen() # Switch to billing screen
+        
+    def make_bill_row(self):
+        """Builds one reusable bill row (filled by fill_bill_row)."""
+        row_frame = ctk.CTkFrame(self.bill_display_frame, fg_color="transparent")
+        row_frame.grid_columnconfigure(0, weight=4) # Name
+        row_frame.grid_columnconfigure(1, weight=2) # Quantity
+        row_frame.grid_columnconfigure(2, weight=1) # Rate
+        row_frame.grid_columnconfigure(3, weight=1) # Total
+        row_frame.grid_columnconfigure(4, weight=1) # Remove Button
+
+        row_frame.name_label = ctk.CTkLabel(row_frame, text="", anchor="w")
+        row_frame.name_label.grid(row=0, column=0, padx=5, sticky="w")
+        row_frame.quantity_label = ctk.CTkLabel(row_frame, text="", anchor="w")
+        row_frame.quantity_label.grid(row=0, column=1, padx=5, sticky="w")
+        row_frame.rate_label = ctk.CTkLabel(row_frame, text="", anchor="w")
+        row_frame.rate_label.grid(row=0, column=2, padx=5, sticky="w")
+        row_frame.total_label = ctk.CTkLabel(row_frame, text="", anchor="e", font=ctk.CTkFont(weight="bold"))
+        row_frame.total_label.grid(row=0, column=3, padx=5, sticky="e")
+
+        # The button finds its row's current position when clicked, so rows
+        # below a deleted one need no re-binding
+        remove_btn = ctk.CTkButton(row_frame, text="X", width=30, fg_color="red", hover_color="#8B0000",
+                                   command=lambda: self.remove_item(self.lines.index_of(row_frame)))
+        remove_btn.grid(row=0, column=4, padx=5, sticky="e")
+        return row_frame
+
+    def fill_bill_row(self, row_frame, item):
+        name, quantity, rate, total = item
+        row_frame.name_label.configure(text=name)
+        # Use format_quantity for the unique display
+        row_frame.quantity_label.configure(text=format_quantity(quantity))
+        row_frame.rate_label.configure(text=f"@{rate:.2f}")
+        row_frame.total_label.configure(text=f"₹{total:.2f}")
+
+    def show_bill_row(self, row_frame):
+        # pack keeps rows in order, so removing one never moves the others by hand
+        row_frame.pack(fill="x", padx=5, pady=2)
+
+    def hide_bill_row(self, row_frame):
+        row_frame.pack_forget()
+
+    def update_bill_totals(self):
+        """Updates the grand total and the finalize button in place."""
+        self.total_label.configure(text=f"₹{self.lines.total:.2f}")
+        
+        # Update button text based on editing state
+        if self.editing_bill_id:
+            self.finalize_button.configure(text=f"UPDATE BILL {self.editing_bill_id} & PRINT")
+        else:
+            self.finalize_button.configure(text="FINALIZE & PRINT BILL (PDF)")
+
+    def update_bill_summary(self):
+        """Re-syncs the whole displayed list with the bill's lines.
+
+        Existing rows are re-filled rather than rebuilt; adding or removing a
+        single item goes through BillLines.add / BillLines.remove instead.
+        """
+        self.lines.refresh()
+        self.update_bill_totals()
+
+    def remove_item(self, index):
+        """Removes an item from the current bill list."""
+        self.lines.remove(index)
+        self.update_bill_totals()
+
+    def finalize_bill(self, print_immediately=True):
+        """Saves the bill to the database and queues its PDF for background rendering."""
+        customer = self.app.customer_var.get().strip()
+        
+        # Handle editing vs new bill
+        bill_id_to_save = self.editing_bill_id
+        
+        if customer == "Select Customer or Type Name" or not customer:
+            messagebox.showerror("Error", "Please enter a valid Customer Name.")
+            return
+
+        if not self.lines.items:
+            messagebox.showerror("Error", "Bill is empty. Please add items.")
+            return
+
+        # 1-2. Save the customer (if new) and the bill with its line items in one transaction
+        total_amount = self.lines.total
+
+        try:
+            last_bill_id, customer_added = save_bill(customer, self.lines.items, total_amount, bill_id_to_save)
+            if bill_id_to_save:
+                message_action = f"Bill (ID: {last_bill_id}) updated"
+            else:
+                message_action = f"Bill (ID: {last_bill_id}) saved"
+
+            if customer_added and self.app.customer_frame:
+                self.app.customer_frame.load_customers_to_view()
+            
+            # 3. Render the PDF in the background; the counter is free for the next bill now
+            bill_items = list(self.lines.items)
+            if print_immediately:
+                self.status_label.configure(text=f"{message_action}. Generating PDF...")
+                self.app.render_invoice_async(
+                    last_bill_id, customer, bill_items, total_amount,
+                    on_done=lambda path, msg=message_action: self.status_label.configure(text=f"{msg}. PDF ready: {path}"),
+                    on_error=lambda error, msg=message_action: self.on_invoice_error(msg, error),
+                )
+            else:
+                self.status_label.configure(text=f"{message_action} successfully for weekly billing.")
+                
+            # 4. Reset state
+            self.editing_bill_id = None
+            self.lines.load()
+            self.app.customer_var.set("Select Customer or Type Name")
+            self.update_bill_totals()
+            
+            # 5. Update other screens (History reloads itself whenever it is shown)
+            if self.app.dashboard_frame:
+                self.app.dashboard_frame.refresh_in_background()
+
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Failed to save/update bill: {e}")
+
+    def on_invoice_error(self, message_action, error):
+        """The bill is saved but its PDF could not be rendered."""
+        self.status_label.configure(text=f"{message_action}. PDF failed.")
+        messagebox.showerror("PDF Failed", f"{message_action}, but its PDF could not be created: {error}\nReprint it from Bill History.")
+
+# --- CUSTOMER MASTER SCREEN CLASS (NEW) ---
+
+class CustomerMasterScreen(ctk.CTkFrame):
+    def __init__(self, master, app_instance):
+        super().__init__(master)
+        self.app = app_instance
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        ctk.CTkLabel(self, text="Customer Master (வாடிக்கையாளர் விவரங்கள்)", font=ctk.CTkFont(size=18, weight="bold")).grid(row=0, column=0, padx=10, pady=(10, 5), sticky="w")
+        
+        # Customer Entry Frame
+        entry_frame = ctk.CTkFrame(self)
+        entry_frame.grid(row=0, column=0, padx=10, pady=5, sticky="ew")
+        entry_frame.grid_columnconfigure(1, weight=1)
+
+        ctk.CTkLabel(entry_frame, text="Customer Name:").grid(row=0, column=0, padx=5, pady=5)
+        self.name_entry = ctk.CTkEntry(entry_frame)
+        self.name_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+        
+        self.action_button = ctk.CTkButton(entry_frame, text="Add/Update Customer", command=self.add_or_update_customer)
+        self.action_button.grid(row=0, column=2, padx=10, pady=5)
+        
+        # Customer List Display
+        self.customer_list_frame = ctk.CTkScrollableFrame(self, label_text="Existing Customers")
+        self.customer_list_frame.grid(row=1, column=0, padx=10, pady=5, sticky="nsew")
+        self.customer_list_frame.grid_columnconfigure(0, weight=1)
+
+        self.load_customers_to_view()
+
+
+    def load_customers_to_view(self):
+        """Fetches and displays all customers in the Customer Master tab."""
+        for widget in self.customer_list_frame.winfo_children():
+            widget.destroy()
+
+        customers = get_customers()
+        
+        # Header Row
+        header_frame = ctk.CTkFrame(self.customer_list_frame, fg_color="transparent")
+        header_frame.grid(row=0, column=0, padx=5, pady=2, sticky="ew")
+        
+        header_frame.grid_columnconfigure(0, weight=5) # Name
+        header_frame.grid_columnconfigure(1, weight=0) # Edit Button container
+        header_frame.grid_columnconfigure(2, weight=0) # Delete Button container
+        
+        ctk.CTkLabel(header_frame, text="CUSTOMER NAME", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, padx=5, sticky="w")
+
+
+        for i, name in enumerate(customers):
+            row_frame = ctk.CTkFrame(self.customer_list_frame, fg_color="transparent")
+            row_frame.grid(row=i + 1, column=0, padx=5, pady=2, sticky="ew")
+            
+            row_frame.grid_columnconfigure(0, weight=5)
+            row_frame.grid_columnconfigure(1, weight=0)
+            row_frame.grid_columnconfigure(2, weight=0)
+
+            ctk.CTkLabel(row_frame, text=name, anchor="w").grid(row=0, column=0, padx=5, sticky="w")
+            
+            # Edit Button
+            edit_btn = ctk.CTkButton(row_frame, text="Edit", width=60, command=lambda n=name: self.prefill_for_edit(n))
+            edit_btn.grid(row=0, column=1, padx=5, sticky="e")
+            
+            # Delete Button
+            delete_btn = ctk.CTkButton(row_frame, text="Delete", width=60, fg_color="red", hover_color="#8B0000", command=lambda n=name: self.delete_customer(n))
+            delete_btn.grid(row=0, column=2, padx=5, sticky="e")
+
+    def prefill_for_edit(self, name):
+        """Fills the entry fields with selected customer data for editing."""
+        self.name_entry.delete(0, 'end')
+        self.name_entry.insert(0, name)
+        self.action_button.configure(text="Update Customer")
+        
+    def add_or_update_customer(self):
+        """Adds a new customer or updates an existing one."""
+        name = self.name_entry.get().strip()
+        
+        if not name:
+            messagebox.showerror("Input Error", "Customer Name cannot be empty.")
+            return
+
+        try:
+            save_customer(name)
+            
+            messagebox.showinfo("Success", f"Customer '{name}' updated/added successfully.")
+            self.name_entry.delete(0, 'end')
+            self.action_button.configure(text="Add/Update Customer")
+            self.load_customers_to_view()
+            if self.app.billing_frame:
+                self.app.billing_frame.load_customer_options() # Refresh options in billing tab
+                
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Failed to save customer: {e}")
+
+    def delete_customer(self, name):
+        """Deletes a customer after confirmation."""
+        if messagebox.askyesno("Confirm Delete", f"Are you sure you want to permanently delete customer '{name}'? This cannot be undone."):
+            try:
+                delete_customer(name)
+                messagebox.showinfo("Deleted", f"Customer '{name}' has been successfully deleted.")
+                
+                self.load_customers_to_view() # Refresh the list view
+                if self.app.billing_frame:
+                    self.app.billing_frame.load_customer_options() # Refresh options in billing tab
+                    
+            except sqlite3.Error as e:
+                messagebox.showerror("Database Error", f"Failed to delete customer: {e}")
+
+
+# --- PRODUCT MASTER SCREEN CLASS ---
+
+class ProductMasterScreen(ctk.CTkFrame):
+    def __init__(self, master, app_instance):
+        super().__init__(master)
+        self.app = app_instance
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        ctk.CTkLabel(self, text="Product Master (விலை & அலகு மாற்றம்)", font=ctk.CTkFont(size=18, weight="bold")).grid(row=0, column=0, padx=10, pady=(10, 5), sticky="w")
+        
+        # Product Entry Frame
+        entry_frame = ctk.CTkFrame(self)
+        entry_frame.grid(row=0, column=0, padx=10, pady=5, sticky="ew")
+        entry_frame.grid_columnconfigure((1, 3, 5), weight=1)
+
+        ctk.CTkLabel(entry_frame, text="Name:").grid(row=0, column=0, padx=5, pady=5)
+        self.name_entry = ctk.CTkEntry(entry_frame)
+        self.name_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+        
+        ctk.CTkLabel(entry_frame, text="Rate/Kg (₹):").grid(row=0, column=2, padx=5, pady=5)
+        self.rate_entry = ctk.CTkEntry(entry_frame)
+        self.rate_entry.grid(row=0, column=3, padx=5, pady=5, sticky="ew")
+        
+        self.add_product_button = ctk.CTkButton(entry_frame, text="Add/Update Product", command=self.add_or_update_product)
+        self.add_product_button.grid(row=0, column=4, padx=10, pady=5)
+        
+        # Product List Display
+        self.product_list_frame = ctk.CTkScrollableFrame(self, label_text="Existing Products")
+        self.product_list_frame.grid(row=1, column=0, padx=10, pady=5, sticky="nsew")
+        self.product_list_frame.grid_columnconfigure(0, weight=1)
+
+        self.load_products_to_view()
+
+
+    def load_products_to_view(self):
+        """Fetches and displays all products in the Product Master tab."""
+        for widget in self.product_list_frame.winfo_children():
+            widget.destroy()
+
+        products = get_catalog().products()
+        
+        # Header Row
+        header_frame = ctk.CTkFrame(self.product_list_frame, fg_color="transparent")
+        header_frame.grid(row=0, column=0, padx=5, pady=2, sticky="ew")
+        
+        # FIX: Adjusted weights for better alignment in Product Master Header (Rate takes up minimal fixed space)
+        header_frame.grid_columnconfigure(0, weight=4) # Name - More space
+        header_frame.grid_columnconfigure(1, weight=1) # Rate - Fixed space
+        header_frame.grid_columnconfigure(2, weight=0) # Edit Button container
+        header_frame.grid_columnconfigure(3, weight=0) # Delete Button container
+        
+        ctk.CTkLabel(header_frame, text="PRODUCT NAME", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, padx=5, sticky="w")
+        ctk.CTkLabel(header_frame, text="RATE/KG (₹)", font=ctk.CTkFont(weight="bold")).grid(row=0, column=1, padx=5, sticky="w")
+
+
+        for i, product in enumerate(products):
+            # product is (name, rate_per_kg)
+            try:
+                pname, prate = product
+            except Exception:
+                # defensive fallback if schema changes
+                pname = str(product)
+                prate = 0.0
+
+            row_frame = ctk.CTkFrame(self.product_list_frame, fg_color="transparent")
+            row_frame.grid(row=i + 1, column=0, padx=5, pady=2, sticky="ew")
+
+            # Adjusted weights for better alignment in Product Master Rows
+            row_frame.grid_columnconfigure(0, weight=4)
+            row_frame.grid_columnconfigure(1, weight=1)
+            row_frame.grid_columnconfigure(2, weight=0) # Edit button
+            row_frame.grid_columnconfigure(3, weight=0) # Delete button
+
+            ctk.CTkLabel(row_frame, text=pname, anchor="w").grid(row=0, column=0, padx=5, sticky="w")
+            # Align the rate to the left for consistency
+            ctk.CTkLabel(row_frame, text=f"₹{prate:.2f}", anchor="w").grid(row=0, column=1, padx=5, sticky="w") 
+
+            # Edit Button
+            edit_btn = ctk.CTkButton(row_frame, text="Edit", width=60, command=lambda n=pname, r=prate: self.prefill_for_edit(n, r))
+            edit_btn.grid(row=0, column=2, padx=5, sticky="e")
+
+            # Delete Button
+            delete_btn = ctk.CTkButton(row_frame, text="Delete", width=60, fg_color="red", hover_color="#8B0000", command=lambda n=pname: self.delete_product(n))
+            delete_btn.grid(row=0, column=3, padx=5, sticky="e") # Placed next to Edit
+
+    def prefill_for_edit(self, name, rate):
+        """Fills the entry fields with selected product data for editing."""
+        self.name_entry.delete(0, 'end')
+        self.name_entry.insert(0, name)
+        self.rate_entry.delete(0, 'end')
+        self.rate_entry.insert(0, str(rate))
+        
+    def add_or_update_product(self):
+        """Adds a new product or updates an existing one."""
+        name = self.name_entry.get().strip()
+        try:
+            rate = float(self.rate_entry.get())
+        except ValueError:
+            messagebox.showerror("Input Error", "Rate must be a valid number.")
+            return
+
+        if not name:
+            messagebox.showerror("Input Error", "Product Name cannot be empty.")
+            return
+
+        try:
+            save_product(name, rate)
+            
+            messagebox.showinfo("Success", f"Product '{name}' updated/added successfully.")
+            self.name_entry.delete(0, 'end')
+            self.rate_entry.delete(0, 'end')
+            self.load_products_to_view()
+            if self.app.billing_frame:
+                self.app.billing_frame.load_product_options() # Refresh options in billing tab
+                
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Failed to save product: {e}")
+
+    def delete_product(self, name):
+        """Deletes a product after confirmation."""
+        # Use a custom dialog or a standard messagebox.askyesno for confirmation
+        # Since tkinter's messagebox is used elsewhere, we stick to it for consistency
+        
+        if messagebox.askyesno("Confirm Delete", f"Are you sure you want to permanently delete '{name}'? This cannot be undone."):
+            try:
+                # Delete the product based on its unique name
+                delete_product(name)
+                messagebox.showinfo("Deleted", f"Product '{name}' has been successfully deleted.")
+                
+                self.load_products_to_view() # Refresh the list view
+                if self.app.billing_frame:
+                    self.app.billing_frame.load_product_options() # Refresh options in billing tab
+                    
+            except sqlite3.Error as e:
+                messagebox.showerror("Database Error", f"Failed to delete product: {e}")
+
+
+# --- VIRTUALIZED LIST ---
+
+class VirtualList(ctk.CTkFrame):
+    """Scrollable list that only has widgets for the rows on screen.
+
+    ``source`` needs ``len()`` and ``get(index)``. ``make_row(parent)`` builds
+    one reusable row widget and ``fill_row(widget, row)`` points it at a data
+    row. Scrolling re-fills the same pooled widgets, so a year of bills costs
+    no more widgets than one screenful.
+    """
+
+    def __init__(self, master, source, make_row, fill_row, row_height=44, **kwargs):
+        super().__init__(master, **kwargs)
+        self.source = source
+        self.make_row = make_row
+        self.fill_row = fill_row
+        self.row_height = row_height
+        self.top = 0  # index of the first visible row
+        self._pool = []
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.body.bind("<Configure>", self._on_resize)
+        # Wheel events go to the widget under the pointer (often a row label)
+        self.bind_all("<MouseWheel>", self._on_wheel, add="+")
+        self.bind_all("<Button-4>", self._on_wheel, add="+")
+        self.bind_all("<Button-5>", self._on_wheel, add="+")
+
+    def _visible_count(self):
+        return max(1, self.body.winfo_height() // self.row_height)
+
+    def _on_resize(self, event):
+        # One spare row so a partly visible last row is still drawn
+        while len(self._pool) < event.height // self.row_height + 1:
+            self._pool.append(self.make_row(self.body))
+        self.refresh()
+
+    def refresh(self):
+        """Re-reads the visible rows from the source (after it changed)."""
+        total = len(self.source)
+        visible = self._visible_count()
+        self.top = max(0, min(self.top, total - visible))
+        for i, widget in enumerate(self._pool):
+            row = self.source.get(self.top + i) if self.top + i < total else None
+            if row is None:
+                widget.place_forget()
+            else:
+                self.fill_row(widget, row)
+                widget.place(x=0, y=i * self.row_height, relwidth=1)
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_to(self, top):
+        top = max(0, top)
+        if top != self.top:
+            self.top = top
+            self.refresh()
+
+    def _on_scrollbar(self, action, value, unit="units"):
+        if action == "moveto":
+            self.scroll_to(int(float(value) * len(self.source)))
+        else:
+            step = self._visible_count() if unit == "pages" else 3
+            self.scroll_to(self.top + (step if float(value) > 0 else -step))
+
+    def _on_wheel(self, event):
+        widget = str(event.widget)
+        if not self.winfo_exists() or not (widget == str(self) or widget.startswith(str(self) + ".")):
+            return
+        down = event.num == 5 or getattr(event, "delta", 0) < 0
+        self.scroll_to(self.top + (3 if down else -3))
+
+
+# --- HISTORY SCREEN CLASS ---
+
+HISTORY_ROW_HEIGHT = 44  # pixels per history row, including padding
+
+
+class HistoryScreen(ctk.CTkFrame):
+    def __init__(self, master, app_instance):
+        super().__init__(master)
+        self.app = app_instance
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(3, weight=1)
+
+        ctk.CTkLabel(self, text="Sales History (பில் வரலாறு)", font=ctk.CTkFont(size=18, weight="bold")).grid(row=0, column=0, padx=10, pady=(10, 5), sticky="w")
+        
+        # New Frame for Clear/Undo Buttons
+        control_frame = ctk.CTkFrame(self)
+        control_frame.grid(row=0, column=0, padx=10, pady=(10, 5), sticky="e")
+        
+        self.clear_all_button = ctk.CTkButton(control_frame, text="Clear All History", fg_color="darkred", hover_color="#8B0000", command=self.clear_all_history)
+        self.clear_all_button.grid(row=0, column=0, padx=5)
+        
+        self.undo_button = ctk.CTkButton(control_frame, text="Undo Delete", state="disabled", command=self.undo_delete)
+        self.undo_button.grid(row=0, column=1, padx=5)
+        self.update_undo_button_state() # Initial state check
+
+        self.reprint_button = ctk.CTkButton(control_frame, text="Reprint Range...", command=self.open_reprint_dialog)
+        self.reprint_button.grid(row=0, column=2, padx=5)
+
+        self.day_end_button = ctk.CTkButton(control_frame, text="Day-End Print", command=self.day_end_print)
+        self.day_end_button.grid(row=0, column=3, padx=5)
+        
+        # NEW: Weekly Billing Controls
+        weekly_control_frame = ctk.CTkFrame(self)
+        weekly_control_frame.grid(row=0, column=0, padx=10, pady=(10, 5), sticky="nsw")
+        
+        ctk.CTkLabel(weekly_control_frame, text="Weekly Bill Options:", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, columnspan=2, padx=5, pady=5, sticky="w")
+        
+        # Customer Dropdown for Weekly Filter
+        self.weekly_customer_options = get_customers()
+        self.weekly_customer_var = ctk.StringVar(value="Select Customer")
+        self.weekly_customer_dropdown = ctk.CTkOptionMenu(weekly_control_frame, variable=self.weekly_customer_var, values=self.weekly_customer_options, width=150)
+        self.weekly_customer_dropdown.grid(row=1, column=0, padx=5, pady=5, sticky="w")
+
+        # Any day of the week to bill (Monday to Sunday); defaults to this week
+        self.weekly_day_entry = ctk.CTkEntry(weekly_control_frame, width=110, placeholder_text="Week of YYYY-MM-DD")
+        self.weekly_day_entry.insert(0, week_window()[0])
+        self.weekly_day_entry.grid(row=1, column=1, padx=5, pady=5)
+
+        # Generate Weekly Bill Button
+        self.generate_weekly_button = ctk.CTkButton(weekly_control_frame, text="Generate Weekly Bill", command=self.generate_weekly_bill)
+        self.generate_weekly_button.grid(row=1, column=2, padx=5, pady=5)
+
+        # Statements for every customer with bills that week, rendered in the background
+        self.statement_run_button = ctk.CTkButton(weekly_control_frame, text="All Customers...", command=self.start_statement_run)
+        self.statement_run_button.grid(row=1, column=3, padx=5, pady=5)
+        
+        # Need to update customer list in dropdown when history is loaded/refreshed
+        self.load_weekly_customer_options()
+        
+
+        
+        # Search / filter bar (blank fields are ignored)
+        filter_frame = ctk.CTkFrame(self)
+        filter_frame.grid(row=1, column=0, padx=10, pady=5, sticky="ew")
+        self.filter_entries = {}
+        filter_fields = [
+            ('customer', "Customer", 150), ('start_date', "From (YYYY-MM-DD)", 120),
+            ('end_date', "To (YYYY-MM-DD)", 120), ('bill_id', "Bill ID", 70),
+            ('min_amount', "Min ₹", 70), ('max_amount', "Max ₹", 70), ('product', "Product", 170),
+        ]
+        for column, (field, placeholder, width) in enumerate(filter_fields):
+            if field in ('customer', 'product'):
+                entry = ctk.CTkComboBox(filter_frame, values=[], width=width)
+                entry.set("")
+            else:
+                entry = ctk.CTkEntry(filter_frame, placeholder_text=placeholder, width=width)
+                entry.bind("<Return>", lambda event: self.apply_filters())
+            entry.grid(row=0, column=column, padx=3, pady=5)
+            self.filter_entries[field] = entry
+        ctk.CTkButton(filter_frame, text="Search", width=70, command=self.apply_filters).grid(row=0, column=len(filter_fields), padx=3)
+        ctk.CTkButton(filter_frame, text="Clear", width=60, command=self.clear_filters).grid(row=0, column=len(filter_fields) + 1, padx=3)
+        self.result_label = ctk.CTkLabel(filter_frame, text="")
+        self.result_label.grid(row=0, column=len(filter_fields) + 2, padx=10, sticky="w")
+
+        # Header Row
+        header_frame = ctk.CTkFrame(self, fg_color="transparent")
+        header_frame.grid(row=2, column=0, padx=(15, 30), pady=(5, 0), sticky="ew")
+        self.configure_history_columns(header_frame)
+        ctk.CTkLabel(header_frame, text="BILL ID", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, padx=5, sticky="w")
+        ctk.CTkLabel(header_frame, text="DATE & TIME", font=ctk.CTkFont(weight="bold")).grid(row=0, column=1, padx=5, sticky="w")
+        ctk.CTkLabel(header_frame, text="CUSTOMER", font=ctk.CTkFont(weight="bold")).grid(row=0, column=2, padx=5, sticky="w")
+        ctk.CTkLabel(header_frame, text="TOTAL (₹)", font=ctk.CTkFont(weight="bold")).grid(row=0, column=3, padx=5, sticky="w")
+        # Placeholders keep the header aligned with the row buttons
+        for column, width in ((4, 80), (5, 80), (6, 60)):
+            ctk.CTkFrame(header_frame, width=width, height=1, fg_color="transparent").grid(row=0, column=column, padx=5)
+
+        # Bills are paged in by keyset as the list scrolls; only visible rows have widgets
+        self.history_pager = HistoryPager()
+        self.history_list = VirtualList(self, self.history_pager, self.make_history_row, self.fill_history_row,
+                                        row_height=HISTORY_ROW_HEIGHT)
+        self.history_list.grid(row=3, column=0, padx=10, pady=5, sticky="nsew")
+
+    @staticmethod
+    def configure_history_columns(frame):
+        frame.grid_columnconfigure(0, weight=1) # Bill ID
+        frame.grid_columnconfigure(1, weight=2) # Date & Time - more space
+        frame.grid_columnconfigure(2, weight=3) # Customer - most space
+        frame.grid_columnconfigure(3, weight=1) # Total
+        frame.grid_columnconfigure(4, weight=0) # View button column
+        frame.grid_columnconfigure(5, weight=0) # Print button column
+        frame.grid_columnconfigure(6, weight=0) # Delete button column
+
+    def make_history_row(self, parent):
+        """Builds one reusable history row (filled by fill_history_row)."""
+        row_frame = ctk.CTkFrame(parent, height=HISTORY_ROW_HEIGHT - 6, fg_color=("gray80", "gray25"))
+        row_frame.grid_propagate(False)
+        row_frame.grid_rowconfigure(0, weight=1)
+        self.configure_history_columns(row_frame)
+        row_frame.labels = [ctk.CTkLabel(row_frame, text="") for _ in range(3)]
+        row_frame.labels.append(ctk.CTkLabel(row_frame, text="", font=ctk.CTkFont(weight="bold")))
+        for column, label in enumerate(row_frame.labels):
+            label.grid(row=0, column=column, padx=5, sticky="w")
+        row_frame.view_btn = ctk.CTkButton(row_frame, text="View Details", width=80)
+        row_frame.view_btn.grid(row=0, column=4, padx=5, sticky="e")
+        row_frame.print_btn = ctk.CTkButton(row_frame, text="Print Again", width=80)
+        row_frame.print_btn.grid(row=0, column=5, padx=5, sticky="e")
+        row_frame.delete_btn = ctk.CTkButton(row_frame, text="Delete", width=60, fg_color="red", hover_color="#8B0000")
+        row_frame.delete_btn.grid(row=0, column=6, padx=5, sticky="e")
+        return row_frame
+
+    def fill_history_row(self, row_frame, sale):
+        """Points a pooled row at one bill header; line items are loaded when a button is used."""
+        bill_id, date, customer, total = sale
+        for label, text in zip(row_frame.labels, (str(bill_id), date, customer, f"₹{total:.2f}")):
+            label.configure(text=text)
+        row_frame.view_btn.configure(command=lambda: self.view_bill_details(bill_id, date, customer, None, total))
+        row_frame.print_btn.configure(command=lambda: self.regenerate_pdf(bill_id, customer, None, total))
+        row_frame.delete_btn.configure(command=lambda: self.delete_individual_bill((bill_id, date, customer, total, None)))
+        
+    def load_weekly_customer_options(self):
+        customers = get_customers()
+        if customers:
+            self.weekly_customer_options = customers
+            self.weekly_customer_dropdown.configure(values=self.weekly_customer_options)
+            if self.weekly_customer_var.get() not in customers:
+                self.weekly_customer_var.set("Select Customer")
+
+    def generate_weekly_bill(self):
+        """Consolidates a customer's bills for the chosen week into a single PDF."""
+        customer = self.weekly_customer_var.get()
+        if customer == "Select Customer" or not customer:
+            messagebox.showerror("Error", "Please select a customer for weekly billing.")
+            return
+        try:
+            start_date, end_date = week_window(self.weekly_day_entry.get().strip() or None)
+        except ValueError:
+            messagebox.showerror("Error", "Week must be a date in YYYY-MM-DD format.")
+            return
+
+        if not messagebox.askyesno("Confirm Weekly Bill", f"Generate consolidated bill for {customer}\nfrom {start_date} to {end_date}?"):
+            return
+
+        # 1. Consolidate the week's bills (streamed, summed per product and rate)
+        result = consolidate_customer(customer, start_date, end_date)
+
+        if not result.bill_count:
+            messagebox.showinfo("Info", f"No saved bills found for customer: {customer} from {start_date} to {end_date}.")
+            return
+
+        # 2. Generate PDF in the render engine (using bill_id=0 as flag for consolidated bill)
+        self.app.render_invoice_async(
+            0, customer, result.items, result.total_amount,
+            title="WEEKLY CONSOLIDATED INVOICE",
+            date_range=result.date_range,
+            on_done=lambda path: self.offer_delete_consolidated(result),
+        )
+
+    def offer_delete_consolidated(self, result):
+        """Called once the consolidated PDF is written."""
+        # 3. Optional: Delete the merged individual bills after successful consolidation/printing
+        if messagebox.askyesno("Consolidation Complete", f"Consolidated bill generated for {result.customer}.\nTotal: ₹{result.total_amount:,.2f}.\n\nDo you want to delete the {result.bill_count} individual daily bills for this period?\n(Undo can restore them.)"):
+            deleted = delete_consolidated(result)
+            self.after_bills_changed()
+            messagebox.showinfo("Success", f"Consolidated Bill saved and {deleted} original bills deleted.")
+
+    def start_statement_run(self):
+        """Weekly statements for all customers of the chosen week, with a progress window."""
+        try:
+            start_date, end_date = week_window(self.weekly_day_entry.get().strip() or None)
+        except ValueError:
+            messagebox.showerror("Error", "Week must be a date in YYYY-MM-DD format.")
+            return
+        if not messagebox.askyesno("Statement Run", f"Generate weekly statements for ALL customers with bills\nfrom {start_date} to {end_date}?\n\nAn interrupted run continues where it stopped."):
+            return
+
+        dialog = ctk.CTkToplevel(self.app)
+        dialog.title("Statement Run")
+        dialog.geometry("380x120")
+        dialog.attributes("-topmost", True)
+        progress_label = ctk.CTkLabel(dialog, text="Finding customers...")
+        progress_label.pack(padx=15, pady=(15, 5))
+        progress_bar = ctk.CTkProgressBar(dialog)
+        progress_bar.set(0)
+        progress_bar.pack(fill="x", padx=15, pady=10)
+
+        # (done, total, failed), written by the worker thread and read by the UI poll
+        self.statement_progress = (0, 0, 0)
+        self.statement_running = True
+        self.statement_run_button.configure(state="disabled")
+
+        def record_progress(done, total, failed):
+            self.statement_progress = (done, total, failed)
+
+        def poll():
+            if not dialog.winfo_exists():
+                return
+            done, total, failed = self.statement_progress
+            if total:
+                progress_bar.set(done / total)
+                progress_label.configure(text=f"{done} of {total} customers" + (f" ({failed} failed)" if failed else ""))
+            if self.statement_running:
+                dialog.after(200, poll)
+            else:
+                dialog.destroy()
+
+        self.app.tasks.submit(
+            "Statement run",
+            lambda: run_statements(start_date, end_date, "WEEKLY STATEMENT", progress=record_progress),
+            on_done=self.on_statement_run_done, on_error=self.on_statement_run_error,
+        )
+        poll()
+
+    def on_statement_run_done(self, result):
+        self.statement_running = False
+        self.statement_run_button.configure(state="normal")
+        if not result.customers:
+            messagebox.showinfo("Statement Run", "No bills recorded in that week.")
+            return
+        messagebox.showinfo("Statement Run Complete", format_statement_result(result))
+
+    def on_statement_run_error(self, error):
+        self.statement_running = False
+        self.statement_run_button.configure(state="normal")
+        messagebox.showerror("Statement Run Failed", f"The statement run stopped: {error}\nRun it again to continue.")
+
+    def load_sales_history(self):
+        """Reloads the history list from the first page, keeping the scroll position."""
+        self.load_weekly_customer_options() # Reload customers in case one was added/deleted
+        self.filter_entries['customer'].configure(values=[""] + get_customers())
+        self.filter_entries['product'].configure(values=[""] + get_catalog().names())
+        self.history_pager.reset()
+        self.history_list.refresh()
+        self.update_result_label()
+
+    def read_filters(self):
+        """Builds a HistoryFilter from the filter bar; raises ValueError for bad input."""
+        values = {field: entry.get().strip() or None for field, entry in self.filter_entries.items()}
+        for field in ('start_date', 'end_date'):
+            if values[field]:
+                try:
+                    datetime.strptime(values[field], '%Y-%m-%d')
+                except ValueError:
+                    raise ValueError("Dates must be in YYYY-MM-DD format.")
+        try:
+            if values['bill_id']:
+                values['bill_id'] = int(values['bill_id'])
+            for field in ('min_amount', 'max_amount'):
+                if values[field]:
+                    values[field] = float(values[field])
+        except ValueError:
+            raise ValueError("Bill ID and amounts must be numbers.")
+        return HistoryFilter(**values)
+
+    def apply_filters(self):
+        try:
+            filters = self.read_filters()
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.history_pager.set_filters(filters if any(v is not None for v in filters) else None)
+        self.history_list.top = 0
+        self.history_list.refresh()
+        self.update_result_label()
+
+    def clear_filters(self):
+        for field, entry in self.filter_entries.items():
+            if field in ('customer', 'product'):
+                entry.set("")
+            else:
+                entry.delete(0, "end")
+        self.apply_filters()
+
+    def update_result_label(self):
+        self.result_label.configure(text=f"{len(self.history_pager)} bills, ₹{self.history_pager.total_amount:,.2f}")
+
+    def update_undo_button_state(self):
+        """Shows the newest undoable delete on the Undo button (disabled when there is none)."""
+        latest = undo_stack(limit=1)
+        if latest:
+            action = latest[0].action
+            self.undo_button.configure(state="normal", text=f"Undo: {action if len(action) <= 28 else action[:27] + '…'}")
+        else:
+            self.undo_button.configure(state="disabled", text="Undo Delete")
+
+    def after_bills_changed(self):
+        self.load_sales_history()
+        self.update_undo_button_state()
+        if self.app.dashboard_frame:
+            self.app.dashboard_frame.load_report_data()
+
+    def delete_individual_bill(self, sale_data):
+        """Deletes a specific bill (it can be restored with Undo)."""
+        bill_id, date, customer, total, items_json = sale_data
+
+        if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete Bill ID {bill_id}?\nTotal: ₹{total:.2f}"):
+            try:
+                if delete_bill(bill_id) is None:
+                    messagebox.showinfo("Archived", f"Bill ID {bill_id} is in an archived year and cannot be deleted.")
+                    return
+                messagebox.showinfo("Deleted", f"Bill ID {bill_id} deleted. Click 'Undo' to restore it.")
+                self.after_bills_changed()
+            except sqlite3.Error as e:
+                messagebox.showerror("Database Error", f"Failed to delete bill: {e}")
+
+    def undo_delete(self):
+        """Restores the bills of the most recent delete; earlier deletes can be undone in turn."""
+        try:
+            entry = undo_last()
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Failed to restore bills: {e}")
+            return
+        if entry is None:
+            messagebox.showinfo("Info", "Nothing to undo.")
+        else:
+            messagebox.showinfo("Restored", f"Undone: {entry.action} ({entry.bill_count} bill(s) restored).")
+        self.after_bills_changed()
+
+    def clear_all_history(self):
+        """Deletes all sales history records after confirmation (undoable)."""
+        if messagebox.askyesno("Confirm Clear ALL", f"This will delete ALL sales history records.\nThey can be restored with Undo for {UNDO_KEEP_DAYS} days. Continue?"):
+            try:
+                clear_history()
+                messagebox.showinfo("Cleared", "All sales history records have been deleted.")
+                self.after_bills_changed()
+            except sqlite3.Error as e:
+                messagebox.showerror("Database Error", f"Failed to clear history: {e}")
+
+    def regenerate_pdf(self, bill_id, customer, items_json, total_amount):
+        """Regenerates the PDF for a selected historical bill (rendered in the background)."""
+        try:
+            items = load_bill_items(bill_id, items_json)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to regenerate PDF: {e}")
+            return
+        self.app.render_invoice_async(
+            bill_id, customer, items, total_amount,
+            on_done=lambda pdf_path: messagebox.showinfo("PDF Generated", f"Bill (ID: {bill_id}) PDF re-generated at:\n{pdf_path}\nReady for printing."),
+        )
+
+    def open_reprint_dialog(self):
+        """Asks for a date range and/or customers and reprints all matching bills."""
+        dialog = ctk.CTkToplevel(self.app)
+        dialog.title("Reprint Bills")
+        dialog.geometry("420x230")
+        dialog.attributes("-topmost", True)
+        dialog.grid_columnconfigure(1, weight=1)
+
+        today = datetime.now().strftime('%Y-%m-%d')
+        ctk.CTkLabel(dialog, text="From (YYYY-MM-DD):").grid(row=0, column=0, padx=10, pady=(15, 5), sticky="w")
+        from_entry = ctk.CTkEntry(dialog)
+        from_entry.insert(0, today)
+        from_entry.grid(row=0, column=1, padx=10, pady=(15, 5), sticky="ew")
+
+        ctk.CTkLabel(dialog, text="To (YYYY-MM-DD):").grid(row=1, column=0, padx=10, pady=5, sticky="w")
+        to_entry = ctk.CTkEntry(dialog)
+        to_entry.insert(0, today)
+        to_entry.grid(row=1, column=1, padx=10, pady=5, sticky="ew")
+
+        ctk.CTkLabel(dialog, text="Customers (comma separated,\nblank = all):").grid(row=2, column=0, padx=10, pady=5, sticky="w")
+        customers_entry = ctk.CTkEntry(dialog)
+        customers_entry.grid(row=2, column=1, padx=10, pady=5, sticky="ew")
+
+        def _start():
+            start_date = from_entry.get().strip() or None
+            end_date = to_entry.get().strip() or None
+            try:
+                for value in (start_date, end_date):
+                    if value:
+                        datetime.strptime(value, '%Y-%m-%d')
+            except ValueError:
+                messagebox.showerror("Error", "Dates must be in YYYY-MM-DD format.", parent=dialog)
+                return
+            customers = [c.strip() for c in customers_entry.get().split(',') if c.strip()] or None
+            dialog.destroy()
+            self.reprint_button.configure(state="disabled")
+            self.app.tasks.submit(
+                "Reprint bills", reprint_bills, start_date, end_date, customers,
+                on_done=self.on_reprint_done, on_error=self.on_reprint_error,
+            )
+
+        ctk.CTkButton(dialog, text="Reprint", command=_start).grid(row=3, column=0, columnspan=2, padx=10, pady=15)
+        dialog.grab_set()
+
+    def on_reprint_done(self, result):
+        self.reprint_button.configure(state="normal")
+        messagebox.showinfo("Reprint Complete", format_result(result))
+
+    def on_reprint_error(self, error):
+        self.reprint_button.configure(state="normal")
+        messagebox.showerror("Reprint Failed", f"Batch reprint failed: {error}")
+
+    def day_end_print(self):
+        """Renders all of today's bills into one PDF, with a summary page in front."""
+        self.day_end_button.configure(state="disabled")
+        self.app.tasks.submit(
+            "Day-end print", print_day_end,
+            on_done=self.on_day_end_done, on_error=self.on_day_end_error,
+        )
+
+    def on_day_end_done(self, result):
+        self.day_end_button.configure(state="normal")
+        if result.pdf_path is None:
+            messagebox.showinfo("Day-End Print", "No bills recorded today.")
+            return
+        messagebox.showinfo(
+            "Day-End Print",
+            f"{result.bill_count} bills (₹{result.total_amount:,.2f}) saved in one PDF:\n{result.pdf_path}\nReady for printing.",
+        )
+
+    def on_day_end_error(self, error):
+        self.day_end_button.configure(state="normal")
+        messagebox.showerror("Day-End Print Failed", f"Could not create the day-end PDF: {error}")
+
+    def view_bill_details(self, bill_id, date, customer, items_json, total_amount):
+        """Displays the full details of a selected bill in a new modal window."""
+        items = load_bill_items(bill_id, items_json)
+
+        # Create a Toplevel window for the modal view
+        view_window = ctk.CTkToplevel(self.app)
+        view_window.title(f"Bill Details - ID: {bill_id}")
+        view_window.geometry("600x450")
+        view_window.attributes("-topmost", True) # Keep window on top
+        view_window.grid_columnconfigure(0, weight=1)
+        view_window.grid_rowconfigure(2, weight=1)
+        
+        # Data for passing to load_bill_for_edit
+        bill_data_for_edit = (bill_id, customer, items_json, total_amount)
+
+        # Header Info
+        header_label = ctk.CTkLabel(view_window, text=f"Bill ID: {bill_id} | Date: {date}", font=ctk.CTkFont(size=16, weight="bold"))
+        header_label.grid(row=0, column=0, padx=20, pady=10, sticky="w")
+        ctk.CTkLabel(view_window, text=f"Customer: {customer}", font=ctk.CTkFont(size=14)).grid(row=1, column=0, padx=20, pady=(0, 10), sticky="w")
+        
+        # Itemized List Frame
+        list_frame = ctk.CTkScrollableFrame(view_window, label_text="Itemized Breakdown")
+        list_frame.grid(row=2, column=0, padx=20, pady=10, sticky="nsew")
+        list_frame.grid_columnconfigure(0, weight=4)
+        list_frame.grid_columnconfigure(1, weight=2)
+        list_frame.grid_columnconfigure(2, weight=1)
+        list_frame.grid_columnconfigure(3, weight=1)
+
+        # Item List Header
+        ctk.CTkLabel(list_frame, text="PRODUCT", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        ctk.CTkLabel(list_frame, text="QUANTITY", font=ctk.CTkFont(weight="bold")).grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        ctk.CTkLabel(list_frame, text="RATE", font=ctk.CTkFont(weight="bold")).grid(row=0, column=2, padx=5, pady=5, sticky="w")
+        ctk.CTkLabel(list_frame, text="TOTAL", font=ctk.CTkFont(weight="bold")).grid(row=0, column=3, padx=5, pady=5, sticky="w")
+
+        # Populate Items
+        for i, item in enumerate(items):
+            name, quantity, rate, total = item
+            ctk.CTkLabel(list_frame, text=name).grid(row=i+1, column=0, padx=5, pady=2, sticky="w")
+            ctk.CTkLabel(list_frame, text=format_quantity(quantity)).grid(row=i+1, column=1, padx=5, pady=2, sticky="w")
+            ctk.CTkLabel(list_frame, text=f"@{rate:.2f}").grid(row=i+1, column=2, padx=5, pady=2, sticky="w")
+            ctk.CTkLabel(list_frame, text=f"₹{total:.2f}", font=ctk.CTkFont(weight="bold")).grid(row=i+1, column=3, padx=5, pady=2, sticky="w")
+
+        # Footer Total
+        footer_frame = ctk.CTkFrame(view_window)
+        footer_frame.grid(row=3, column=0, padx=20, pady=10, sticky="ew")
+        footer_frame.grid_columnconfigure(0, weight=1)
+        footer_frame.grid_columnconfigure(1, weight=1)
+        
+        ctk.CTkLabel(footer_frame, text=f"GRAND TOTAL: ₹{total_amount:.2f}", font=ctk.CTkFont(size=16, weight="bold"), text_color="lightgreen").grid(row=0, column=0, padx=20, pady=10, sticky="e")
+        
+        # New Edit Button in Modal
+        def _on_edit_bill():
+            view_window.destroy()
+            self.app.billing_frame.load_bill_for_edit(bill_data_for_edit)
+
+        edit_button = ctk.CTkButton(footer_frame, text="Edit Bill", command=_on_edit_bill)
+        if find_archived_bill(bill_id):
+            edit_button.configure(state="disabled", text="Archived (read-only)")
+        edit_button.grid(row=0, column=1, padx=20, pady=10, sticky="w")
+        
+        view_window.grab_set() # Make the modal window exclusive
+
+
+# --- APPLICATION START ---
+def run():
+    """Builds the main window and runs the Tk event loop."""
+    app = App()
+    app.mainloop()
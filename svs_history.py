@@ -0,0 +1,246 @@
+"""Paged, filterable access to the sales history for the History screen.
+
+The screen used to load every bill, items_json included, and build widgets
+for all of them. HistoryPager instead fetches bill headers (no line items)
+a page at a time by keyset on bill_id, newest first, and only as far as the
+list has been scrolled. Line items are loaded when a bill is opened.
+
+A HistoryFilter narrows the list by customer, date range, bill id, amount
+range and product. Customer, dates, bill id and product are answered from
+indexes (idx_live_bills_customer_date, idx_live_bills_date, the rowid and
+idx_sales_items_product_name); the amount range is checked on the rows
+those produce. Bills that migrate_items_json() has not reached yet are
+matched by product through their items_json (idx_legacy_bills). Counts come
+from daily_sales_rollup whenever the filter is only customer and/or dates.
+Deleted bills (tombstones) are never listed.
+
+Archived years (svs_archive) are part of the history: a page or count whose
+filter reaches them also queries their archive files, and pages are merged
+by bill_id. An archive is only opened once the list scrolls past the bills
+in the hot database, or the filter asks for its dates. Counts of whole
+archived years come from their sales_archives row without opening the file.
+"""
+import heapq
+from collections import namedtuple
+from datetime import date, timedelta
+
+from svs_archive import archives_between, attach_archive, qualify
+from svs_db import get_db
+
+HISTORY_PAGE_SIZE = 200
+
+# Keyset page: walks the rowid (bill_id) b-tree backwards from the last row
+# seen, so page N costs the same as page 1. items_json is never read.
+HISTORY_FIRST_PAGE_SQL = '''
+    SELECT bill_id, transaction_date, customer_name, total_amount
+    FROM sales_history
+    WHERE deleted_at IS NULL
+    ORDER BY bill_id DESC
+    LIMIT ?
+'''
+HISTORY_PAGE_SQL = '''
+    SELECT bill_id, transaction_date, customer_name, total_amount
+    FROM sales_history
+    WHERE bill_id < ? AND deleted_at IS NULL
+    ORDER BY bill_id DESC
+    LIMIT ?
+'''
+
+# Bills with a line of one product: from sales_items, plus the lines of
+# bills not migrated yet, still in items_json (list or dict rows)
+PRODUCT_BILLS_SQL = '''
+    SELECT bill_id FROM sales_items WHERE product_name = ?
+    UNION ALL
+    SELECT h.bill_id FROM sales_history h, json_each(h.items_json) j
+    WHERE h.items_json != ''
+      AND COALESCE(json_extract(j.value, '$.name'), json_extract(j.value, '$[0]')) = ?
+'''
+
+# Every field optional; dates are 'YYYY-MM-DD' and inclusive, amounts inclusive
+HistoryFilter = namedtuple(
+    'HistoryFilter', 'customer start_date end_date bill_id min_amount max_amount product',
+    defaults=(None,) * 7,
+)
+
+
+def _day_after(day):
+    return (date.fromisoformat(str(day)[:10]) + timedelta(days=1)).isoformat()
+
+
+def _archives(filters, db):
+    """Archives that may hold bills matching filters, newest first."""
+    if filters is None:
+        return archives_between(db=db)
+    archives = archives_between(filters.start_date, filters.end_date, db)
+    if filters.bill_id is not None:
+        archives = [info for info in archives if info.first_bill_id <= int(filters.bill_id) <= info.last_bill_id]
+    return archives
+
+
+def _where(filters):
+    """WHERE conditions and parameters for a HistoryFilter (live bills only)."""
+    conditions, params = [], []
+    if filters is None:
+        return conditions, params
+    conditions.append("deleted_at IS NULL")
+    if filters.bill_id is not None:
+        conditions.append("bill_id = ?")
+        params.append(int(filters.bill_id))
+    if filters.customer:
+        conditions.append("customer_name = ?")
+        params.append(filters.customer)
+    if filters.start_date:
+        conditions.append("transaction_date >= ?")
+        params.append(str(filters.start_date)[:10])
+    if filters.end_date:
+        conditions.append("transaction_date < ?")
+        params.append(_day_after(filters.end_date))
+    if filters.min_amount is not None:
+        conditions.append("total_amount >= ?")
+        params.append(float(filters.min_amount))
+    if filters.max_amount is not None:
+        conditions.append("total_amount <= ?")
+        params.append(float(filters.max_amount))
+    if filters.product:
+        conditions.append(f"bill_id IN ({PRODUCT_BILLS_SQL})")
+        params += [filters.product, filters.product]
+    return conditions, params
+
+
+def get_history_page(before_id=None, limit=HISTORY_PAGE_SIZE, filters=None, db=None):
+    """Up to ``limit`` matching bills older than before_id (newest first when None).
+
+    Rows are (bill_id, transaction_date, customer_name, total_amount).
+    """
+    db = db or get_db()
+    rows = _page('main', before_id, limit, filters, db)
+    for info in _archives(filters, db):
+        if len(rows) >= limit and rows[-1][0] > info.last_bill_id:
+            continue  # the page is full of newer bills
+        archived = _page(attach_archive(info.year, db), before_id, limit, filters, db)
+        rows = list(heapq.merge(rows, archived, key=lambda row: row[0], reverse=True))[:limit]
+    return rows
+
+
+def _page(schema, before_id, limit, filters, db):
+    conditions, params = _where(filters)
+    if not conditions:
+        if before_id is None:
+            return db.query(qualify(HISTORY_FIRST_PAGE_SQL, schema), (limit,))
+        return db.query(qualify(HISTORY_PAGE_SQL, schema), (before_id, limit))
+    if before_id is not None:
+        conditions.append("bill_id < ?")
+        params.append(before_id)
+    return db.query(qualify(
+        "SELECT bill_id, transaction_date, customer_name, total_amount FROM sales_history"
+        f" WHERE {' AND '.join(conditions)} ORDER BY bill_id DESC LIMIT ?", schema),
+        params + [limit],
+    )
+
+
+def count_history(filters=None, db=None):
+    """(bill count, total amount) of the bills matching filters."""
+    db = db or get_db()
+    count, total_amount = _count('main', filters, db)
+    for info in _archives(filters, db):
+        if _whole_archive(filters, info):
+            # Every bill in the file matches: its sales_archives row has the totals
+            archived_count, archived_amount = info.bill_count, info.total_amount
+        else:
+            archived_count, archived_amount = _count(attach_archive(info.year, db), filters, db)
+        count, total_amount = count + archived_count, total_amount + archived_amount
+    return count, total_amount
+
+
+def _whole_archive(filters, info):
+    """True when filters match every bill of an archive (no filter, or dates covering it)."""
+    if filters is None:
+        return True
+    if filters.customer or filters.bill_id is not None or filters.min_amount is not None \
+            or filters.max_amount is not None or filters.product:
+        return False
+    return ((not filters.start_date or str(filters.start_date)[:10] <= info.first_date)
+            and (not filters.end_date or str(filters.end_date)[:10] >= info.last_date))
+
+
+def _count(schema, filters, db):
+    if filters is not None and (filters.bill_id is not None or filters.min_amount is not None
+                                or filters.max_amount is not None or filters.product):
+        conditions, params = _where(filters)
+        return db.query_one(qualify(
+            f"SELECT COUNT(*), TOTAL(total_amount) FROM sales_history WHERE {' AND '.join(conditions)}", schema), params)
+
+    # Customer and whole days only: answered from one rollup row per day and customer
+    conditions, params = [], []
+    if filters is not None and filters.customer:
+        conditions.append("customer_name = ?")
+        params.append(filters.customer)
+    if filters is not None and filters.start_date:
+        conditions.append("sale_date >= ?")
+        params.append(str(filters.start_date)[:10])
+    if filters is not None and filters.end_date:
+        conditions.append("sale_date <= ?")
+        params.append(str(filters.end_date)[:10])
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return db.query_one(qualify(
+        f"SELECT COALESCE(SUM(bill_count), 0), TOTAL(total_amount) FROM daily_sales_rollup{where}", schema), params)
+
+
+def count_bills(db=None):
+    """Number of bills, from the daily rollup instead of a table scan."""
+    return count_history(db=db)[0]
+
+
+class HistoryPager:
+    """Random access by row index over the history, loading pages on demand.
+
+    ``len()`` is the matching bill count; ``get(i)`` returns row i (None past
+    the end), fetching further keyset pages only when i has not been loaded
+    yet. ``reset()`` drops the cache after bills were added or deleted and
+    ``set_filters()`` switches to another HistoryFilter.
+    """
+
+    def __init__(self, page_size=HISTORY_PAGE_SIZE, filters=None, db=None):
+        self.page_size = page_size
+        self.filters = filters
+        self._db = db
+        self.reset()
+
+    def set_filters(self, filters):
+        self.filters = filters
+        self.reset()
+
+    def reset(self):
+        self._rows = []
+        self._count = None
+        self._total_amount = None
+        self._exhausted = False
+
+    def _load_count(self):
+        self._count, self._total_amount = count_history(self.filters, self._db)
+
+    def __len__(self):
+        if self._count is None:
+            self._load_count()
+        return self._count
+
+    @property
+    def total_amount(self):
+        """Sum of total_amount over all matching bills."""
+        if self._total_amount is None:
+            self._load_count()
+        return self._total_amount
+
+    def get(self, index):
+        while index >= len(self._rows) and not self._exhausted:
+            self._fetch_page()
+        return self._rows[index] if 0 <= index < len(self._rows) else None
+
+    def _fetch_page(self):
+        before_id = self._rows[-1][0] if self._rows else None
+        page = get_history_page(before_id, self.page_size, self.filters, self._db)
+        self._rows.extend(page)
+        if len(page) < self.page_size:
+            self._exhausted = True
+            # The rollup count can lag a concurrent writer; trust what was read
+            self._count = len(self._rows)
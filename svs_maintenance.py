@@ -0,0 +1,268 @@
+"""Scheduled maintenance for the shop database.
+
+svs_sales_db.db is the only copy of the sales, and nothing looked after it.
+MaintenanceScheduler runs these tasks when they are due:
+
+  check     PRAGMA quick_check                                    daily
+  backup    hot copy with SQLite's online backup API into Backups/ daily
+  archive   move closed years into svs_sales_YYYY.db (svs_archive) monthly
+  optimize  ANALYZE the first time, PRAGMA optimize after that    daily
+  compact   purge expired deleted bills (svs_undo.compact)        weekly
+  vacuum    hand free pages back with PRAGMA incremental_vacuum   daily
+  convert   one-off full VACUUM to incremental auto_vacuum        on request
+
+The app runs due tasks on a worker thread once the counter has been idle
+for IDLE_SECONDS and stops between steps as soon as someone uses it again.
+Scripts and cron use ``svs_cli.py maintain``. The backup copies
+BACKUP_PAGES_PER_STEP pages at a time, and each copy step is only a short
+read, so billing never waits for it. Every run is recorded in
+maintenance_log with its duration; maintenance_report() sums them per task.
+"""
+import os
+import sqlite3
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from svs_archive import archive_bills, archive_path, format_archive_result, list_archives
+from svs_db import get_db
+from svs_undo import compact
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+BACKUP_DIR = os.getenv('SVS_BACKUP_DIR', 'Backups')
+# Newest backups kept; older ones are deleted after each backup
+BACKUP_KEEP = int(os.getenv('SVS_BACKUP_KEEP', '14'))
+BACKUP_PAGES_PER_STEP = 256
+# Pause between backup steps (seconds), leaving the disk to the counter
+BACKUP_STEP_PAUSE = 0.005
+# Free pages returned per incremental_vacuum statement
+VACUUM_PAGES_PER_STEP = 256
+# The app only starts maintenance after this long without keyboard/mouse input
+IDLE_SECONDS = 120
+# A failed task is tried again after this long instead of on every idle tick
+RETRY_INTERVAL = timedelta(hours=1)
+
+TaskRun = namedtuple('TaskRun', 'task started_at duration_ms status detail')
+TaskCost = namedtuple('TaskCost', 'task runs failures avg_ms max_ms last_run')
+
+
+class MaintenanceError(Exception):
+    """A maintenance task found a problem (e.g. the integrity check failed)."""
+
+
+# --- TASKS ---
+# Each takes (db, is_idle) and returns a short detail string for the log.
+
+def quick_check(db=None, is_idle=None):
+    """PRAGMA quick_check; raises MaintenanceError unless the database is ok."""
+    problems = [row[0] for row in (db or get_db()).query("PRAGMA quick_check")]
+    if problems != ['ok']:
+        raise MaintenanceError("; ".join(problems[:10]))
+    return 'ok'
+
+
+def backup_database(db=None, is_idle=None, folder=None, keep=None, pages=BACKUP_PAGES_PER_STEP):
+    """Copies the live database into folder (default BACKUP_DIR); returns the backup path.
+
+    Uses the online backup API a few pages at a time, into a '.part' file
+    that is renamed once complete, so a backup file is never half written.
+    Archive files (svs_archive) changed since their last copy are copied too.
+    Stops (raising MaintenanceError) between steps once is_idle() turns False.
+    """
+    db = db or get_db()
+    folder = folder or BACKUP_DIR
+    keep = BACKUP_KEEP if keep is None else keep
+    os.makedirs(folder, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(db.path))[0]
+    path = os.path.join(folder, f"{stem} {datetime.now().strftime('%Y-%m-%d %H-%M-%S')}.db")
+    _copy_database(db.connection(), path, pages, is_idle)
+    prune_backups(folder, stem, keep)
+
+    # One copy per archive file; they only change when bills are archived
+    for info in list_archives(db):
+        source, copy = archive_path(info.year, db), os.path.join(folder, info.file_name)
+        if os.path.exists(source) and (not os.path.exists(copy) or os.path.getmtime(copy) < os.path.getmtime(source)):
+            archive = sqlite3.connect(source)
+            try:
+                _copy_database(archive, copy, pages, is_idle)
+            finally:
+                archive.close()
+    return path
+
+
+def _copy_database(conn, path, pages, is_idle=None):
+    partial = path + '.part'
+
+    def pause(_status, _remaining, _total):
+        if is_idle is not None and not is_idle():
+            raise MaintenanceError("stopped: the counter is in use or the app is closing")
+        time.sleep(BACKUP_STEP_PAUSE)
+
+    target = sqlite3.connect(partial)
+    try:
+        conn.backup(target, pages=pages, progress=pause)
+        # A plain rollback-journal file restores by copying it back alone
+        target.execute("PRAGMA journal_mode=DELETE")
+    except BaseException:
+        target.close()
+        for leftover in (partial, partial + '-journal', partial + '-wal', partial + '-shm'):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        raise
+    target.close()
+    os.replace(partial, path)
+
+
+def prune_backups(folder, stem, keep=BACKUP_KEEP):
+    """Deletes all but the newest ``keep`` backups of stem in folder."""
+    # Names end in a sortable timestamp, so name order is age order
+    backups = sorted(name for name in os.listdir(folder) if name.startswith(f"{stem} ") and name.endswith('.db'))
+    for name in backups[:-keep] if keep > 0 else backups:
+        os.remove(os.path.join(folder, name))
+
+
+def archive_closed_years(db=None, is_idle=None):
+    return format_archive_result(archive_bills(is_idle=is_idle, db=db))
+
+
+def optimize(db=None, is_idle=None):
+    """Refreshes the query planner statistics."""
+    db = db or get_db()
+    if db.query_one("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'") is None:
+        db.execute("ANALYZE")
+        return 'analyze'
+    db.execute("PRAGMA optimize")
+    return 'optimize'
+
+
+def compact_tombstones(db=None, is_idle=None):
+    result = compact(vacuum=False, db=db)  # the vacuum task returns the space
+    return f"{result.purged_bills} bills purged, {result.dropped_entries} undo steps expired"
+
+
+def incremental_vacuum(db=None, is_idle=None, pages=VACUUM_PAGES_PER_STEP):
+    """Returns free pages to the file system, a few at a time while the counter is idle.
+
+    Does nothing on a database created before auto_vacuum=INCREMENTAL was
+    set (svs_db); ``svs_cli.py maintain --task convert`` switches it over.
+    """
+    db = db or get_db()
+    if db.query_one("PRAGMA auto_vacuum")[0] != 2:  # 2 = INCREMENTAL
+        return 'skipped: not incremental (run svs_cli.py maintain --task convert)'
+    start = free_pages = db.query_one("PRAGMA freelist_count")[0]
+    while free_pages and (is_idle is None or is_idle()):
+        db.execute(f"PRAGMA incremental_vacuum({pages})").fetchall()  # frees up to `pages` pages
+        left = db.query_one("PRAGMA freelist_count")[0]
+        if left >= free_pages:
+            break  # nothing freed, e.g. a reader still holds an old snapshot
+        free_pages = left
+    return f"{start - free_pages} pages freed"
+
+
+def convert_to_incremental(db=None, is_idle=None):
+    """Switches an older database to auto_vacuum=INCREMENTAL with a full VACUUM.
+
+    The VACUUM holds the write lock until the whole file is rebuilt, so this
+    is never scheduled; run it when the shop is closed.
+    """
+    db = db or get_db()
+    if db.query_one("PRAGMA auto_vacuum")[0] == 2:
+        return 'already incremental'
+    db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    db.execute("VACUUM")
+    return 'converted to incremental auto_vacuum'
+
+
+# name, function, how often it is due (None: only when asked for by name)
+MAINTENANCE_TASKS = [
+    ('check', quick_check, timedelta(days=1)),
+    ('backup', backup_database, timedelta(days=1)),
+    ('archive', archive_closed_years, timedelta(days=30)),
+    ('optimize', optimize, timedelta(days=1)),
+    ('compact', compact_tombstones, timedelta(days=7)),
+    ('vacuum', incremental_vacuum, timedelta(days=1)),
+    ('convert', convert_to_incremental, None),
+]
+TASK_NAMES = [name for name, _function, _interval in MAINTENANCE_TASKS]
+SCHEDULED_TASK_NAMES = [name for name, _function, interval in MAINTENANCE_TASKS if interval is not None]
+
+
+# --- SCHEDULER ---
+
+class MaintenanceScheduler:
+    """Runs maintenance tasks that are due and records each run in maintenance_log."""
+
+    def __init__(self, tasks=MAINTENANCE_TASKS, db=None):
+        self.tasks = list(tasks)
+        self._db = db
+
+    @property
+    def db(self):
+        return self._db or get_db()
+
+    def last_runs(self):
+        """task -> (last successful start, last attempted start) as datetimes (None if never)."""
+        runs = {}
+        for task, last_ok, last_attempt in self.db.query('''
+            SELECT task, MAX(CASE WHEN status = 'ok' THEN started_at END), MAX(started_at)
+            FROM maintenance_log GROUP BY task
+        '''):
+            runs[task] = tuple(datetime.strptime(value, DATE_FORMAT) if value else None
+                               for value in (last_ok, last_attempt))
+        return runs
+
+    def due(self, now=None):
+        """Names of the tasks due now, in run order."""
+        now = now or datetime.now()
+        runs = self.last_runs()
+        due = []
+        for name, _function, interval in self.tasks:
+            if interval is None:
+                continue
+            last_ok, last_attempt = runs.get(name, (None, None))
+            if last_ok is not None and now - last_ok < interval:
+                continue
+            if last_attempt is not None and last_attempt != last_ok and now - last_attempt < RETRY_INTERVAL:
+                continue  # failed recently
+            due.append(name)
+        return due
+
+    def run(self, names, is_idle=None):
+        """Runs the named tasks in order, stopping early once is_idle() turns False.
+
+        Returns a TaskRun per task that ran; failures are recorded, not raised.
+        """
+        functions = {name: function for name, function, _interval in self.tasks}
+        results = []
+        for name in names:
+            if is_idle is not None and not is_idle():
+                break
+            started_at = datetime.now().strftime(DATE_FORMAT)
+            began = time.perf_counter()
+            try:
+                detail, status = str(functions[name](self.db, is_idle)), 'ok'
+            except Exception as e:
+                detail, status = f"{type(e).__name__}: {e}", 'failed'
+            run = TaskRun(name, started_at, (time.perf_counter() - began) * 1000, status, detail)
+            with self.db.transaction() as conn:
+                conn.execute(
+                    "INSERT INTO maintenance_log (task, started_at, duration_ms, status, detail) VALUES (?, ?, ?, ?, ?)",
+                    run,
+                )
+            results.append(run)
+        return results
+
+    def run_due(self, now=None, is_idle=None):
+        return self.run(self.due(now), is_idle)
+
+
+def maintenance_report(since=None, db=None):
+    """Per-task cost (TaskCost rows) from maintenance_log, optionally since 'YYYY-MM-DD'."""
+    return [TaskCost(*row) for row in (db or get_db()).query('''
+        SELECT task, COUNT(*), SUM(status = 'failed'), AVG(duration_ms), MAX(duration_ms), MAX(started_at)
+        FROM maintenance_log
+        WHERE started_at >= ?
+        GROUP BY task
+        ORDER BY task
+    ''', (str(since or '0000')[:10],))]
@@ -0,0 +1,530 @@
+"""Invoice PDF generation for the SVS billing app (no GUI imports).
+
+Holds the filename and quantity helpers and generate_pdf_invoice(), so PDFs
+can be rendered from worker processes and scripts without loading
+customtkinter. Tamil fonts come from svs_fonts.
+
+ReportLab and WeasyPrint are imported on the first render, so the helpers
+here are cheap to import.
+"""
+import functools
+import html
+import os
+import re
+import string
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from svs_fonts import get_font_file, register_fonts
+
+# Page geometry in PDF points; same values as reportlab.lib.units.inch and
+# reportlab.lib.pagesizes.letter, without importing ReportLab.
+inch = 72.0
+letter = (8.5 * inch, 11 * inch)
+
+
+@functools.lru_cache(maxsize=None)
+def weasy_available():
+    """True when WeasyPrint (HTML -> PDF, correct Tamil shaping) can be imported.
+
+    The import is slow, so it is tried on the first render, not at import.
+    """
+    try:
+        import weasyprint  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+def _canvas(filename):
+    from reportlab.pdfgen import canvas
+    return canvas.Canvas(filename, pagesize=letter)
+
+
+# --- COMPANY DETAILS (printed on every invoice) ---
+# Use environment variables or placeholders to avoid committing personal data
+COMPANY_NAME = os.getenv('COMPANY_NAME', 'Your Company')
+COMPANY_ADDRESS = os.getenv('COMPANY_ADDRESS', 'Your Address, City')
+COMPANY_PHONE = os.getenv('COMPANY_PHONE', '')
+
+
+def safe_file_stem(customer: str | None = None, fallback: str | None = None) -> str:
+    """Removes characters not allowed in filenames and trims length."""
+    name = (customer or fallback or 'Invoice').strip()
+    # Remove filesystem-unfriendly characters \ / : * ? " < > |
+    name = re.sub(r'[\\/:*?"<>|]', '', name)
+    if not name:
+        name = 'Invoice'
+    # Limit length to avoid excessively long filenames
+    if len(name) > 80:
+        name = name[:80].rstrip()
+    return name
+
+
+# Utility: create a safe PDF filename using the customer name and timestamp
+def make_pdf_filename(customer: str | None = None, fallback: str | None = None) -> str:
+    """Return a path like: Invoices/Customer Name - YYYY-MM-DD - HH-MM-SS - 1a2b3c.pdf
+
+    Removes characters not allowed in filenames and trims length. The short
+    random tag keeps two PDFs for one customer rendered in the same second
+    (render pool, billing API) from overwriting each other.
+    """
+    name = safe_file_stem(customer, fallback)
+    timestamp = datetime.now().strftime('%Y-%m-%d - %H-%M-%S')
+    safe_filename = f"{name} - {timestamp} - {uuid.uuid4().hex[:6]}.pdf"
+    return os.path.join('Invoices', safe_filename)
+
+
+# --- 🎯 TAMIL FONT CONFIGURATION (Required for Tamil in PDF) ---
+# The font is located through a cached manifest and registered with
+# ReportLab on the first render (see svs_fonts), not at import time.
+
+
+# Function for the unique Kg/Gram display logic
+def format_quantity(quantity_kg):
+    """Converts a float quantity (e.g., 1.75) into a readable string (1 Kg 750 g)."""
+    if not quantity_kg:
+        return "0 Kg 0 g"
+    
+    kg = int(quantity_kg)
+    grams = round((quantity_kg - kg) * 1000)
+    
+    parts = []
+    if kg > 0:
+        parts.append(f"{kg} Kg")
+    if grams > 0:
+        parts.append(f"{grams} g")
+    
+    if not parts:
+        return "0 Kg"
+        
+    return " ".join(parts)
+
+
+# --- INVOICE HTML TEMPLATE (WeasyPrint path) ---
+# The stylesheet and page skeleton are compiled once per process; each
+# invoice only builds its rows and a few escaped header fields.
+
+INVOICE_CSS = """
+@font-face { font-family: 'TamilCustom'; src: url('$font_uri'); }
+body { font-family: Arial, sans-serif; font-size: 12px; color: #222; }
+.tamil { font-family: 'TamilCustom', sans-serif; }
+.company { font-size: 20px; font-weight: bold; margin-bottom: 6px; }
+.title { font-size: 16px; font-weight: bold; text-align:center; margin: 12px 0; }
+table { width: 100%; border-collapse: collapse; margin-top: 10px; }
+th, td { border: 1px solid #ddd; padding: 6px; }
+th { background: #f5f5f5; text-align: left; }
+.right { text-align: right; }
+.grand-total { margin-top:12px; text-align:right; font-weight:bold; }
+.footer { font-size: 10px; text-align:center; margin-top: 18px; color: #666; }
+.page + .page { break-before: page; }
+"""
+
+DOCUMENT_TEMPLATE = string.Template("""<html>
+<head><meta charset='utf-8'></head>
+<body>
+$pages
+</body>
+</html>
+""")
+
+INVOICE_TEMPLATE = string.Template("""<section class='page'>
+  <div class='company'>$company_name</div>
+  <div>$company_address | Phone: $company_phone</div>
+  <div class='title'>$title</div>
+  <div><strong>Bill ID:</strong> $bill_id &nbsp;&nbsp; <strong>Date:</strong> $date_display</div>
+  <div style='margin-top:6px;'><strong>Billed To:</strong> $customer_name</div>
+  <table>
+    <thead>
+      <tr>
+        <th>Product</th>
+        <th>Quantity</th>
+        <th class='right'>Rate/Kg</th>
+        <th class='right'>Total</th>
+      </tr>
+    </thead>
+    <tbody>
+$rows
+    </tbody>
+  </table>
+  <div class='grand-total'>GRAND TOTAL: ₹$total_amount</div>
+  <div class='footer'>Thank you for your business. Wholesale transactions only.</div>
+</section>
+""")
+
+ROW_TEMPLATE = "<tr><td>{}</td><td>{}</td><td class='right'>{:.2f}</td><td class='right'>{:.2f}</td></tr>"
+
+SUMMARY_TEMPLATE = string.Template("""<section class='page'>
+  <div class='company'>$company_name</div>
+  <div class='title'>$title</div>
+  <table>
+    <thead>
+      <tr><th>Bill ID</th><th>Time</th><th>Customer</th><th class='right'>Amount</th></tr>
+    </thead>
+    <tbody>
+$rows
+    </tbody>
+  </table>
+  <div class='grand-total'>$bill_count BILLS &nbsp; TOTAL: ₹$total_amount</div>
+</section>
+""")
+
+SUMMARY_ROW_TEMPLATE = "<tr><td>{}</td><td>{}</td><td>{}</td><td class='right'>{:.2f}</td></tr>"
+
+
+@functools.lru_cache(maxsize=None)
+def _invoice_template():
+    """The invoice page with company details already filled in and escaped."""
+    return string.Template(INVOICE_TEMPLATE.safe_substitute(
+        company_name=html.escape(COMPANY_NAME),
+        company_address=html.escape(COMPANY_ADDRESS),
+        company_phone=html.escape(COMPANY_PHONE),
+    ))
+
+
+@functools.lru_cache(maxsize=None)
+def get_weasy_stylesheet():
+    """Parsed invoice CSS and its FontConfiguration, shared by every render."""
+    from weasyprint import CSS
+    try:
+        from weasyprint.text.fonts import FontConfiguration
+    except ImportError:  # WeasyPrint < 53
+        from weasyprint.fonts import FontConfiguration
+    font_config = FontConfiguration()
+    font_file = get_font_file()
+    font_uri = Path(font_file).resolve().as_uri() if font_file else ''
+    css = CSS(string=string.Template(INVOICE_CSS).substitute(font_uri=font_uri), font_config=font_config)
+    return css, font_config
+
+
+def split_product_name(name):
+    """Splits 'Tomato (தக்காளி)' into ('Tomato', '(தக்காளி)')."""
+    if "(" in name and ")" in name:
+        eng_name, _, rest = name.partition("(")
+        return eng_name.strip(), "(" + rest.strip()
+    return name, ""
+
+
+def _item_fields(item):
+    """Returns (name, quantity, rate, total) for a tuple or consolidated dict item."""
+    if isinstance(item, dict):
+        quantity = item['quantity']
+        rate = item['rate']
+        return item['name'], quantity, rate, item.get('total', item.get('amount', quantity * rate))
+    return tuple(item)
+
+
+def build_invoice_section(bill_id, customer_name, items, total_amount, title="INVOICE", date_range=None):
+    """Fills the compiled invoice template; every text field is HTML-escaped."""
+    rows = []
+    for item in items:
+        name, qty, rate, total = _item_fields(item)
+        eng_name, tamil_name = split_product_name(name)
+        name_cell = html.escape(eng_name)
+        if tamil_name:
+            name_cell += f" <span class='tamil'>{html.escape(tamil_name)}</span>"
+        rows.append(ROW_TEMPLATE.format(name_cell, format_quantity(qty), rate, total))
+
+    date_display = date_range if date_range else datetime.now().strftime('%d-%b-%Y %H:%M')
+    return _invoice_template().substitute(
+        title=html.escape(title),
+        bill_id=html.escape(str(bill_id)) if bill_id else 'WEEKLY SUMMARY',
+        date_display=html.escape(date_display),
+        customer_name=html.escape(customer_name or ''),
+        rows="\n".join(rows),
+        total_amount=f"{total_amount:.2f}",
+    )
+
+
+def build_invoice_html(bill_id, customer_name, items, total_amount, title="INVOICE", date_range=None):
+    """A complete HTML document for one invoice."""
+    section = build_invoice_section(bill_id, customer_name, items, total_amount, title, date_range)
+    return DOCUMENT_TEMPLATE.substitute(pages=section)
+
+
+def build_summary_section(title, bills):
+    """Summary page listing (bill_id, date/time, customer, amount) rows."""
+    rows = [
+        SUMMARY_ROW_TEMPLATE.format(bill_id, html.escape(str(when)), html.escape(customer or ''), amount)
+        for bill_id, when, customer, amount in bills
+    ]
+    return SUMMARY_TEMPLATE.substitute(
+        company_name=html.escape(COMPANY_NAME),
+        title=html.escape(title),
+        rows="\n".join(rows),
+        bill_count=len(bills),
+        total_amount=f"{sum(bill[3] for bill in bills):.2f}",
+    )
+
+
+# --- PDF BILL GENERATION ---
+
+def generate_pdf_invoice(bill_id, customer_name, items, total_amount, title="INVOICE", date_range=None, use_weasyprint=True, filename=None):
+    """Generates a professional PDF invoice for the transaction. Added date_range for weekly bill.
+
+    Pass use_weasyprint=False to force the lighter ReportLab path, and
+    filename to choose the output path (default: make_pdf_filename()).
+    """
+    # If WeasyPrint is available, generate PDF from HTML using @font-face.
+    # This produces correct OpenType shaping for Tamil (recommended).
+    if use_weasyprint and weasy_available():
+        try:
+            items = list(items)  # HTML needs every row; keep them for the fallback too
+            document = build_invoice_html(bill_id, customer_name, items, total_amount, title, date_range)
+            stylesheet, font_config = get_weasy_stylesheet()
+
+            # Write PDF using WeasyPrint
+            # Use customer name + date/time for the filename (safer than Invoice_...)
+            filename = filename or make_pdf_filename(customer_name, f"Invoice_{bill_id if bill_id else 'Consolidated'}")
+            from weasyprint import HTML
+            HTML(string=document).write_pdf(filename, stylesheets=[stylesheet], font_config=font_config)
+            return filename
+        except Exception as e:
+            # If WeasyPrint fails for any reason, log and fall back to ReportLab method below
+            print(f"⚠️ WeasyPrint path failed: {e}. Falling back to ReportLab PDF generation.")
+
+    # Fallback: continue with existing ReportLab generation method
+    # Use bill_id or 'Consolidated' as fallback; filename uses customer name + date/time
+    filename_id = bill_id if bill_id else "Consolidated"
+    filename = filename or make_pdf_filename(customer_name, f"Invoice_{filename_id}")
+    
+    c = _canvas(filename)
+    draw_invoice(c, bill_id, customer_name, items, total_amount, title, date_range)
+    c.save()
+    return filename
+
+
+def draw_invoice(c, bill_id, customer_name, items, total_amount, title="INVOICE", date_range=None):
+    """Draws one invoice onto the current page of a ReportLab canvas (does not save)."""
+    font_name, bold_name = register_fonts()
+    width, height = letter
+    
+    # Header Area (Company Name) - prefer registered Tamil font (bold) for headings
+    try:
+        c.setFont(bold_name, 20)
+    except Exception:
+        try:
+            c.setFont(font_name, 20)
+        except Exception:
+            c.setFont('Helvetica-Bold', 20)
+    c.drawString(1 * inch, height - 1 * inch, COMPANY_NAME)
+    
+    # Change: Use Tamil font for address if available, otherwise fallback
+    c.setFont(font_name, 10)
+    c.drawString(1 * inch, height - 1.25 * inch, COMPANY_ADDRESS)
+    c.drawString(1 * inch, height - 1.4 * inch, f"Phone: {COMPANY_PHONE}")
+    
+    # Title - use Tamil font if available
+    try:
+        c.setFont(bold_name, 16)
+    except Exception:
+        try:
+            c.setFont(font_name, 16)
+        except Exception:
+            c.setFont('Helvetica-Bold', 16)
+    c.drawCentredString(width / 2, height - 2 * inch, title)
+
+    # Customer and Invoice Info - headings in bold (prefer Tamil font)
+    try:
+        c.setFont(bold_name, 12)
+    except Exception:
+        try:
+            c.setFont(font_name, 12)
+        except Exception:
+            c.setFont('Helvetica-Bold', 12)
+    c.drawString(1 * inch, height - 2.5 * inch, "Bill ID:")
+    c.drawString(4 * inch, height - 2.5 * inch, "Date:")
+    c.drawString(1 * inch, height - 2.75 * inch, "Billed To:")
+    
+    # Change: Ensure customer name uses the correct font
+    c.setFont(font_name, 12)
+    bill_id_display = str(bill_id) if bill_id else "WEEKLY SUMMARY"
+    date_display = date_range if date_range else datetime.now().strftime('%d-%b-%Y %H:%M')
+    
+    c.drawString(2 * inch, height - 2.5 * inch, bill_id_display)
+    c.drawString(5 * inch, height - 2.5 * inch, date_display)
+    c.drawString(2 * inch, height - 2.75 * inch, customer_name)
+    
+    # Item rows are streamed from `items` (any iterable); when a page fills
+    # up, a subtotal is carried forward and the table header is repeated.
+    y_pos = _draw_table_header(c, height - 3.5 * inch)
+    line_total = 0.0
+    page_no = 1
+
+    for item in items:
+        if y_pos < ROWS_BOTTOM_MARGIN:
+            _draw_subtotal(c, y_pos, "Subtotal carried forward:", line_total)
+            _draw_page_footer(c, f"Page {page_no} - continued overleaf")
+            c.showPage()
+            page_no += 1
+            y_pos = _draw_continued_page(c, title, bill_id_display, customer_name, line_total)
+
+        name, quantity, rate, total = _item_fields(item)[:4]
+        c.drawString(ITEM_COLUMNS[0], y_pos, name)
+        c.drawString(ITEM_COLUMNS[1], y_pos, format_quantity(quantity))
+        c.drawString(ITEM_COLUMNS[2], y_pos, f"{rate:.2f}")
+        c.drawString(ITEM_COLUMNS[3], y_pos, f"{total:.2f}")
+
+        line_total += total
+        y_pos -= ROW_HEIGHT
+
+    # Keep the grand total off the footer
+    if y_pos < TOTALS_BOTTOM_MARGIN:
+        _draw_page_footer(c, f"Page {page_no} - continued overleaf")
+        c.showPage()
+        page_no += 1
+        y_pos = _draw_continued_page(c, title, bill_id_display, customer_name, line_total)
+
+    c.setStrokeColorRGB(0, 0, 0)
+    c.line(1*inch, y_pos - 0.1 * inch, width - 1*inch, y_pos - 0.1 * inch) # Horizontal line
+
+    # Totals Area (English/Numbers)
+    y_pos -= 0.3 * inch
+    c.setFont('Helvetica-Bold', 12)
+    c.drawString(6 * inch, y_pos, "GRAND TOTAL:")
+    c.drawString(7.5 * inch, y_pos, f"  {total_amount:.2f}")
+
+    # Footer (English, so keeping Helvetica-Oblique)
+    c.setFont('Helvetica-Oblique', 10)
+    c.drawCentredString(width / 2, 0.5 * inch, "Thank you for your business. Visit again!")
+    if page_no > 1:
+        _draw_page_footer(c, f"Page {page_no}", y=0.3 * inch)
+
+
+# Item table layout for the ReportLab invoice
+ITEM_COLUMNS = [1*inch, 3.5*inch, 5.5*inch, 6.5*inch, 7.5*inch]
+ROW_HEIGHT = 0.2 * inch
+# Rows stop above this line, leaving room for the subtotal and page footer
+ROWS_BOTTOM_MARGIN = 1.2 * inch
+# Space needed below the last row for the grand total
+TOTALS_BOTTOM_MARGIN = 1.0 * inch
+
+
+def _draw_table_header(c, y_start):
+    """Draws the item table header at y_start; returns the y of the first row."""
+    font_name, bold_name = register_fonts()
+    width, _height = letter
+    # FIX: Use registered Tamil font for the table header (for Tamil labels)
+    # Try bold variant if registered; otherwise fall back safely to base font
+    try:
+        c.setFont(bold_name, 11)
+    except Exception:
+        try:
+            c.setFont(font_name, 11)
+        except Exception:
+            c.setFont('Helvetica-Bold', 11)
+    c.drawString(ITEM_COLUMNS[0], y_start, "Product Name")
+    c.drawString(ITEM_COLUMNS[1], y_start, "Quantity")
+    c.drawString(ITEM_COLUMNS[2], y_start, "Rate/Kg")
+    c.drawString(ITEM_COLUMNS[3], y_start, "Total")
+
+    c.setStrokeColorRGB(0, 0, 0)
+    c.line(1*inch, y_start - 0.1 * inch, width - 1*inch, y_start - 0.1 * inch) # Horizontal line
+
+    # Item rows use the Tamil font for names and quantity format
+    c.setFont(font_name, 11)
+    return y_start - 0.3 * inch
+
+
+def _draw_continued_page(c, title, bill_id_display, customer_name, brought_forward):
+    """Draws the heading of a follow-on page and the table header; returns the y of the first row."""
+    font_name, _bold_name = register_fonts()
+    _width, height = letter
+    c.setFont('Helvetica-Bold', 12)
+    c.drawString(1 * inch, height - 1 * inch, f"{COMPANY_NAME} - {title} (continued)")
+    c.setFont(font_name, 11)
+    c.drawString(1 * inch, height - 1.25 * inch, f"Bill ID: {bill_id_display}   Billed To: {customer_name}")
+    c.setFont('Helvetica-Bold', 11)
+    c.drawString(5.5 * inch, height - 1.6 * inch, "Brought forward:")
+    c.drawString(6.5 * inch, height - 1.6 * inch, f"{brought_forward:.2f}")
+    return _draw_table_header(c, height - 2 * inch)
+
+
+def _draw_subtotal(c, y_pos, label, amount):
+    width, _height = letter
+    c.line(1*inch, y_pos + 0.1 * inch, width - 1*inch, y_pos + 0.1 * inch)
+    c.setFont('Helvetica-Bold', 11)
+    c.drawString(4.5 * inch, y_pos - 0.1 * inch, label)
+    c.drawString(ITEM_COLUMNS[3], y_pos - 0.1 * inch, f"{amount:.2f}")
+
+
+def _draw_page_footer(c, text, y=0.5 * inch):
+    width, _height = letter
+    c.setFont('Helvetica-Oblique', 9)
+    c.drawCentredString(width / 2, y, text)
+
+
+def draw_summary(c, title, bills):
+    """Draws summary page(s) listing (bill_id, date/time, customer, amount) rows."""
+    width, height = letter
+    col_x = [1 * inch, 2 * inch, 3.75 * inch, 7.5 * inch]
+    body_font, _bold_font = register_fonts()
+
+    def header():
+        c.setFont('Helvetica-Bold', 16)
+        c.drawCentredString(width / 2, height - 1 * inch, title)
+        c.setFont('Helvetica-Bold', 11)
+        y = height - 1.5 * inch
+        for x, label in zip(col_x[:3], ("Bill ID", "Time", "Customer")):
+            c.drawString(x, y, label)
+        c.drawRightString(col_x[3], y, "Amount")
+        c.line(1 * inch, y - 0.1 * inch, width - 1 * inch, y - 0.1 * inch)
+        c.setFont(body_font, 11)
+        return y - 0.3 * inch
+
+    y_pos = header()
+    for bill_id, when, customer, amount in bills:
+        if y_pos < 1 * inch:
+            c.showPage()
+            y_pos = header()
+        c.drawString(col_x[0], y_pos, str(bill_id))
+        c.drawString(col_x[1], y_pos, str(when))
+        c.drawString(col_x[2], y_pos, customer or '')
+        c.drawRightString(col_x[3], y_pos, f"{amount:.2f}")
+        y_pos -= 0.2 * inch
+
+    c.line(1 * inch, y_pos, width - 1 * inch, y_pos)
+    c.setFont('Helvetica-Bold', 12)
+    c.drawRightString(col_x[3], y_pos - 0.3 * inch,
+                      f"{len(bills)} BILLS   TOTAL: {sum(bill[3] for bill in bills):.2f}")
+
+
+def generate_merged_pdf(invoices, filename, summary_title=None, use_weasyprint=True):
+    """Renders many invoices into one multi-page PDF (one document, fonts embedded once).
+
+    invoices are dicts with generate_pdf_invoice's arguments (see
+    svs_render.make_job). With summary_title, a page listing every bill
+    and the grand total is put in front.
+    """
+    summary = [
+        (inv['bill_id'], inv.get('date_range') or '', inv['customer_name'], inv['total_amount'])
+        for inv in invoices
+    ]
+
+    if use_weasyprint and weasy_available():
+        try:
+            pages = [build_summary_section(summary_title, summary)] if summary_title else []
+            pages.extend(
+                build_invoice_section(inv['bill_id'], inv['customer_name'], inv['items'], inv['total_amount'],
+                                      inv.get('title', 'INVOICE'), inv.get('date_range'))
+                for inv in invoices
+            )
+            stylesheet, font_config = get_weasy_stylesheet()
+            from weasyprint import HTML
+            HTML(string=DOCUMENT_TEMPLATE.substitute(pages="\n".join(pages))).write_pdf(
+                filename, stylesheets=[stylesheet], font_config=font_config)
+            return filename
+        except Exception as e:
+            print(f"⚠️ WeasyPrint path failed: {e}. Falling back to ReportLab PDF generation.")
+
+    c = _canvas(filename)
+    if summary_title:
+        draw_summary(c, summary_title, summary)
+        c.showPage()
+    for inv in invoices:
+        draw_invoice(c, inv['bill_id'], inv['customer_name'], inv['items'], inv['total_amount'],
+                     inv.get('title', 'INVOICE'), inv.get('date_range'))
+        c.showPage()
+    c.save()
+    return filename
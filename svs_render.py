@@ -0,0 +1,206 @@
+"""Process-pool rendering engine for invoice PDFs.
+
+WeasyPrint layout is CPU heavy and holds the GIL, so reprints and weekly
+consolidations used to queue behind each other. RenderEngine keeps a pool
+of warm worker processes (each imports WeasyPrint and loads the Tamil font
+once) and renders invoices submitted as plain data, returning futures.
+If the pool cannot be started or dies, jobs fall back to in-process
+ReportLab rendering.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Number of warm render processes; 0 disables the pool (in-process ReportLab).
+RENDER_WORKERS = int(os.getenv('SVS_PDF_WORKERS', str(min(2, os.cpu_count() or 1))))
+
+
+# --- WORKER SIDE ---
+
+def _init_worker():
+    """Runs once in each worker: import WeasyPrint and load the Tamil font."""
+    import svs_pdf
+    svs_pdf.register_fonts()
+    if svs_pdf.weasy_available():
+        try:
+            # Parse the cached stylesheet/@font-face and lay out a throwaway
+            # page now instead of on the first real invoice.
+            stylesheet, font_config = svs_pdf.get_weasy_stylesheet()
+            from weasyprint import HTML
+            HTML(string="<p class='tamil'>தமிழ்</p>").render(stylesheets=[stylesheet], font_config=font_config)
+        except Exception as e:
+            print(f"⚠️ PDF worker warm-up failed: {e}")
+
+
+def _noop():
+    return os.getpid()
+
+
+def _render_job(job):
+    from svs_pdf import generate_pdf_invoice
+    return generate_pdf_invoice(**job)
+
+
+def _render_in_process(job):
+    from svs_pdf import generate_pdf_invoice
+    return generate_pdf_invoice(**job, use_weasyprint=False)
+
+
+def _render_merged_job(job):
+    from svs_pdf import generate_merged_pdf
+    return generate_merged_pdf(**job)
+
+
+def _render_merged_in_process(job):
+    from svs_pdf import generate_merged_pdf
+    return generate_merged_pdf(**job, use_weasyprint=False)
+
+
+def make_job(bill_id, customer_name, items, total_amount, title="INVOICE", date_range=None, filename=None):
+    """Packs an invoice into plain, picklable data for a worker process."""
+    return {
+        'bill_id': bill_id,
+        'customer_name': customer_name,
+        'items': [dict(item) if isinstance(item, dict) else tuple(item) for item in items],
+        'total_amount': total_amount,
+        'title': title,
+        'date_range': date_range,
+        'filename': filename,
+    }
+
+
+# --- ENGINE ---
+
+class RenderEngine:
+    """Renders invoices in a ProcessPoolExecutor of warm workers.
+
+    ``submit()`` returns a Future resolving to the PDF path. Without a usable
+    pool (workers=0 or a pool start-up failure) jobs are rendered with
+    ReportLab in the calling thread instead. Jobs caught by a crashed worker
+    are re-rendered with ReportLab on the engine's own fallback thread.
+    """
+
+    def __init__(self, workers=RENDER_WORKERS):
+        self.workers = workers
+        self._pool = None
+        self._disabled = workers <= 0
+        self._lock = threading.Lock()
+        self._fallback = None  # one-thread executor, started on the first crash
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None and not self._disabled:
+                try:
+                    # 'spawn' everywhere: forking a process that runs Tk and
+                    # worker threads is unsafe, and it matches Windows.
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_worker,
+                    )
+                except (OSError, ValueError, NotImplementedError) as e:
+                    print(f"⚠️ PDF worker pool unavailable ({e}); rendering in-process with ReportLab.")
+                    self._disabled = True
+            return self._pool
+
+    def _disable_pool(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._disabled = True
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        print("⚠️ PDF worker pool crashed; rendering in-process with ReportLab.")
+
+    def warm_up(self):
+        """Starts every worker now so the first invoice does not pay the start-up cost."""
+        pool = self._get_pool()
+        if pool is not None:
+            for future in [pool.submit(_noop) for _ in range(self.workers)]:
+                future.result()
+
+    def submit(self, bill_id, customer_name, items, total_amount, title="INVOICE", date_range=None, filename=None):
+        """Queues one invoice; returns a Future with the generated PDF path."""
+        job = make_job(bill_id, customer_name, items, total_amount, title, date_range, filename)
+        return self._submit(_render_job, _render_in_process, job)
+
+    def submit_merged(self, invoices, filename, summary_title=None):
+        """Queues one multi-page PDF of many invoices (make_job() dicts).
+
+        Returns a Future with the PDF path.
+        """
+        job = {'invoices': list(invoices), 'filename': filename, 'summary_title': summary_title}
+        return self._submit(_render_merged_job, _render_merged_in_process, job)
+
+    def _submit(self, worker, fallback, job):
+        pool = self._get_pool()
+        if pool is None:
+            return self._run_in_process(fallback, job)
+
+        result = Future()
+        try:
+            inner = pool.submit(worker, job)
+        except (BrokenProcessPool, RuntimeError):
+            self._disable_pool()
+            return self._run_in_process(fallback, job)
+
+        def _recover():
+            self._disable_pool()
+            try:
+                result.set_result(fallback(job))
+            except Exception as e:
+                result.set_exception(e)
+
+        def _done(future):
+            # Runs on the pool's management thread: never render or shut the pool down here
+            try:
+                result.set_result(future.result())
+            except BrokenProcessPool:
+                self._fallback_executor().submit(_recover)
+            except Exception as e:
+                result.set_exception(e)
+
+        inner.add_done_callback(_done)
+        return result
+
+    def _fallback_executor(self):
+        with self._lock:
+            if self._fallback is None:
+                self._fallback = ThreadPoolExecutor(max_workers=1, thread_name_prefix='svs-render-fallback')
+            return self._fallback
+
+    def render(self, *args, **kwargs):
+        """Blocking convenience wrapper: submit() and wait for the PDF path."""
+        return self.submit(*args, **kwargs).result()
+
+    def _run_in_process(self, fallback, job):
+        future = Future()
+        try:
+            future.set_result(fallback(job))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+            fallback, self._fallback = self._fallback, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+        if fallback is not None:
+            fallback.shutdown(wait=wait)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_render_engine():
+    """Returns the app-wide RenderEngine (pool size from SVS_PDF_WORKERS)."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RenderEngine()
+    return _engine
@@ -0,0 +1,251 @@
+"""Bill line-item storage for the SVS billing app.
+
+Line items live in the normalized ``sales_items`` table (one row per bill
+line) instead of the legacy ``sales_history.items_json`` blob. This module
+writes and reads them, and migrates old JSON rows over in small resumable
+batches so an existing shop database is converted without long locks.
+"""
+import heapq
+import json
+from collections import namedtuple
+from datetime import date, timedelta
+from itertools import groupby
+
+from svs_archive import archive_schemas, find_archived_bill, qualify
+from svs_db import get_db, get_meta, set_meta
+
+# schema_meta key holding the highest bill_id already moved out of items_json
+MIGRATION_KEY = 'items_json_migrated_upto'
+MIGRATION_BATCH_SIZE = 500
+
+
+# Dashboard totals for three windows, read from the daily_sales_rollup table
+# (at most one row per day and customer). Window starts are 'YYYY-MM-DD';
+# :earliest is the smallest of them.
+SALES_SUMMARY_SQL = '''
+    SELECT
+        TOTAL(CASE WHEN sale_date >= :today THEN total_amount END),
+        TOTAL(CASE WHEN sale_date >= :today THEN bill_count END),
+        TOTAL(CASE WHEN sale_date >= :week THEN total_amount END),
+        TOTAL(CASE WHEN sale_date >= :week THEN bill_count END),
+        TOTAL(CASE WHEN sale_date >= :month THEN total_amount END),
+        TOTAL(CASE WHEN sale_date >= :month THEN bill_count END)
+    FROM daily_sales_rollup
+    WHERE sale_date >= :earliest
+'''
+
+CUSTOMER_BILLS_SQL = '''
+    SELECT bill_id, transaction_date, total_amount, items_json
+    FROM sales_history
+    WHERE customer_name = ? AND deleted_at IS NULL
+    ORDER BY transaction_date ASC
+'''
+
+# Same, limited to [start, end) on transaction_date; still one index range scan
+CUSTOMER_BILLS_WINDOW_SQL = '''
+    SELECT bill_id, transaction_date, total_amount, items_json
+    FROM sales_history
+    WHERE customer_name = ? AND transaction_date >= ? AND transaction_date < ? AND deleted_at IS NULL
+    ORDER BY transaction_date ASC
+'''
+
+
+# Bills streamed by iter_bills_with_items(); items are (name, qty, rate, total)
+Bill = namedtuple('Bill', 'bill_id transaction_date customer_name total_amount items')
+
+# Rows fetched from the cursor at a time when streaming bills
+STREAM_FETCH_SIZE = 200
+
+
+def get_sales_summary(today_start, week_start, month_start, db=None):
+    """Returns {'Today'|'This Week'|'This Month': (total_amount, bill_count)}.
+
+    Window starts may be dates or 'YYYY-MM-DD HH:MM:SS' strings; only the
+    date part is used since the rollup is per day.
+    """
+    params = {
+        'today': today_start[:10],
+        'week': week_start[:10],
+        'month': month_start[:10],
+    }
+    params['earliest'] = min(params.values())
+    row = (db or get_db()).query_one(SALES_SUMMARY_SQL, params)
+    return {
+        'Today': (row[0], int(row[1])),
+        'This Week': (row[2], int(row[3])),
+        'This Month': (row[4], int(row[5])),
+    }
+
+
+def get_customer_bills(customer, start_date=None, end_date=None, db=None):
+    """Bills of one customer, oldest first.
+
+    start_date/end_date ('YYYY-MM-DD', both inclusive) optionally limit the window.
+    """
+    if start_date is None and end_date is None:
+        return (db or get_db()).query(CUSTOMER_BILLS_SQL, (customer,))
+    start = str(start_date)[:10] if start_date else ''
+    end = (date.fromisoformat(str(end_date)[:10]) + timedelta(days=1)).isoformat() if end_date else '9999-12-31'
+    return (db or get_db()).query(CUSTOMER_BILLS_WINDOW_SQL, (customer, start, end))
+
+
+def stream_rows(sql, params=(), db=None):
+    """Yields the rows of a query, fetched a batch at a time."""
+    # A private cursor, so other queries on this thread do not disturb it
+    cursor = (db or get_db()).connection().cursor()
+    try:
+        cursor.execute(sql, params)
+        while True:
+            batch = cursor.fetchmany(STREAM_FETCH_SIZE)
+            if not batch:
+                return
+            yield from batch
+    finally:
+        cursor.close()
+
+
+def iter_bills_with_items(start_date=None, end_date=None, customers=None, db=None):
+    """Streams live (not deleted) bills with their line items, in bill_id order.
+
+    start_date/end_date ('YYYY-MM-DD', both inclusive) and customers (a list
+    of names) are optional filters. Headers and lines come from one joined
+    query read with fetchmany(), so memory stays flat however many bills match.
+    Archived years in the window are read too (see svs_archive).
+    """
+    db = db or get_db()
+    where, params = ["h.deleted_at IS NULL"], []
+    if start_date:
+        where.append("h.transaction_date >= ?")
+        params.append(str(start_date)[:10])
+    if end_date:
+        # Inclusive: everything before the start of the following day
+        where.append("h.transaction_date < date(?, '+1 day')")
+        params.append(str(end_date)[:10])
+    if customers:
+        customers = list(customers)
+        where.append(f"h.customer_name IN ({','.join('?' * len(customers))})")
+        params.extend(customers)
+    sql = f'''
+        SELECT h.bill_id, h.transaction_date, h.customer_name, h.total_amount, h.items_json,
+               i.product_name, i.quantity_kg, i.rate, i.total
+        FROM sales_history h
+        LEFT JOIN sales_items i ON i.bill_id = h.bill_id
+        WHERE {" AND ".join(where)}
+        ORDER BY h.bill_id, i.line_no
+    '''
+    # A bill lives in exactly one file, so merging by bill_id keeps its lines together
+    schemas = archive_schemas(start_date, end_date, db) + ['main']
+    rows = heapq.merge(*(stream_rows(qualify(sql, schema), params, db) for schema in schemas),
+                       key=lambda row: row[0])
+    for bill_id, lines in groupby(rows, key=lambda row: row[0]):
+        first = next(lines)
+        if first[5] is None:
+            items = parse_items_json(first[4])  # not migrated yet
+        else:
+            items = [first[5:]] + [line[5:] for line in lines]
+        yield Bill(bill_id, first[1], first[2], first[3], items)
+
+
+def parse_items_json(items_json):
+    """Compatibility reader for the legacy items_json column.
+
+    Accepts both the list form written by the app, [name, qty, rate, total],
+    and dict rows; returns a list of (name, quantity, rate, total) tuples.
+    """
+    if not items_json:
+        return []
+    items = []
+    for item in json.loads(items_json):
+        if isinstance(item, dict):
+            quantity = item.get('quantity', 0.0)
+            rate = item.get('rate', 0.0)
+            total = item.get('total', item.get('amount', quantity * rate))
+            items.append((item['name'], quantity, rate, total))
+        else:
+            name, quantity, rate, total = item[:4]
+            items.append((name, quantity, rate, total))
+    return items
+
+
+def save_bill_items(conn, bill_id, items):
+    """Replaces the line items of a bill. Call inside a transaction."""
+    conn.execute("DELETE FROM sales_items WHERE bill_id = ?", (bill_id,))
+    conn.executemany(
+        '''
+        INSERT INTO sales_items (bill_id, line_no, product_id, product_name, quantity_kg, rate, total)
+        VALUES (?, ?, (SELECT id FROM products WHERE name = ?), ?, ?, ?, ?)
+        ''',
+        [
+            (bill_id, line_no, name, name, quantity, rate, total)
+            for line_no, (name, quantity, rate, total) in enumerate(items, start=1)
+        ],
+    )
+
+
+def load_bill_items(bill_id, items_json=None, db=None):
+    """Returns a bill's lines as (name, quantity, rate, total) tuples.
+
+    Falls back to the legacy items_json text for bills that have not been
+    migrated yet (e.g. a freshly restored old backup), and reads archived
+    bills from their archive file.
+    """
+    db = db or get_db()
+    rows = db.query(
+        "SELECT product_name, quantity_kg, rate, total FROM sales_items WHERE bill_id = ? ORDER BY line_no",
+        (bill_id,),
+    )
+    if rows:
+        return rows
+    if items_json is None:
+        row = db.query_one("SELECT items_json FROM sales_history WHERE bill_id = ?", (bill_id,))
+        if row is None:
+            schema = find_archived_bill(bill_id, db)
+            if schema is not None:
+                return load_archived_bill_items(bill_id, schema, db)
+        items_json = row[0] if row else None
+    return parse_items_json(items_json)
+
+
+def load_archived_bill_items(bill_id, schema, db=None):
+    """load_bill_items() for a bill in an attached archive (see svs_archive)."""
+    db = db or get_db()
+    rows = db.query(
+        f"SELECT product_name, quantity_kg, rate, total FROM {schema}.sales_items WHERE bill_id = ? ORDER BY line_no",
+        (bill_id,),
+    )
+    if rows:
+        return rows
+    row = db.query_one(f"SELECT items_json FROM {schema}.sales_history WHERE bill_id = ?", (bill_id,))
+    return parse_items_json(row[0] if row else None)
+
+
+def migrate_items_json(batch_size=MIGRATION_BATCH_SIZE, max_batches=None, db=None):
+    """Moves legacy items_json rows into sales_items.
+
+    Each batch is its own short transaction and records its progress in
+    schema_meta, so the migration can be interrupted and resumed at any time.
+    Returns the number of bills examined.
+    """
+    db = db or get_db()
+    migrated = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with db.transaction() as conn:
+            upto = int(get_meta(MIGRATION_KEY, 0, db=db))
+            rows = conn.execute(
+                "SELECT bill_id, items_json FROM sales_history WHERE bill_id > ? ORDER BY bill_id LIMIT ?",
+                (upto, batch_size),
+            ).fetchall()
+            if not rows:
+                break
+            converted = [(bill_id, items_json) for bill_id, items_json in rows if items_json]
+            for bill_id, items_json in converted:
+                save_bill_items(conn, bill_id, parse_items_json(items_json))
+            conn.executemany(
+                "UPDATE sales_history SET items_json = '' WHERE bill_id = ?",
+                [(bill_id,) for bill_id, _ in converted],
+            )
+            set_meta(conn, MIGRATION_KEY, rows[-1][0])
+        migrated += len(rows)
+        batches += 1
+    return migrated
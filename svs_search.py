@@ -0,0 +1,182 @@
+"""Type-ahead product search for the billing screen.
+
+Product names are bilingual ('Tomato (தக்காளி)'), so ProductIndex splits
+each name into words from both the English and the Tamil part and keeps
+them in one sorted token list with a posting set (product ids) per token.
+A typed prefix is a bisect range over that list; several typed words must
+all match. The product id doubles as a short PLU code: typing '12' puts
+product 12 first.
+
+The index follows the product catalog (svs_catalog) incrementally: sync()
+only re-indexes products that were added, renamed or deleted since the
+catalog generation it last saw.
+"""
+import re
+import unicodedata
+from bisect import bisect_left, insort
+
+from svs_catalog import get_catalog
+
+SEARCH_LIMIT = 10
+
+# Split on spaces, brackets and punctuation only. \w would also split Tamil
+# words, since vowel signs and the virama are not alphanumeric.
+_TOKEN_SPLIT = re.compile(r"[\s()\[\]{},./\\&+'\"-]+")
+
+
+def tokenize(text):
+    """Case-folded, NFC-normalised words of a product name or query, in order."""
+    text = unicodedata.normalize('NFC', text).casefold()
+    tokens = []
+    for token in _TOKEN_SPLIT.split(text):
+        if token and token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+class _PrefixMap:
+    """Sorted unique tokens with a posting set of product ids per token."""
+
+    def __init__(self):
+        self.tokens = []
+        self.postings = {}
+
+    def add(self, token, product_id):
+        ids = self.postings.get(token)
+        if ids is None:
+            ids = self.postings[token] = set()
+            insort(self.tokens, token)
+        ids.add(product_id)
+
+    def remove(self, token, product_id):
+        ids = self.postings[token]
+        ids.discard(product_id)
+        if not ids:
+            del self.postings[token]
+            del self.tokens[bisect_left(self.tokens, token)]
+
+    def ids(self, prefix):
+        """Union of the postings of every token starting with prefix."""
+        tokens = self.tokens
+        i = bisect_left(tokens, prefix)
+        ids = set()
+        while i < len(tokens) and tokens[i].startswith(prefix):
+            ids |= self.postings[tokens[i]]
+            i += 1
+        return ids
+
+
+class ProductIndex:
+    """Prefix index over product names (English and Tamil words) and PLU codes."""
+
+    def __init__(self):
+        self._words = _PrefixMap()    # every word of every name
+        self._leading = _PrefixMap()  # first word of each name only
+        self._products = {}  # product id -> (name, folded words, tokens, sort key)
+        self._ordered = []   # sort keys (len(name), name, id) of all products, sorted
+        self.generation = None  # catalog generation last synced from
+
+    def __len__(self):
+        return len(self._products)
+
+    def add(self, product_id, name):
+        """Indexes (or re-indexes) one product."""
+        if product_id in self._products:
+            self.remove(product_id)
+        tokens = tokenize(name)
+        for token in tokens:
+            self._words.add(token, product_id)
+        if tokens:
+            self._leading.add(tokens[0], product_id)
+        sort_key = (len(name), name, product_id)
+        insort(self._ordered, sort_key)
+        # The words without brackets and punctuation, as a query is compared
+        self._products[product_id] = (name, ' '.join(tokens), tokens, sort_key)
+
+    def remove(self, product_id):
+        entry = self._products.pop(product_id, None)
+        if entry is None:
+            return
+        _name, _folded, tokens, sort_key = entry
+        for token in tokens:
+            self._words.remove(token, product_id)
+        if tokens:
+            self._leading.remove(tokens[0], product_id)
+        del self._ordered[bisect_left(self._ordered, sort_key)]
+
+    def sync(self, catalog=None):
+        """Brings the index up to date with the catalog; returns the number of products re-indexed."""
+        catalog = catalog or get_catalog()
+        by_name = catalog.by_name()  # reloads an invalidated catalog, bumping its generation
+        if catalog.generation == self.generation:
+            return 0
+        products = {product_id: name for name, (product_id, _rate) in by_name.items()}
+        changed = 0
+        for product_id in [pid for pid in self._products if pid not in products]:
+            self.remove(product_id)
+            changed += 1
+        for product_id, name in products.items():
+            entry = self._products.get(product_id)
+            if entry is None or entry[0] != name:
+                self.add(product_id, name)
+                changed += 1
+        self.generation = catalog.generation
+        return changed
+
+    def _top(self, ids, limit):
+        """The first ``limit`` of ids in (name length, name) order."""
+        if not ids or limit <= 0:
+            return []
+        if len(ids) * 16 < len(self._ordered):
+            return [key[2] for key in sorted(self._products[pid][3] for pid in ids)[:limit]]
+        # A large share of all products: walking the global order finds them quickly
+        top = []
+        for key in self._ordered:
+            if key[2] in ids:
+                top.append(key[2])
+                if len(top) == limit:
+                    break
+        return top
+
+    def search(self, text, limit=SEARCH_LIMIT):
+        """Names of the best matches for what has been typed so far.
+
+        Ranking: exact PLU code, then names starting with the whole query,
+        then names whose first word matches, then the rest; shorter names
+        first within each group.
+        """
+        terms = tokenize(text)
+        if not terms:
+            return []
+        ranked = []
+        # A number on its own is a PLU code (the product id)
+        if len(terms) == 1 and terms[0].isdigit() and int(terms[0]) in self._products:
+            ranked.append(int(terms[0]))
+
+        candidates = None
+        # Longest term first keeps the intersections small
+        for term in sorted(terms, key=len, reverse=True):
+            ids = self._words.ids(term)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                break
+        candidates.difference_update(ranked)
+
+        leading = self._leading.ids(terms[0]) & candidates
+        if len(terms) > 1:
+            query = ' '.join(terms)
+            whole = {pid for pid in leading if self._products[pid][1].startswith(query)}
+        else:
+            whole = leading  # one word: a name starting with it is a first-word match
+        for group in (whole, leading - whole, candidates - leading):
+            ranked.extend(self._top(group, limit - len(ranked)))
+        return [self._products[pid][0] for pid in ranked[:limit]]
+
+
+_index = ProductIndex()
+
+
+def search_products(text, limit=SEARCH_LIMIT):
+    """Searches the app-wide product catalog (syncing the index first if it changed)."""
+    _index.sync()
+    return _index.search(text, limit)
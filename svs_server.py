@@ -0,0 +1,403 @@
+"""Local HTTP/JSON billing service for several counters sharing one database.
+
+One process owns svs_sales_db.db. Counters talk to it over HTTP instead of
+each opening the SQLite file:
+
+    GET  /products            [{"name": ..., "rate": ...}, ...]
+    GET  /customers           ["name", ...]
+    GET  /bills?customer=&from=&to=&bill_id=&min_amount=&max_amount=&product=&before=&limit=
+                              {"bills": [...], "count", "total_amount", "next_before"}
+    GET  /bills/<id>          {"bill_id", "transaction_date", "customer_name", "total_amount", "items": [...]}
+    POST /bills               {"customer": ..., "items": [{"name", "quantity", "rate"?}, ...], "pdf": false}
+                              -> 201 {"bill_id", "total_amount", "customer_added", "job_id"?}
+    POST /bills/<id>/pdf      -> 202 {"job_id"}
+    GET  /jobs/<id>           {"status": "queued|done|failed", "pdf_path", "error"}
+
+Reads run concurrently on a fixed pool of request threads (each keeps its
+own warm SQLite connection). Every write goes through one SingleWriter
+thread, which also groups writes that arrive together into one transaction.
+PDFs are rendered by the shared RenderEngine.
+
+    python svs_cli.py serve --port 8765
+"""
+import http.client
+import itertools
+import json
+import queue
+import re
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, urlencode
+
+from svs_catalog import get_catalog
+from svs_core import get_customers, get_bill, make_bill_item, save_bill
+from svs_db import get_db
+from svs_history import HISTORY_PAGE_SIZE, HistoryFilter, count_history, get_history_page
+from svs_render import get_render_engine
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Request threads, i.e. concurrent reads (and open SQLite connections)
+REQUEST_THREADS = 8
+# Writes committed together when several counters save at the same moment
+WRITE_BATCH_SIZE = 32
+# PDF job results kept for GET /jobs/<id>
+MAX_JOBS = 1000
+# Most bill headers one GET /history page may ask for
+MAX_HISTORY_LIMIT = 1000
+
+
+# --- SINGLE WRITER ---
+
+class SingleWriter:
+    """Runs every write on one thread, in arrival order.
+
+    ``submit(func, *args)`` returns a Future. Jobs queued while a commit is in
+    progress are run together in one transaction, each inside its own
+    SAVEPOINT so a failing job does not undo the others. Futures resolve only
+    after the commit.
+    """
+
+    def __init__(self, batch_size=WRITE_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='svs-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, func, *args):
+        future = Future()
+        self._queue.put((func, args, future))
+        return future
+
+    def call(self, func, *args):
+        """submit() and wait for the result."""
+        return self.submit(func, *args).result()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            job = self._queue.get()
+            if job is None:
+                break
+            batch = [job]
+            while len(batch) < self.batch_size:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    stopping = True
+                    break
+                batch.append(job)
+            self._commit(batch)
+
+    def _commit(self, batch):
+        outcomes = []
+        try:
+            with get_db().transaction() as conn:
+                for func, args, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    conn.execute("SAVEPOINT svs_write")
+                    try:
+                        outcomes.append((future, True, func(*args)))
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO svs_write")
+                        outcomes.append((future, False, e))
+                    conn.execute("RELEASE svs_write")
+        except Exception as e:
+            traceback.print_exc()
+            for _func, _args, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, ok, value in outcomes:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def shutdown(self):
+        self._queue.put(None)
+        self._thread.join()
+
+
+# --- HTTP ---
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _bill_to_json(bill):
+    bill_id, date, customer, total, items = bill
+    return {
+        'bill_id': bill_id,
+        'transaction_date': date,
+        'customer_name': customer,
+        'total_amount': total,
+        'items': [{'name': n, 'quantity': q, 'rate': r, 'total': t} for n, q, r, t in items],
+    }
+
+
+class BillingService:
+    """The API itself, independent of the HTTP plumbing."""
+
+    def __init__(self, engine=None):
+        self.writer = SingleWriter()
+        self.engine = engine or get_render_engine()
+        self._jobs = OrderedDict()
+        self._job_ids = itertools.count(1)
+        self._jobs_lock = threading.Lock()
+
+    def products(self):
+        catalog = get_catalog()
+        catalog.refresh_if_changed()  # another process may have edited the rates
+        return [{'name': name, 'rate': rate} for name, rate in catalog.products()]
+
+    def customers(self):
+        return get_customers()
+
+    def history(self, query):
+        """One keyset page of bill headers matching the query parameters, with totals."""
+        try:
+            filters = HistoryFilter(
+                customer=query.get('customer'), start_date=query.get('from'), end_date=query.get('to'),
+                bill_id=int(query['bill_id']) if query.get('bill_id') else None,
+                min_amount=float(query['min_amount']) if query.get('min_amount') else None,
+                max_amount=float(query['max_amount']) if query.get('max_amount') else None,
+                product=query.get('product'),
+            )
+            before = int(query['before']) if query.get('before') else None
+            limit = min(int(query.get('limit') or HISTORY_PAGE_SIZE), MAX_HISTORY_LIMIT)
+            if limit < 1:
+                raise ApiError(400, "limit must be at least 1.")
+            rows = get_history_page(before, limit, filters)
+            count, total_amount = count_history(filters)
+        except ValueError as e:
+            raise ApiError(400, f"Bad filter: {e}")
+        return {
+            'bills': [dict(zip(('bill_id', 'transaction_date', 'customer_name', 'total_amount'), row)) for row in rows],
+            'count': count,
+            'total_amount': total_amount,
+            'next_before': rows[-1][0] if len(rows) == limit else None,
+        }
+
+    def bill(self, bill_id):
+        bill = get_bill(bill_id)
+        if bill is None:
+            raise ApiError(404, f"Bill {bill_id} not found.")
+        return _bill_to_json(bill)
+
+    def create_bill(self, body):
+        customer = str(body.get('customer') or '').strip()
+        if not customer:
+            raise ApiError(400, "customer is required.")
+        lines = body.get('items') or []
+        if not lines:
+            raise ApiError(400, "items must not be empty.")
+        get_catalog().refresh_if_changed()
+        try:
+            # Rate lookups come from the catalog; only the insert goes through the writer
+            items = [make_bill_item(line['name'], line['quantity'], line.get('rate')) for line in lines]
+        except (KeyError, TypeError, ValueError) as e:
+            raise ApiError(400, f"Bad bill line: {e}")
+        total_amount = sum(item[3] for item in items)
+        bill_id, customer_added = self.writer.call(save_bill, customer, items, total_amount)
+        result = {'bill_id': bill_id, 'total_amount': total_amount, 'customer_added': customer_added}
+        if body.get('pdf'):
+            result['job_id'] = self._render(bill_id, customer, items, total_amount)
+        return result
+
+    def enqueue_pdf(self, bill_id):
+        bill = get_bill(bill_id)
+        if bill is None:
+            raise ApiError(404, f"Bill {bill_id} not found.")
+        bill_id, _date, customer, total, items = bill
+        return {'job_id': self._render(bill_id, customer, items, total)}
+
+    def _render(self, bill_id, customer, items, total_amount):
+        future = self.engine.submit(bill_id, customer, items, total_amount)
+        with self._jobs_lock:
+            job_id = next(self._job_ids)
+            self._jobs[job_id] = future
+            while len(self._jobs) > MAX_JOBS:
+                self._jobs.popitem(last=False)
+        return job_id
+
+    def job(self, job_id):
+        with self._jobs_lock:
+            future = self._jobs.get(job_id)
+        if future is None:
+            raise ApiError(404, f"Job {job_id} not found.")
+        if not future.done():
+            return {'job_id': job_id, 'status': 'queued', 'pdf_path': None, 'error': None}
+        error = future.exception()
+        return {
+            'job_id': job_id,
+            'status': 'failed' if error else 'done',
+            'pdf_path': None if error else future.result(),
+            'error': str(error) if error else None,
+        }
+
+    def shutdown(self):
+        self.writer.shutdown()
+
+
+ROUTES = [
+    ('GET', re.compile(r'/products'), lambda s, m, body: (200, s.products())),
+    ('GET', re.compile(r'/customers'), lambda s, m, body: (200, s.customers())),
+    ('GET', re.compile(r'/bills'), lambda s, m, body: (200, s.history(body))),
+    ('GET', re.compile(r'/bills/(\d+)'), lambda s, m, body: (200, s.bill(int(m[1])))),
+    ('POST', re.compile(r'/bills'), lambda s, m, body: (201, s.create_bill(body))),
+    ('POST', re.compile(r'/bills/(\d+)/pdf'), lambda s, m, body: (202, s.enqueue_pdf(int(m[1])))),
+    ('GET', re.compile(r'/jobs/(\d+)'), lambda s, m, body: (200, s.job(int(m[1])))),
+]
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, so a counter reuses one connection
+    timeout = 30  # idle keep-alive connections give their thread back
+    # Headers and body leave in one segment: with Nagle and delayed ACKs a
+    # split response costs ~40 ms per request
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        path, _, query = self.path.partition('?')
+        path = path.rstrip('/')
+        try:
+            # GET routes take their arguments from the query string
+            body = dict(parse_qsl(query))
+            length = int(self.headers.get('Content-Length') or 0)
+            if length:
+                try:
+                    body = json.loads(self.rfile.read(length))
+                except ValueError:
+                    raise ApiError(400, "Request body is not valid JSON.")
+                if not isinstance(body, dict):
+                    raise ApiError(400, "Request body must be a JSON object.")
+            for route_method, pattern, handler in ROUTES:
+                match = pattern.fullmatch(path)
+                if match and route_method == method:
+                    status, payload = handler(self.server.service, match, body)
+                    break
+            else:
+                raise ApiError(404, f"No route for {method} {path}.")
+        except ApiError as e:
+            status, payload = e.status, {'error': str(e)}
+        except Exception as e:
+            traceback.print_exc()
+            status, payload = 500, {'error': str(e)}
+        self._send(status, payload)
+
+    def _send(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # one line per request is too noisy for a shop PC console
+
+
+class BillingServer(HTTPServer):
+    """HTTPServer that handles connections on a fixed thread pool.
+
+    A thread per connection would open a new SQLite connection each time;
+    a pool keeps REQUEST_THREADS warm connections for the reads.
+    """
+
+    def __init__(self, address, service, threads=REQUEST_THREADS):
+        super().__init__(address, RequestHandler)
+        self.service = service
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='svs-http')
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=True)
+        self.service.shutdown()
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, engine=None, threads=REQUEST_THREADS):
+    """Creates a BillingServer; call serve_forever() (port 0 picks a free port)."""
+    return BillingServer((host, port), BillingService(engine), threads)
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, engine=None, threads=REQUEST_THREADS):
+    server = make_server(host, port, engine, threads)
+    print(f"SVS billing API on http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# --- CLIENT ---
+
+class BillingClient:
+    """Thin client for a counter; keeps one keep-alive connection (one per thread)."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=30):
+        self._conn = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if data else {}
+        self._conn.request(method, path, body=data, headers=headers)
+        response = self._conn.getresponse()
+        payload = json.loads(response.read() or b'null')
+        if response.status >= 400:
+            raise ApiError(response.status, payload.get('error') if isinstance(payload, dict) else payload)
+        return payload
+
+    def products(self):
+        return self.request('GET', '/products')
+
+    def customers(self):
+        return self.request('GET', '/customers')
+
+    def history(self, **query):
+        """One page of bills; see GET /bills for the query names (None values are dropped)."""
+        query = {k: v for k, v in query.items() if v is not None}
+        return self.request('GET', '/bills' + ('?' + urlencode(query) if query else ''))
+
+    def bill(self, bill_id):
+        return self.request('GET', f'/bills/{bill_id}')
+
+    def create_bill(self, customer, items, pdf=False):
+        return self.request('POST', '/bills', {'customer': customer, 'items': items, 'pdf': pdf})
+
+    def enqueue_pdf(self, bill_id):
+        return self.request('POST', f'/bills/{bill_id}/pdf')['job_id']
+
+    def job(self, job_id):
+        return self.request('GET', f'/jobs/{job_id}')
+
+    def close(self):
+        self._conn.close()
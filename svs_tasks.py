@@ -0,0 +1,95 @@
+"""Background job runner for the SVS billing app.
+
+Slow work (PDF rendering, report queries) runs on worker threads so the Tk
+main loop keeps responding. Workers never touch widgets: finished jobs are
+queued and delivered back on the Tk thread by an ``after()`` polling loop,
+where their callbacks may update the UI safely.
+"""
+import queue
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_INTERVAL_MS = 100
+
+
+class TaskRunner:
+    """Runs jobs on a small thread pool and reports results on the UI thread.
+
+    ``after`` is the scheduler of the owning widget (``widget.after``). The
+    runner tracks how many jobs are pending and keeps failed jobs so they can
+    be shown and retried.
+    """
+
+    def __init__(self, after, max_workers=2, poll_ms=POLL_INTERVAL_MS):
+        self._after = after
+        self._poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='svs-worker')
+        self._results = queue.Queue()
+        self._listeners = []
+        self.pending = 0
+        self.failed = []  # [(label, error, retry_callable)]
+        self._after(self._poll_ms, self._poll)
+
+    def add_listener(self, callback):
+        """Registers callback(runner), called on the UI thread when status changes."""
+        self._listeners.append(callback)
+
+    def submit(self, label, func, *args, on_done=None, on_error=None):
+        """Runs func(*args) on a worker.
+
+        on_done(result) or on_error(exc) is later called on the UI thread.
+        Failed jobs without on_error are kept in ``failed`` for retry.
+        """
+        self.pending += 1
+        self._notify()
+
+        def retry():
+            self.submit(label, func, *args, on_done=on_done, on_error=on_error)
+
+        def run():
+            try:
+                result = func(*args)
+            except Exception as e:
+                traceback.print_exc()
+                self._results.put((label, False, e, on_done, on_error, retry))
+            else:
+                self._results.put((label, True, result, on_done, on_error, retry))
+
+        self._executor.submit(run)
+
+    def retry_failed(self):
+        """Resubmits every failed job."""
+        failed, self.failed = self.failed, []
+        for _label, _error, retry in failed:
+            retry()
+        self._notify()
+
+    def _poll(self):
+        changed = False
+        while True:
+            try:
+                label, ok, value, on_done, on_error, retry = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            changed = True
+            try:
+                if ok:
+                    if on_done:
+                        on_done(value)
+                elif on_error:
+                    on_error(value)
+                else:
+                    self.failed.append((label, value, retry))
+            except Exception:
+                traceback.print_exc()
+        if changed:
+            self._notify()
+        self._after(self._poll_ms, self._poll)
+
+    def _notify(self):
+        for callback in self._listeners:
+            callback(self)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,125 @@
+"""Soft delete, multi-level undo and tombstone compaction for bills.
+
+Deleting a bill used to be a hard DELETE with a single in-memory copy for
+"Undo", and clearing the history or merging a weekly bill could not be
+undone at all. Now a delete only stamps ``deleted_at`` on the bills (a
+tombstone) and records the action in ``undo_log``, all in one transaction.
+Live queries filter on ``deleted_at IS NULL`` and use partial indexes that
+hold live bills only, and the rollup triggers treat a tombstone as deleted.
+
+undo_last() revives the bills of the newest undo_log entry, so repeated
+undos walk back through earlier deletes, also after a restart. compact()
+purges tombstones older than UNDO_KEEP_DAYS in small batches (their line
+items go with them) and VACUUMs when much of the file is free; the
+weekly maintenance task (svs_maintenance) runs it.
+"""
+import json
+import os
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from svs_db import get_db
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Deletes can be undone for this long; compaction purges older tombstones
+UNDO_KEEP_DAYS = int(os.getenv('SVS_UNDO_KEEP_DAYS', '30'))
+# Bills purged per transaction, so the counter's writes never wait long
+COMPACT_BATCH_SIZE = 500
+# VACUUM once at least this share of the database file is free pages
+VACUUM_FREE_RATIO = 0.25
+
+UndoEntry = namedtuple('UndoEntry', 'undo_id created_at action bill_count')
+CompactResult = namedtuple('CompactResult', 'purged_bills dropped_entries vacuumed')
+
+
+def soft_delete(where, params, action, db=None):
+    """Tombstones the live bills matching ``where`` as one undo step.
+
+    where is an SQL condition on sales_history with ? placeholders for
+    params. Returns the UndoEntry, or None when no live bill matched.
+    """
+    now = datetime.now().strftime(DATE_FORMAT)
+    with (db or get_db()).transaction() as conn:
+        undo_id = conn.execute(
+            "INSERT INTO undo_log (created_at, action, bill_count) VALUES (?, ?, 0)", (now, action)
+        ).lastrowid
+        bill_count = conn.execute(
+            f"UPDATE sales_history SET deleted_at = ?, deleted_by = ? WHERE deleted_at IS NULL AND ({where})",
+            (now, undo_id, *params),
+        ).rowcount
+        if not bill_count:
+            conn.execute("DELETE FROM undo_log WHERE undo_id = ?", (undo_id,))
+            return None
+        conn.execute("UPDATE undo_log SET bill_count = ? WHERE undo_id = ?", (bill_count, undo_id))
+    return UndoEntry(undo_id, now, action, bill_count)
+
+
+def delete_bills(bill_ids, action=None, db=None):
+    """Tombstones the given bills as one undo step; returns the UndoEntry or None."""
+    bill_ids = [int(bill_id) for bill_id in bill_ids]
+    if not bill_ids:
+        return None
+    if action is None:
+        action = f"Delete bill {bill_ids[0]}" if len(bill_ids) == 1 else f"Delete {len(bill_ids)} bills"
+    # A JSON array keeps this one statement however many ids there are
+    return soft_delete("bill_id IN (SELECT value FROM json_each(?))", (json.dumps(bill_ids),), action, db=db)
+
+
+def undo_stack(limit=None, db=None):
+    """Undoable actions, newest first."""
+    return [UndoEntry(*row) for row in (db or get_db()).query(
+        "SELECT undo_id, created_at, action, bill_count FROM undo_log ORDER BY undo_id DESC LIMIT ?",
+        (-1 if limit is None else limit,),
+    )]
+
+
+def undo_last(db=None):
+    """Revives the bills of the newest undo step; returns its UndoEntry, or None if there is none."""
+    with (db or get_db()).transaction() as conn:
+        row = conn.execute(
+            "SELECT undo_id, created_at, action, bill_count FROM undo_log ORDER BY undo_id DESC LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE sales_history SET deleted_at = NULL, deleted_by = NULL WHERE deleted_by = ? AND deleted_at IS NOT NULL",
+            (row[0],),
+        )
+        conn.execute("DELETE FROM undo_log WHERE undo_id = ?", (row[0],))
+    return UndoEntry(*row)
+
+
+# --- COMPACTION ---
+
+def compact(keep_days=UNDO_KEEP_DAYS, vacuum=True, now=None, batch_size=COMPACT_BATCH_SIZE, db=None):
+    """Purges tombstones (and their undo steps) older than keep_days.
+
+    Runs in batches of batch_size bills per transaction; safe to run from a
+    background thread while bills are being saved. Returns a CompactResult.
+    """
+    db = db or get_db()
+    now = now or datetime.now()
+    cutoff = (now - timedelta(days=keep_days)).strftime(DATE_FORMAT)
+    purged = dropped = 0
+    for (undo_id,) in db.query("SELECT undo_id FROM undo_log WHERE created_at < ? ORDER BY undo_id", (cutoff,)):
+        while True:
+            with db.transaction() as conn:
+                deleted = conn.execute('''
+                    DELETE FROM sales_history WHERE bill_id IN (
+                        SELECT bill_id FROM sales_history WHERE deleted_by = ? AND deleted_at IS NOT NULL LIMIT ?)
+                ''', (undo_id, batch_size)).rowcount
+                purged += deleted
+                if deleted < batch_size:
+                    conn.execute("DELETE FROM undo_log WHERE undo_id = ?", (undo_id,))
+                    dropped += 1
+                    break
+
+    vacuumed = False
+    if vacuum:
+        free_pages = db.query_one("PRAGMA freelist_count")[0]
+        pages = db.query_one("PRAGMA page_count")[0]
+        if pages and free_pages >= pages * VACUUM_FREE_RATIO:
+            db.execute("VACUUM")
+            vacuumed = True
+    return CompactResult(purged, dropped, vacuumed)
@@ -0,0 +1,35 @@
+# Shared fixtures: a fresh shop database per test and a helper to fill it
+import pytest
+
+import svs_db
+from svs_sales import save_bill_items
+
+INSERT_BILL_SQL = "INSERT INTO sales_history (transaction_date, customer_name, total_amount, items_json) VALUES (?, ?, ?, ?)"
+
+
+@pytest.fixture
+def db(tmp_path):
+    """An empty database with the current schema, closed after the test."""
+    db = svs_db.Database(str(tmp_path / "shop.db"))
+    with db.transaction() as conn:
+        svs_db.create_schema(conn)
+    yield db
+    db.close()
+
+
+def add_bills(conn, rows):
+    """Inserts (transaction_date, customer, total_amount[, items]) rows; returns the new bill ids.
+
+    items is a list of (name, quantity, rate, total) lines, saved to
+    sales_items, or a string stored as legacy items_json. Without it the
+    bill has no lines.
+    """
+    bill_ids = []
+    for transaction_date, customer, total_amount, *items in rows:
+        items = items[0] if items else []
+        legacy = isinstance(items, str)
+        bill_id = conn.execute(INSERT_BILL_SQL, (transaction_date, customer, total_amount, items if legacy else '')).lastrowid
+        if items and not legacy:
+            save_bill_items(conn, bill_id, items)
+        bill_ids.append(bill_id)
+    return bill_ids
@@ -0,0 +1,71 @@
+# Tests for archiving old years into svs_sales_YYYY.db files
+import pytest
+
+import svs_db
+from conftest import add_bills
+from svs_archive import archive_bills, list_archives
+from svs_consolidate import active_customers, consolidate_customer, consolidate_customers
+from svs_history import HistoryFilter, HistoryPager, count_history
+from svs_sales import iter_bills_with_items, load_bill_items
+from svs_undo import delete_bills
+
+DATES = ["2022-11-03", "2023-02-14", "2023-06-01", "2023-12-31", "2024-01-02", "2024-03-05"]
+
+
+@pytest.fixture
+def db(db):
+    """The shared database with three bills on each of DATES, from 2022 to 2024."""
+    with db.transaction() as conn:
+        add_bills(conn, [(f"{day} 10:00:00", f"C{i % 2}", 10.0 * i, [("Tomato", 1.0, 5.0 * i, 5.0 * i), ("Onion", 1.0, 5.0 * i, 5.0 * i)])
+                         for i, day in enumerate(DATES * 3, start=1)])
+    return db
+
+
+def snapshot(db):
+    pager = HistoryPager(page_size=4, db=db)
+    filters = [None, HistoryFilter(customer="C1"), HistoryFilter(start_date="2023-01-01", end_date="2024-01-31"),
+               HistoryFilter(product="Onion", min_amount=50), HistoryFilter(bill_id=3)]
+    return (
+        [pager.get(i) for i in range(len(pager))],
+        [count_history(f, db=db) for f in filters],
+        [(b.bill_id, b.items) for b in iter_bills_with_items("2023-06-01", "2024-01-02", ["C0"], db=db)],
+        [(s.customer, s.items, s.bill_count) for s in consolidate_customers(["C0", "C1"], "2022-01-01", "2024-12-31", db=db)],
+        active_customers("2023-01-01", "2023-12-31", db=db),
+    )
+
+
+def test_archived_years_read_like_the_hot_database(db, tmp_path):
+    delete_bills([1], db=db)  # tombstones stay in the hot database
+    before = snapshot(db)
+
+    result = archive_bills("2024-01-01", batch_size=4, db=db)
+    assert (result.years, result.bills) == ([2022, 2023], 11)
+    assert sorted(p.name for p in tmp_path.glob("svs_sales_*.db")) == ["svs_sales_2022.db", "svs_sales_2023.db"]
+    assert db.query_one("SELECT COUNT(*) FROM sales_history WHERE deleted_at IS NULL")[0] == 6
+    assert db.query_one("SELECT COUNT(*) FROM sales_items")[0] == 14  # 6 live + the tombstone's
+    assert [(a.year, a.bill_count, a.first_date) for a in list_archives(db)] == [(2023, 9, "2023-02-14"), (2022, 2, "2022-11-03")]
+    assert archive_bills("2024-01-01", db=db).bills == 0
+
+    # A fresh connection attaches the archives on demand
+    db.close()
+    db = svs_db.Database(db.path)
+    assert snapshot(db) == before
+    assert load_bill_items(7, db=db) == [("Tomato", 1.0, 35.0, 35.0), ("Onion", 1.0, 35.0, 35.0)]
+    statement = consolidate_customer("C0", "2023-12-25", "2024-03-10", db=db)  # archive and hot
+    assert (statement.bill_count, statement.date_range) == (6, "31-Dec-2023 to 05-Mar-2024")
+    assert delete_bills([7], db=db) is None  # archived bills are read-only
+    db.close()
+
+
+def test_first_page_does_not_open_archives(db):
+    archive_bills("2023-01-01", db=db)
+    db.close()
+    db = svs_db.Database(db.path)
+    pager = HistoryPager(page_size=5, db=db)
+    assert pager.get(0)[0] == 18
+    assert (len(pager), pager.total_amount) == (18, 1710.0)  # archive counted from sales_archives
+    assert count_history(HistoryFilter(start_date="2022-01-01"), db=db)[0] == 18
+    assert [row[1] for row in db.query("PRAGMA database_list")] == ["main"]
+    assert pager.get(len(pager) - 1)[0] == 1
+    assert "archive_2022" in [row[1] for row in db.query("PRAGMA database_list")]
+    db.close()
@@ -0,0 +1,108 @@
+# Tests for bill streaming and the batch reprint job
+import csv
+import json
+
+import pytest
+
+from conftest import add_bills
+from svs_batch import print_day_end, read_ledger, reprint_bills, run_statements
+from svs_render import RenderEngine
+from svs_sales import iter_bills_with_items
+
+LINES = [("Tomato", 2.0, 20.0, 40.0), ("Onion", 2.0, 30.0, 60.0)]
+
+
+@pytest.fixture
+def db(db):
+    """The shared database with four bills from 1 to 3 March and a legacy one."""
+    with db.transaction() as conn:
+        add_bills(conn, [
+            ("2024-03-01 09:00:00", "Hotel A", 100.0, LINES),
+            ("2024-03-02 18:30:00", "Hotel B", 100.0, LINES),
+            ("2024-03-02 23:59:59", "Hotel A", 100.0, LINES),
+            ("2024-03-03 08:00:00", "Hotel A", 100.0, LINES),
+            # A legacy bill whose lines are still in items_json
+            ("2024-03-02 12:00:00", "Hotel B", 30.0, json.dumps([["Beans", 1.0, 30.0, 30.0]])),
+        ])
+    return db
+
+
+def test_stream_filters_by_inclusive_dates_and_customers(db):
+    bills = list(iter_bills_with_items("2024-03-02", "2024-03-02", db=db))
+    assert [b.bill_id for b in bills] == [2, 3, 5]
+    assert bills[0].items == [("Tomato", 2.0, 20.0, 40.0), ("Onion", 2.0, 30.0, 60.0)]
+    assert bills[2].items == [("Beans", 1.0, 30.0, 30.0)]
+
+    bills = list(iter_bills_with_items(customers=["Hotel A"], db=db))
+    assert [b.bill_id for b in bills] == [1, 3, 4]
+
+
+def test_reprint_writes_pdfs_and_manifest(db, tmp_path):
+    folder = tmp_path / "run"
+    folder.mkdir()
+    result = reprint_bills("2024-03-02", None, ["Hotel A"], engine=RenderEngine(workers=0), folder=str(folder), db=db)
+    assert (result.rendered, result.failed) == (2, 0)
+    assert result.bills_per_sec > 0
+
+    with open(result.manifest_path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['bill_id'] for row in rows] == ['3', '4']
+    assert all(row['status'] == 'ok' for row in rows)
+    for row in rows:
+        with open(row['pdf_path'], 'rb') as pdf:
+            assert pdf.read(4) == b'%PDF'
+
+
+def test_day_end_merges_bills_into_one_pdf(db, tmp_path):
+    pdf_path = str(tmp_path / "dayend.pdf")
+    result = print_day_end("2024-03-02", engine=RenderEngine(workers=0), filename=pdf_path, db=db)
+    assert (result.pdf_path, result.bill_count, result.total_amount) == (pdf_path, 3, 230.0)
+    with open(pdf_path, 'rb') as f:
+        data = f.read()
+    # Summary page + one page per bill
+    assert data.count(b'/Type /Page\n') == 4
+    assert print_day_end("2024-04-01", engine=RenderEngine(workers=0), db=db).pdf_path is None
+
+
+def test_statement_run_is_resumable(db, tmp_path):
+    folder = str(tmp_path / "statements")
+
+    class Interrupted(Exception):
+        pass
+
+    def stop_after_first(done, total, failed):
+        if done == 1:
+            raise Interrupted()
+
+    # Killed after the first statement: the ledger already has it
+    try:
+        run_statements("2024-03-01", "2024-03-07", engine=RenderEngine(workers=0), folder=folder,
+                       max_in_flight=1, progress=stop_after_first, db=db)
+    except Interrupted:
+        pass
+    assert list(read_ledger(f"{folder}/ledger.csv")) == ["Hotel A"]
+
+    result = run_statements("2024-03-01", "2024-03-07", engine=RenderEngine(workers=0), folder=folder, db=db)
+    assert (result.customers, result.rendered, result.skipped, result.failed) == (2, 1, 1, 0)
+    assert result.total_amount == 430.0
+    ledger = read_ledger(result.ledger_path)
+    assert ledger["Hotel A"]["bill_count"] == "3" and ledger["Hotel B"]["total_amount"] == "130.00"
+    assert ledger["Hotel B"]["date_range"] == "02-Mar-2024 to 02-Mar-2024"
+    with open(ledger["Hotel B"]["pdf_path"], 'rb') as pdf:
+        assert pdf.read(4) == b'%PDF'
+
+    # Only a customer whose bills changed is rendered again
+    with db.transaction() as conn:
+        add_bills(conn, [("2024-03-05 10:00:00", "Hotel B", 40.0, [("Tomato", 2.0, 20.0, 40.0)])])
+    result = run_statements("2024-03-01", "2024-03-07", engine=RenderEngine(workers=0), folder=folder, db=db)
+    assert (result.rendered, result.skipped) == (1, 1)
+    assert read_ledger(result.ledger_path)["Hotel B"]["bill_count"] == "3"
+
+
+def test_statements_of_names_with_the_same_file_stem_do_not_collide(db, tmp_path):
+    with db.transaction() as conn:
+        add_bills(conn, [("2024-03-12 10:00:00", "A/B", 40.0, LINES[:1]), ("2024-03-12 11:00:00", "AB", 60.0, LINES[1:])])
+    result = run_statements("2024-03-11", "2024-03-17", engine=RenderEngine(workers=0), folder=str(tmp_path / "run"), db=db)
+    ledger = read_ledger(result.ledger_path)
+    assert result.rendered == 2 and ledger["A/B"]["pdf_path"] != ledger["AB"]["pdf_path"]
+    assert len(list((tmp_path / "run").glob("*.pdf"))) == 2
@@ -0,0 +1,61 @@
+# Tests for the bill being entered: its lines, total and pooled rows
+from svs_core import BillLines
+
+
+class FakeView:
+    """Stands in for the billing screen; rows are dicts instead of widgets."""
+
+    def __init__(self):
+        self.built = 0
+        self.shown = []  # rows in screen order, like pack()
+
+    def make_bill_row(self):
+        self.built += 1
+        return {'id': self.built}
+
+    def fill_bill_row(self, row, item):
+        row['item'] = item
+
+    def show_bill_row(self, row):
+        self.shown.append(row)
+
+    def hide_bill_row(self, row):
+        self.shown.remove(row)
+
+    def screen(self):
+        return [row['item'][0] for row in self.shown]
+
+
+def test_removing_a_middle_line_keeps_rows_and_items_in_step():
+    view = FakeView()
+    lines = BillLines(view)
+    for name, total in (("Tomato", 10.0), ("Onion", 20.0), ("Beans", 30.0)):
+        lines.add((name, 1.0, total, total))
+    assert view.screen() == ["Tomato", "Onion", "Beans"] and lines.total == 60.0
+
+    middle = lines.rows[1]
+    assert lines.remove(lines.index_of(middle))[0] == "Onion"
+    assert view.screen() == ["Tomato", "Beans"] and lines.total == 40.0
+    # The X button of the last row now removes position 1
+    assert lines.index_of(view.shown[1]) == 1
+
+    lines.add(("Garlic", 1.0, 5.0, 5.0))
+    assert view.built == 3  # the hidden row was reused
+    assert view.screen() == ["Tomato", "Beans", "Garlic"]
+    assert [row['item'] for row in lines.rows] == lines.items
+
+
+def test_loading_an_edited_bill_refills_and_trims_rows():
+    view = FakeView()
+    lines = BillLines(view)
+    for i in range(4):
+        lines.add((f"Item {i}", 1.0, 1.0, 1.0))
+
+    lines.load([["Tomato", 2.0, 25.0, 50.0], ["Onion", 1.0, 35.0, 35.0]])
+    assert view.screen() == ["Tomato", "Onion"] and lines.total == 85.0
+    assert lines.items == [("Tomato", 2.0, 25.0, 50.0), ("Onion", 1.0, 35.0, 35.0)]
+
+    lines.load([(f"Item {i}", 1.0, 1.0, 1.0) for i in range(5)])
+    assert view.built == 5 and len(view.shown) == 5
+    lines.load()
+    assert view.shown == [] and lines.items == [] and lines.total == 0
@@ -0,0 +1,49 @@
+# Tests for the in-memory product catalog
+import pytest
+
+import svs_db
+from svs_catalog import ProductCatalog
+from svs_core import delete_product, get_product_rate, save_product
+
+
+@pytest.fixture
+def db(db):
+    """The shared database with three products."""
+    db.executemany("INSERT INTO products (name, rate_per_kg) VALUES (?, ?)",
+                   [("Tomato (தக்காளி)", 25.0), ("Onion (வெங்காயம்)", 35.0), ("Beans (பீன்ஸ்)", 50.0)])
+    return db
+
+
+def test_lookups_need_no_queries_until_products_change(db):
+    catalog = ProductCatalog(db)
+    assert catalog.names() == ["Beans (பீன்ஸ்)", "Onion (வெங்காயம்)", "Tomato (தக்காளி)"]
+    generation = catalog.generation
+
+    statements = []
+    db.connection().set_trace_callback(statements.append)
+    assert catalog.rate("Onion (வெங்காயம்)") == 35.0 and catalog.rate("Nope") == 0.0
+    assert catalog.get("Beans (பீன்ஸ்)")[1] == 50.0
+    assert not catalog.refresh_if_changed()
+    assert len(statements) == 1 and "schema_meta" in statements[0]
+
+    # Another process edits a rate: the trigger-kept counter gives it away
+    other = svs_db.Database(db.path)
+    other.execute("UPDATE products SET rate_per_kg = 30 WHERE name = 'Tomato (தக்காளி)'")
+    assert catalog.rate("Tomato (தக்காளி)") == 25.0
+    assert catalog.refresh_if_changed()
+    assert catalog.rate("Tomato (தக்காளி)") == 30.0 and catalog.generation == generation + 1
+    db.connection().set_trace_callback(None)
+    other.close()
+
+
+def test_save_and_delete_invalidate_the_shared_catalog(db):
+    svs_db.configure(db.path)
+    try:
+        assert get_product_rate("Beans (பீன்ஸ்)") == 50.0
+        save_product("Beans (பீன்ஸ்)", 55.0)
+        save_product("Garlic (பூண்டு)", 130.0)
+        assert get_product_rate("Beans (பீன்ஸ்)") == 55.0 and get_product_rate("Garlic (பூண்டு)") == 130.0
+        delete_product("Garlic (பூண்டு)")
+        assert get_product_rate("Garlic (பூண்டு)") == 0.0
+    finally:
+        svs_db.configure()
@@ -0,0 +1,39 @@
+# Tests for the headless command line
+import csv
+import json
+
+import svs_cli
+import svs_db
+
+
+def test_bill_consolidate_dashboard_and_export(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    db_path = str(tmp_path / "cli.db")
+    (tmp_path / "bill.json").write_text(json.dumps([{"name": "Tomato (தக்காளி)", "quantity": 2}, ["Onion", 1.5, 40]]), encoding="utf-8")
+    (tmp_path / "bill.csv").write_text("name,quantity,rate\nGarlic,0.5,200\n")
+    try:
+        assert svs_cli.main(["--db", db_path, "bill", "--customer", "Hotel A", "--items", "bill.json", "--workers", "0"]) == 0
+        assert svs_cli.main(["--db", db_path, "bill", "--customer", "Hotel A", "--items", "bill.csv", "--no-pdf"]) == 0
+        out = capsys.readouterr().out
+        assert "Bill (ID: 1)" in out and "Bill (ID: 2)" in out and ".pdf" in out
+
+        # Unknown products without a rate are refused, nothing is saved
+        (tmp_path / "bad.json").write_text(json.dumps([["No Such Veg", 1]]))
+        assert svs_cli.main(["--db", db_path, "bill", "--customer", "Hotel A", "--items", "bad.json", "--no-pdf"]) == 2
+
+        assert svs_cli.main(["--db", db_path, "consolidate", "--customer", "Hotel A", "--workers", "0", "--delete"]) == 0
+        assert "2 bill(s) for Hotel A" in capsys.readouterr().out
+        assert svs_cli.main(["--db", db_path, "consolidate", "--customer", "Hotel A", "--workers", "0"]) == 1
+
+        assert svs_cli.main(["--db", db_path, "bill", "--customer", "Hotel B", "--items", "bill.csv", "--no-pdf"]) == 0
+        capsys.readouterr()
+        assert svs_cli.main(["--db", db_path, "dashboard", "--json"]) == 0
+        summary = json.loads(capsys.readouterr().out)
+        assert summary["Today"] == {"total_amount": 100.0, "bill_count": 1}
+
+        assert svs_cli.main(["--db", db_path, "export", "--out", "history.csv", "--items"]) == 0
+        with open(tmp_path / "history.csv", newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert [(r["customer_name"], r["product_name"], r["total"]) for r in rows] == [("Hotel B", "Garlic", "100.0")]
+    finally:
+        svs_db.configure()
@@ -0,0 +1,55 @@
+# Tests for the date-windowed weekly consolidation
+import json
+
+from conftest import add_bills
+from svs_consolidate import (CONSOLIDATE_SQL, consolidate_customer, delete_consolidated,
+                             resolve_window, week_window)
+
+
+def add_bill(db, when, customer, items, legacy=False):
+    total = sum(item[3] for item in items)
+    with db.transaction() as conn:
+        return add_bills(conn, [(when, customer, total, json.dumps(items) if legacy else items)])[0]
+
+
+def test_week_window():
+    assert week_window("2024-03-13") == ("2024-03-11", "2024-03-17")  # a Wednesday
+    assert week_window("2024-03-11 08:00:00") == ("2024-03-11", "2024-03-17")
+    assert resolve_window("2024-03-01") == ("2024-03-01", "2024-03-07")
+    assert resolve_window(end_date="2024-03-07") == ("2024-03-01", "2024-03-07")
+
+
+def test_consolidates_only_the_window(db):
+    edited = add_bill(db, "2024-03-10 23:59:00", "Hotel A", [("Tomato", 1.0, 25.0, 25.0)])  # Sunday before
+    add_bill(db, "2024-03-11 09:00:00", "Hotel A", [("Tomato", 2.0, 25.0, 50.0), ("Onion", 1.0, 35.0, 35.0)])
+    add_bill(db, "2024-03-11 17:00:00", "Hotel A", [("Tomato", 1.0, 25.0, 25.0)])
+    add_bill(db, "2024-03-13 09:00:00", "Hotel A", [("Tomato", 1.0, 30.0, 30.0)], legacy=True)
+    add_bill(db, "2024-03-17 20:00:00", "Hotel A", [("Onion", 0.5, 35.0, 17.5)])
+    add_bill(db, "2024-03-12 09:00:00", "Hotel B", [("Tomato", 9.0, 25.0, 225.0)])
+    add_bill(db, "2024-03-18 00:00:00", "Hotel A", [("Tomato", 1.0, 25.0, 25.0)])  # Monday after
+
+    result = consolidate_customer("Hotel A", *week_window("2024-03-13"), db=db)
+    assert result.bill_count == 4
+    assert result.total_amount == 157.5
+    assert result.date_range == "11-Mar-2024 to 17-Mar-2024"
+    lines = {(item['name'], item['rate']): item for item in result.items}
+    assert lines[("Tomato", 25.0)]['quantity'] == 3.0 and lines[("Tomato", 25.0)]['total'] == 75.0
+    assert lines[("Tomato", 25.0)]['dates'] == ["11 Mar"]  # two bills on one day, one label
+    assert lines[("Tomato", 30.0)]['quantity'] == 1.0  # read from legacy items_json
+    assert lines[("Onion", 35.0)]['dates'] == ["11 Mar", "17 Mar"]
+
+    # Bills saved or edited into the window after consolidating stay, as do bills outside it
+    add_bill(db, "2024-03-14 09:00:00", "Hotel A", [("Onion", 1.0, 35.0, 35.0)])
+    db.execute("UPDATE sales_history SET transaction_date = '2024-03-15 10:00:00' WHERE bill_id = ?", (edited,))
+    assert delete_consolidated(result, db=db) == 4
+    remaining = db.query("SELECT transaction_date, customer_name FROM sales_history WHERE deleted_at IS NULL ORDER BY transaction_date")
+    assert remaining == [("2024-03-12 09:00:00", "Hotel B"), ("2024-03-14 09:00:00", "Hotel A"),
+                         ("2024-03-15 10:00:00", "Hotel A"), ("2024-03-18 00:00:00", "Hotel A")]
+
+    assert consolidate_customer("Nobody", db=db).bill_count == 0
+
+
+def test_consolidation_seeks_customer_date_index(db):
+    detail = " ".join(row[-1] for row in db.query("EXPLAIN QUERY PLAN " + CONSOLIDATE_SQL, ("Hotel A", "2024-03-11", "2024-03-18")))
+    assert "USING INDEX idx_live_bills_customer_date (customer_name=? AND transaction_date>? AND transaction_date<?)" in detail
+    assert "TEMP B-TREE" not in detail
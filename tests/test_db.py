@@ -0,0 +1,34 @@
+# Tests for the shared SQLite connection layer
+import sqlite3
+
+import pytest
+
+import svs_db
+
+
+def test_connection_is_reused_and_tuned(tmp_path):
+    db = svs_db.Database(str(tmp_path / "test.db"), cache_size_kb=2048)
+    conn = db.connection()
+    assert db.connection() is conn
+    assert db.query_one("PRAGMA journal_mode")[0] == "wal"
+    assert db.query_one("PRAGMA synchronous")[0] == 1  # NORMAL
+    assert db.query_one("PRAGMA cache_size")[0] == -2048
+    db.close()
+
+
+def test_transaction_commits_and_rolls_back(tmp_path):
+    db = svs_db.Database(str(tmp_path / "test.db"))
+    db.execute("CREATE TABLE t (x INTEGER UNIQUE)")
+
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO t VALUES (1)")
+        with db.transaction() as inner:
+            inner.execute("INSERT INTO t VALUES (2)")
+    assert db.query("SELECT x FROM t ORDER BY x") == [(1,), (2,)]
+
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO t VALUES (3)")
+            conn.execute("INSERT INTO t VALUES (1)")
+    assert db.query("SELECT x FROM t ORDER BY x") == [(1,), (2,)]
+    db.close()
@@ -0,0 +1,42 @@
+# Tests for the cached font discovery manifest
+import json
+import os
+
+import svs_fonts
+
+
+def use_font_dir(monkeypatch, tmp_path):
+    font_dir = tmp_path / "Noto_Sans_Tamil"
+    font_dir.mkdir()
+    (font_dir / "Other.ttf").write_bytes(b"")
+    (font_dir / "NotoSansTamil-Regular.ttf").write_bytes(b"")
+    monkeypatch.setattr(svs_fonts, "CANDIDATE_DIRS", [str(tmp_path / "missing"), str(font_dir)])
+    monkeypatch.setattr(svs_fonts, "_resolved", None)
+    return font_dir
+
+
+def test_manifest_is_written_once_and_reused(tmp_path, monkeypatch):
+    font_dir = use_font_dir(monkeypatch, tmp_path)
+    manifest_path = str(tmp_path / "fonts.json")
+
+    manifest = svs_fonts.resolve_fonts(manifest_path)
+    assert manifest["regular"] == str(font_dir / "NotoSansTamil-Regular.ttf")
+    with open(manifest_path, encoding="utf-8") as f:
+        assert json.load(f)["regular"] == manifest["regular"]
+
+    # A second launch trusts the manifest instead of listing the folders
+    monkeypatch.setattr(svs_fonts, "_resolved", None)
+    monkeypatch.setattr(svs_fonts, "discover_fonts", lambda: (_ for _ in ()).throw(AssertionError("rescanned")))
+    assert svs_fonts.resolve_fonts(manifest_path) == manifest
+
+
+def test_manifest_goes_stale_when_fonts_change(tmp_path, monkeypatch):
+    font_dir = use_font_dir(monkeypatch, tmp_path)
+    manifest_path = str(tmp_path / "fonts.json")
+    svs_fonts.resolve_fonts(manifest_path)
+    assert svs_fonts._load_manifest(manifest_path) is not None
+
+    (font_dir / "Lohit-Tamil.ttf").write_bytes(b"")
+    stat = os.stat(font_dir)
+    os.utime(font_dir, (stat.st_atime, stat.st_mtime + 10))
+    assert svs_fonts._load_manifest(manifest_path) is None
@@ -0,0 +1,69 @@
+# Tests for keyset paging of the sales history
+import pytest
+
+from conftest import add_bills
+from svs_history import HISTORY_PAGE_SQL, HistoryFilter, HistoryPager, count_history, get_history_page
+
+
+def history_rows(first, last):
+    """Bills first..last (their bill ids in a fresh database) across March and three customers."""
+    return [(f"2024-03-{i % 28 + 1:02d} 10:00:00", f"C{i % 3}", float(i), '[["Big", 1, 1, 1]]') for i in range(first, last + 1)]
+
+
+@pytest.fixture
+def db(db):
+    """The shared database with 25 legacy bills."""
+    with db.transaction() as conn:
+        add_bills(conn, history_rows(1, 25))
+    return db
+
+
+def test_pager_loads_pages_only_as_far_as_needed(db):
+    pager = HistoryPager(page_size=10, db=db)
+    statements = []
+    db.connection().set_trace_callback(statements.append)
+    assert len(pager) == 25
+    assert pager.get(0) == (25, "2024-03-26 10:00:00", "C1", 25.0)
+    assert pager.get(9)[0] == 16
+    pages = [s for s in statements if "FROM sales_history" in s]
+    assert len(pages) == 1 and "items_json" not in pages[0]
+
+    assert pager.get(24)[0] == 1 and pager.get(25) is None
+    assert len([s for s in statements if "FROM sales_history" in s]) == 3
+
+    # Deleting a bill and resetting shows the new state
+    db.execute("DELETE FROM sales_history WHERE bill_id = 25")
+    pager.reset()
+    assert len(pager) == 24 and pager.get(0)[0] == 24
+    db.connection().set_trace_callback(None)
+
+
+def test_history_page_seeks_on_bill_id(db):
+    assert [row[0] for row in get_history_page(10, 3, db=db)] == [9, 8, 7]
+    detail = " ".join(row[-1] for row in db.query("EXPLAIN QUERY PLAN " + HISTORY_PAGE_SQL, (10, 3)))
+    assert "INTEGER PRIMARY KEY (rowid<?)" in detail
+
+
+def test_filters_combine_and_count(db):
+    with db.transaction() as conn:
+        add_bills(conn, history_rows(26, 60))
+    db.execute("INSERT INTO sales_items (bill_id, line_no, product_name, quantity_kg, rate, total) VALUES (7, 1, 'Beans', 1, 7, 7)")
+    db.execute("INSERT INTO sales_items (bill_id, line_no, product_name, quantity_kg, rate, total) VALUES (40, 1, 'Beans', 1, 40, 40)")
+
+    by_customer = HistoryFilter(customer="C1", start_date="2024-03-05", end_date="2024-03-10")
+    rows = get_history_page(filters=by_customer, db=db)
+    assert [r[0] for r in rows] == [37, 34, 7, 4]
+    assert count_history(by_customer, db=db) == (4, 82.0)
+
+    pager = HistoryPager(page_size=2, filters=by_customer, db=db)
+    assert [pager.get(i)[0] for i in range(len(pager))] == [37, 34, 7, 4]
+
+    assert count_history(HistoryFilter(min_amount=10, max_amount=12), db=db) == (3, 33.0)
+    assert [r[0] for r in get_history_page(filters=HistoryFilter(product="Beans"), db=db)] == [40, 7]
+    # Bills not migrated yet are matched through their items_json
+    db.execute("""UPDATE sales_history SET items_json = '[["Beans", 1, 12, 12]]' WHERE bill_id = 12""")
+    db.execute("""UPDATE sales_history SET items_json = '[{"name": "Beans", "quantity": 1, "rate": 13}]' WHERE bill_id = 13""")
+    assert [r[0] for r in get_history_page(filters=HistoryFilter(product="Beans"), db=db)] == [40, 13, 12, 7]
+    assert count_history(HistoryFilter(product="Beans"), db=db) == (4, 72.0)
+    assert count_history(HistoryFilter(product="Beans", min_amount=20), db=db) == (1, 40.0)
+    assert [r[0] for r in get_history_page(filters=HistoryFilter(bill_id=12), db=db)] == [12]
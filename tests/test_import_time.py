@@ -0,0 +1,43 @@
+# Import-time benchmark: the core must load without the GUI or PDF engines
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ['customtkinter', 'tkinter', 'reportlab', 'weasyprint']
+
+# Generous ceiling for a fresh interpreter on a slow shop PC; on a dev
+# machine the core imports in a few tens of milliseconds.
+IMPORT_BUDGET_SECONDS = 1.0
+
+
+def import_in_fresh_interpreter(module):
+    code = (
+        "import sys, time, json; t = time.perf_counter(); import %s; "
+        "print(json.dumps({'seconds': time.perf_counter() - t, "
+        "'loaded': [m for m in %r if m in sys.modules]}))" % (module, HEAVY)
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_core_modules_import_without_gui_or_pdf_engines():
+    for module in ("svs_core", "svs_pdf", "svs_billing_app"):
+        started = time.perf_counter()
+        result = import_in_fresh_interpreter(module)
+        print(f"import {module}: {result['seconds'] * 1e3:.1f} ms "
+              f"(with interpreter start {(time.perf_counter() - started) * 1e3:.0f} ms)")
+        assert result['loaded'] == [], f"{module} imported {result['loaded']}"
+        assert result['seconds'] < IMPORT_BUDGET_SECONDS
+
+
+def test_pdf_helpers_work_without_loading_reportlab():
+    code = (
+        "import sys, svs_pdf; svs_pdf.make_pdf_filename('A'); svs_pdf.format_quantity(1.5); "
+        "svs_pdf.build_invoice_html(1, 'A', [('Tomato', 1.0, 2.0, 2.0)], 2.0); "
+        "print('reportlab' in sys.modules)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == "False"
@@ -0,0 +1,104 @@
+# Tests for backups and scheduled maintenance
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+import svs_db
+import svs_maintenance
+from conftest import add_bills
+from svs_maintenance import (MAINTENANCE_TASKS, MaintenanceError, MaintenanceScheduler, backup_database, convert_to_incremental,
+                             incremental_vacuum, maintenance_report, quick_check)
+
+
+@pytest.fixture
+def db(db):
+    """The shared database with 2000 bills, enough pages for a backup in steps."""
+    with db.transaction() as conn:
+        add_bills(conn, [("2024-05-01 10:00:00", f"C{i % 9}", float(i), "x" * 200) for i in range(2000)])
+    return db
+
+
+def test_backup_is_a_complete_copy_and_old_ones_are_pruned(db, tmp_path, monkeypatch):
+    folder = str(tmp_path / "Backups")
+    path = backup_database(db, folder=folder, pages=8)
+    copy = sqlite3.connect(path)
+    assert copy.execute("SELECT COUNT(*) FROM sales_history").fetchone()[0] == 2000
+    assert copy.execute("PRAGMA quick_check").fetchone()[0] == "ok"
+    assert copy.execute("PRAGMA journal_mode").fetchone()[0] == "delete"  # one self-contained file
+    copy.close()
+
+    for stamp in ("2024-01-01 00-00-00", "2024-01-02 00-00-00"):
+        open(f"{folder}/shop {stamp}.db", "w").close()
+    backup_database(db, folder=folder, keep=2)
+    backups = sorted(p.name for p in (tmp_path / "Backups").iterdir())
+    assert len(backups) == 2 and "shop 2024-01-01 00-00-00.db" not in backups
+    assert not any(name.endswith(".part") for name in backups)
+
+    # A backup that fails part way leaves nothing behind
+    def full_disk(seconds):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(svs_maintenance.time, "sleep", full_disk)  # fails after the first step
+    with pytest.raises(OSError):
+        backup_database(db, folder=folder, keep=2, pages=8)
+    assert sorted(p.name for p in (tmp_path / "Backups").iterdir()) == backups
+    monkeypatch.undo()
+
+    # Closing the app (is_idle() turns False) stops a backup at its next step
+    answers = iter([True, False])
+    with pytest.raises(MaintenanceError):
+        backup_database(db, is_idle=lambda: next(answers), folder=folder, keep=2, pages=8)
+    assert sorted(p.name for p in (tmp_path / "Backups").iterdir()) == backups
+
+
+def test_incremental_vacuum_returns_free_pages(db, tmp_path, monkeypatch):
+    assert db.query_one("PRAGMA auto_vacuum")[0] == 2  # new files are created incremental
+    db.execute("DELETE FROM sales_history WHERE bill_id > 100")
+    assert db.query_one("PRAGMA freelist_count")[0] > 0
+    assert incremental_vacuum(db, is_idle=lambda: False) == "0 pages freed"  # counter busy
+    free_pages = db.query_one("PRAGMA freelist_count")[0]
+    assert incremental_vacuum(db, pages=16) == f"{free_pages} pages freed"
+    assert db.query_one("PRAGMA freelist_count")[0] == 0
+
+    # A step that frees nothing ends the run instead of spinning
+    db.execute("DELETE FROM sales_history WHERE bill_id > 10")
+    monkeypatch.setattr(db, "execute", lambda sql, params=(): db.connection().execute("SELECT 1"))
+    assert incremental_vacuum(db, pages=16) == "0 pages freed"
+    monkeypatch.undo()
+
+    # A database from before auto_vacuum was set is only converted on request
+    old = sqlite3.connect(str(tmp_path / "old.db"))
+    old.execute("CREATE TABLE t (x)")
+    old.close()
+    old_db = svs_db.Database(str(tmp_path / "old.db"))
+    assert incremental_vacuum(old_db).startswith("skipped: not incremental")
+    assert old_db.query_one("PRAGMA auto_vacuum")[0] == 0
+    assert convert_to_incremental(old_db) == "converted to incremental auto_vacuum"
+    assert old_db.query_one("PRAGMA auto_vacuum")[0] == 2
+    old_db.close()
+
+
+def test_scheduler_runs_due_tasks_and_records_their_cost(db):
+    assert quick_check(db) == "ok"
+
+    def broken(db, is_idle):
+        raise RuntimeError("disk full")
+
+    tasks = [("check", quick_check, timedelta(days=1)), ("backup", broken, timedelta(days=1))]
+    scheduler = MaintenanceScheduler(tasks, db=db)
+    runs = scheduler.run_due()
+    assert [(run.task, run.status) for run in runs] == [("check", "ok"), ("backup", "failed")]
+    assert runs[1].detail == "RuntimeError: disk full"
+
+    # The check is done for today; the failed backup is retried after an hour
+    assert scheduler.due() == []
+    assert scheduler.due(datetime.now() + timedelta(hours=2)) == ["backup"]
+    assert scheduler.due(datetime.now() + timedelta(days=2)) == ["check", "backup"]
+    assert "convert" not in MaintenanceScheduler(MAINTENANCE_TASKS, db=db).due()  # never scheduled
+    # Nothing starts while the counter is in use
+    assert scheduler.run(["check"], is_idle=lambda: False) == []
+
+    report = {cost.task: cost for cost in maintenance_report(db=db)}
+    assert report["check"].runs == 1 and report["backup"].failures == 1
+    assert report["check"].avg_ms >= 0
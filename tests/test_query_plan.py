@@ -0,0 +1,51 @@
+# Tests that history lookups use the sales_history indexes
+import pytest
+
+from conftest import add_bills
+from svs_sales import CUSTOMER_BILLS_SQL, SALES_SUMMARY_SQL, get_sales_summary
+
+
+@pytest.fixture
+def db(db):
+    """The shared database with 28 bills a month for a year, analyzed."""
+    with db.transaction() as conn:
+        add_bills(conn, [(f"2024-{m:02d}-{d:02d} 10:00:00", f"C{d % 7}", 100.0) for m in range(1, 13) for d in range(1, 29)])
+        conn.execute("ANALYZE")
+    return db
+
+
+def plan(db, sql, params):
+    return " ".join(row[-1] for row in db.query("EXPLAIN QUERY PLAN " + sql, params))
+
+
+def test_dashboard_summary_reads_rollup_by_date(db):
+    params = {'today': '2024-12-28', 'week': '2024-12-23',
+              'month': '2024-12-01', 'earliest': '2024-12-01'}
+    detail = plan(db, SALES_SUMMARY_SQL, params)
+    assert "daily_sales_rollup USING PRIMARY KEY (sale_date>?)" in detail
+    assert "sales_history" not in detail
+
+    summary = get_sales_summary('2024-12-28 00:00:00', '2024-12-23 00:00:00', '2024-12-01 00:00:00', db=db)
+    assert summary['This Month'] == (2800.0, 28)
+    assert summary['Today'] == (100.0, 1)
+
+
+def test_date_range_scan_uses_date_index(db):
+    detail = plan(db, "SELECT TOTAL(total_amount) FROM sales_history WHERE transaction_date >= ? AND deleted_at IS NULL", ("2024-12-01",))
+    assert "USING COVERING INDEX idx_live_bills_date" in detail
+
+
+def test_customer_history_uses_customer_date_index(db):
+    detail = plan(db, CUSTOMER_BILLS_SQL, ("C3",))
+    assert "USING INDEX idx_live_bills_customer_date" in detail
+    assert "TEMP B-TREE" not in detail  # ORDER BY served by the index
+
+
+def test_customer_history_page_seeks_by_bill_id(db):
+    from svs_history import HistoryFilter, _where
+    conditions, params = _where(HistoryFilter(customer="C3"))
+    sql = ("SELECT bill_id, transaction_date, customer_name, total_amount FROM sales_history WHERE " + " AND ".join(conditions)
+           + " AND bill_id < ? ORDER BY bill_id DESC LIMIT 200")
+    detail = plan(db, sql, params + [100])
+    assert "USING INTEGER PRIMARY KEY (rowid<?)" in detail
+    assert "TEMP B-TREE" not in detail
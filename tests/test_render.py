@@ -0,0 +1,86 @@
+# Tests for the process-pool PDF render engine
+import os
+import threading
+
+from svs_render import RenderEngine
+
+ITEMS = [("Tomato (தக்காளி)", 1.5, 25.0, 37.5), ("Onion (வெங்காயம்)", 2.0, 35.0, 70.0)]
+
+
+def test_pool_renders_invoices_as_futures(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("Invoices")
+    engine = RenderEngine(workers=1)
+    try:
+        # Same customer, same second: each PDF still gets its own file
+        futures = [engine.submit(bill_id, "Hotel A", ITEMS, 107.5) for bill_id in (1, 2)]
+        paths = [f.result(timeout=120) for f in futures]
+    finally:
+        engine.shutdown()
+    assert len(set(paths)) == 2 and all(os.path.exists(p) for p in paths)
+
+
+def _crash(job):
+    os._exit(1)
+
+
+def test_jobs_of_a_crashed_pool_render_on_the_fallback_thread():
+    engine = RenderEngine(workers=1)
+    try:
+        future = engine._submit(_crash, lambda job: threading.current_thread().name, {})
+        assert future.result(timeout=120).startswith("svs-render-fallback")
+        assert engine._get_pool() is None  # later jobs render in-process
+    finally:
+        engine.shutdown()
+
+
+def test_without_pool_falls_back_to_in_process_reportlab(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("Invoices")
+    engine = RenderEngine(workers=0)
+    path = engine.render(7, "Fallback", ITEMS, 107.5, title="TEST")
+    assert os.path.exists(path)
+    with open(path, "rb") as f:
+        assert f.read(4) == b"%PDF"
+
+
+def test_invoice_html_escapes_names_and_splits_tamil():
+    from svs_pdf import build_invoice_html
+
+    document = build_invoice_html(5, "A & B <Hotel>", [("Tomato <big> (தக்காளி)", 1.5, 25.0, 37.5)], 37.5)
+    assert "A &amp; B &lt;Hotel&gt;" in document
+    assert "Tomato &lt;big&gt; <span class='tamil'>(தக்காளி)</span>" in document
+    assert "<Hotel>" not in document
+
+
+def test_reportlab_fallback_paginates_streamed_rows(tmp_path):
+    from svs_pdf import generate_pdf_invoice
+
+    consumed = []
+
+    def rows():
+        for i in range(200):
+            consumed.append(i)
+            yield (f"Item {i}", 1.0, 10.0, 10.0)
+
+    path = generate_pdf_invoice(0, "Big Hotel", rows(), 2000.0, title="WEEKLY CONSOLIDATED INVOICE",
+                                use_weasyprint=False, filename=str(tmp_path / "big.pdf"))
+    assert len(consumed) == 200
+    with open(path, "rb") as f:
+        data = f.read()
+    # 31 rows on the first page, then 38 per continuation page
+    assert data.count(b"/Type /Page\n") == 6
+
+
+def test_grand_total_on_its_own_page_repeats_the_table_header(tmp_path, monkeypatch):
+    import svs_pdf
+
+    headers = []
+    draw_table_header = svs_pdf._draw_table_header
+    monkeypatch.setattr(svs_pdf, "_draw_table_header", lambda c, y: headers.append(y) or draw_table_header(c, y))
+    monkeypatch.setattr(svs_pdf, "TOTALS_BOTTOM_MARGIN", 2 * svs_pdf.inch)  # no room left under the last row
+    path = svs_pdf.generate_pdf_invoice(0, "Big Hotel", ITEMS * 15, 1612.5, use_weasyprint=False,
+                                        filename=str(tmp_path / "totals.pdf"))
+    with open(path, "rb") as f:
+        assert f.read().count(b"/Type /Page\n") == 2
+    assert len(headers) == 2
@@ -0,0 +1,61 @@
+# Tests for sales_items storage and the items_json migration
+import json
+
+import svs_db
+from conftest import add_bills
+from svs_sales import load_bill_items, migrate_items_json
+
+
+def add_legacy_bill(db, customer, items):
+    total = sum(item[3] for item in items)
+    return add_bills(db.connection(), [("2024-01-01 10:00:00", customer, total, json.dumps(items))])[0]
+
+
+def test_migration_is_batched_and_resumable(db):
+    ids = [add_legacy_bill(db, f"C{i}", [["Tomato", 1.5, 20.0, 30.0], ["Onion", 2.0, 35.0, 70.0]]) for i in range(5)]
+
+    # Old rows are readable before migration through the compatibility reader
+    assert load_bill_items(ids[0], db=db) == [("Tomato", 1.5, 20.0, 30.0), ("Onion", 2.0, 35.0, 70.0)]
+
+    assert migrate_items_json(batch_size=2, max_batches=1, db=db) == 2
+    assert db.query_one("SELECT COUNT(DISTINCT bill_id) FROM sales_items")[0] == 2
+    # Resume picks up where the first run stopped
+    assert migrate_items_json(batch_size=2, db=db) == 3
+    assert migrate_items_json(batch_size=2, db=db) == 0
+
+    assert db.query_one("SELECT COUNT(*) FROM sales_items")[0] == 10
+    assert db.query_one("SELECT COUNT(*) FROM sales_history WHERE items_json != ''")[0] == 0
+    assert load_bill_items(ids[4], db=db) == [("Tomato", 1.5, 20.0, 30.0), ("Onion", 2.0, 35.0, 70.0)]
+
+
+def test_deleting_a_bill_cascades_to_items(db):
+    db.execute("INSERT INTO products (name, rate_per_kg) VALUES ('Tomato', 20.0)")
+    with db.transaction() as conn:
+        bill_id, = add_bills(conn, [("2024-01-01 10:00:00", "A", 30.0, [("Tomato", 1.5, 20.0, 30.0)])])
+    assert db.query_one("SELECT product_id FROM sales_items WHERE bill_id = ?", (bill_id,))[0] is not None
+
+    db.execute("DELETE FROM sales_history WHERE bill_id = ?", (bill_id,))
+    assert db.query_one("SELECT COUNT(*) FROM sales_items")[0] == 0
+
+
+def test_daily_rollup_follows_inserts_updates_and_deletes(db):
+    first, _, _ = add_bills(db.connection(), [
+        ("2024-03-01 09:00:00", "A", 100.0), ("2024-03-01 18:00:00", "A", 50.0), ("2024-03-02 09:00:00", "B", 20.0),
+    ])
+    rollup = "SELECT sale_date, customer_name, bill_count, total_amount FROM daily_sales_rollup ORDER BY 1, 2"
+    assert db.query(rollup) == [("2024-03-01", "A", 2, 150.0), ("2024-03-02", "B", 1, 20.0)]
+
+    db.execute("UPDATE sales_history SET transaction_date = '2024-03-02 10:00:00', total_amount = 70.0 WHERE bill_id = ?", (first,))
+    assert db.query(rollup) == [("2024-03-01", "A", 1, 50.0), ("2024-03-02", "A", 1, 70.0), ("2024-03-02", "B", 1, 20.0)]
+
+    db.execute("DELETE FROM sales_history WHERE customer_name = 'A'")
+    assert db.query(rollup) == [("2024-03-02", "B", 1, 20.0)]
+
+
+def test_rollup_is_backfilled_for_existing_databases(db):
+    add_legacy_bill(db, "A", [["Tomato", 1.0, 20.0, 20.0]])
+    db.execute("DELETE FROM daily_sales_rollup")
+    db.execute("DELETE FROM schema_meta")
+    with db.transaction() as conn:
+        svs_db.create_schema(conn)
+    assert db.query("SELECT sale_date, customer_name, bill_count, total_amount FROM daily_sales_rollup") == [("2024-01-01", "A", 1, 20.0)]
@@ -0,0 +1,50 @@
+# Tests for the type-ahead product index
+from svs_catalog import ProductCatalog
+from svs_search import ProductIndex, tokenize
+
+PRODUCTS = ["Tomato (தக்காளி)", "Onion (வெங்காயம்)", "Small Onion (சின்ன வெங்காயம்)",
+            "Spring Onion (வசந்த வெங்காயம்)", "Beans (பீன்ஸ்)", "Broad Beans (அவரைக்காய்)"]
+
+
+def make_index():
+    index = ProductIndex()
+    for product_id, name in enumerate(PRODUCTS, 1):
+        index.add(product_id, name)
+    return index
+
+
+def test_tamil_words_stay_whole():
+    assert tokenize("Small Onion (சின்ன வெங்காயம்)") == ["small", "onion", "சின்ன", "வெங்காயம்"]
+
+
+def test_ranked_prefix_matches_in_english_tamil_and_plu():
+    index = make_index()
+    assert index.search("on") == ["Onion (வெங்காயம்)", "Small Onion (சின்ன வெங்காயம்)", "Spring Onion (வசந்த வெங்காயம்)"]
+    assert index.search("வெங்") == index.search("on")
+    assert index.search("sm on") == ["Small Onion (சின்ன வெங்காயம்)"]
+    assert index.search("bea")[0] == "Beans (பீன்ஸ்)"
+    assert index.search("5") == ["Beans (பீன்ஸ்)"]
+    assert index.search("xyz") == [] and index.search("  ") == []
+
+
+def test_typing_a_whole_bilingual_name_ranks_it_first():
+    index = ProductIndex()
+    index.add(1, "Tomato (தக்காளி) Hybrid ஹைப்ரிட்")
+    index.add(2, "Tomato Hybrid (ஹைப்ரிட் தக்காளி)")
+    assert index.search("Tomato Hybrid (ஹைப்ரிட் தக்காளி)")[0] == "Tomato Hybrid (ஹைப்ரிட் தக்காளி)"
+    assert index.search("tomato hybrid (ஹைப்")[0] == "Tomato Hybrid (ஹைப்ரிட் தக்காளி)"
+
+
+def test_sync_reindexes_only_changed_products(db):
+    db.executemany("INSERT INTO products (name, rate_per_kg) VALUES (?, 10)", [(n,) for n in PRODUCTS])
+    catalog = ProductCatalog(db)
+    index = ProductIndex()
+    assert index.sync(catalog) == len(PRODUCTS) and index.sync(catalog) == 0
+
+    db.execute("UPDATE products SET name = 'Cherry Tomato (செர்ரி தக்காளி)' WHERE id = 1")
+    db.execute("DELETE FROM products WHERE id = 2")
+    db.execute("UPDATE products SET rate_per_kg = 12 WHERE id = 3")
+    catalog.refresh_if_changed()
+    assert index.sync(catalog) == 2
+    assert index.search("தக்") == ["Cherry Tomato (செர்ரி தக்காளி)"]
+    assert "Onion (வெங்காயம்)" not in index.search("onion") and len(index) == len(PRODUCTS) - 1
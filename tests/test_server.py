@@ -0,0 +1,90 @@
+# Tests for the local billing API and its single writer
+import threading
+
+import pytest
+
+import svs_billing_app
+import svs_db
+from svs_render import RenderEngine
+from svs_server import ApiError, BillingClient, SingleWriter, make_server
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    svs_db.configure(str(tmp_path / "server.db"))
+    svs_billing_app.setup_database_and_folders()
+    server = make_server(port=0, engine=RenderEngine(0), threads=4)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    svs_db.configure()
+
+
+def test_counters_create_and_read_bills_concurrently(server):
+    port = server.server_address[1]
+    client = BillingClient(port=port)
+    product = client.products()[0]
+    assert product["rate"] > 0
+    assert "Hotel A" not in client.customers()
+
+    def counter(n):
+        c = BillingClient(port=port)
+        for _ in range(10):
+            c.create_bill(f"Counter {n}", [{"name": product["name"], "quantity": 2}])
+        c.close()
+
+    threads = [threading.Thread(target=counter, args=(n,)) for n in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert svs_db.get_db().query_one("SELECT COUNT(*) FROM sales_history")[0] == 30
+
+    created = client.create_bill("Hotel A", [{"name": "Extra", "quantity": 1.5, "rate": 10}], pdf=True)
+    assert created["customer_added"] and created["total_amount"] == 15.0
+    bill = client.bill(created["bill_id"])
+    assert bill["customer_name"] == "Hotel A" and bill["items"][0]["total"] == 15.0
+    job = client.job(created["job_id"])
+    assert job["status"] == "done" and job["pdf_path"].endswith(".pdf")
+
+    with pytest.raises(ApiError) as e:
+        client.create_bill("Hotel A", [{"name": "No Such Veg", "quantity": 1}])
+    assert e.value.status == 400
+    with pytest.raises(ApiError) as e:
+        client.bill(9999)
+    assert e.value.status == 404
+    client.close()
+
+
+def test_single_writer_isolates_failing_jobs(tmp_path):
+    db = svs_db.configure(str(tmp_path / "writer.db"))
+    try:
+        db.execute("CREATE TABLE t (v INTEGER UNIQUE)")
+        writer = SingleWriter()
+        insert = lambda v: svs_db.get_db().execute("INSERT INTO t VALUES (?)", (v,)).lastrowid
+        futures = [writer.submit(insert, v) for v in (1, 2, 1, 3)]
+        assert futures[2].exception() is not None
+        assert [f.result() for f in (futures[0], futures[1], futures[3])] == [1, 2, 3]
+        writer.shutdown()
+        assert [r[0] for r in db.query("SELECT v FROM t ORDER BY v")] == [1, 2, 3]
+    finally:
+        svs_db.configure()
+
+
+def test_history_search_pages_by_keyset(server):
+    client = BillingClient(port=server.server_address[1])
+    for n in range(5):
+        client.create_bill("Hotel A" if n % 2 else "Hotel B", [{"name": "Extra", "quantity": 1, "rate": 10 * (n + 1)}])
+    page = client.history(customer="Hotel B", limit=2)
+    assert [b["bill_id"] for b in page["bills"]] == [5, 3] and page["count"] == 3 and page["total_amount"] == 90.0
+    page = client.history(customer="Hotel B", limit=2, before=page["next_before"])
+    assert [b["bill_id"] for b in page["bills"]] == [1] and page["next_before"] is None
+    assert client.history(min_amount=20, max_amount=30)["count"] == 2
+    for limit in (0, -1):
+        with pytest.raises(ApiError) as e:
+            client.history(limit=limit)
+        assert e.value.status == 400
+    client.close()
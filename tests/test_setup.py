@@ -0,0 +1,23 @@
+# Tests for versioned startup schema creation and seeding
+import svs_billing_app
+import svs_db
+
+
+def test_seeding_runs_once_and_then_only_reads_metadata(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = svs_db.configure(str(tmp_path / "setup.db"))
+    try:
+        svs_billing_app.setup_database_and_folders()
+        names = [p[0] for p in svs_billing_app.get_products()]
+        assert len(names) == len(set(names)) == len(svs_billing_app.INITIAL_PRODUCTS)
+
+        # A product the shop deleted is not resurrected on the next launch
+        db.execute("DELETE FROM products WHERE name = ?", (names[0],))
+        statements = []
+        db.connection().set_trace_callback(statements.append)
+        svs_billing_app.setup_database_and_folders()
+        db.connection().set_trace_callback(None)
+        assert len(statements) == 1 and "schema_meta" in statements[0]
+        assert len(svs_billing_app.get_products()) == len(names) - 1
+    finally:
+        svs_db.configure()
@@ -0,0 +1,54 @@
+# Tests for the background TaskRunner (driven by a fake after() scheduler)
+import threading
+import time
+
+from svs_tasks import TaskRunner
+
+
+class FakeScheduler:
+    """Collects after() callbacks so the test can pump them like a Tk loop."""
+
+    def __init__(self):
+        self.callbacks = []
+        self.thread = threading.current_thread()
+
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+
+    def pump(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+def run_until_idle(runner, scheduler, timeout=5.0):
+    deadline = time.time() + timeout
+    while runner.pending and time.time() < deadline:
+        time.sleep(0.01)
+        scheduler.pump()
+
+
+def test_results_and_failures_are_delivered_on_the_ui_thread():
+    scheduler = FakeScheduler()
+    runner = TaskRunner(scheduler.after)
+    seen = []
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("render failed")
+        return "ok"
+
+    runner.submit("double", lambda x: x * 2, 21,
+                  on_done=lambda r: seen.append((r, threading.current_thread() is scheduler.thread)))
+    runner.submit("flaky", flaky, on_done=seen.append)
+    run_until_idle(runner, scheduler)
+
+    assert (42, True) in seen
+    assert [label for label, _, _ in runner.failed] == ["flaky"]
+
+    runner.retry_failed()
+    run_until_idle(runner, scheduler)
+    assert "ok" in seen and not runner.failed
+    runner.shutdown()
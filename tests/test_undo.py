@@ -0,0 +1,77 @@
+# Tests for soft delete (tombstones), the undo stack and compaction
+from datetime import datetime, timedelta
+
+import pytest
+
+import svs_db
+from conftest import add_bills
+from svs_history import HistoryPager, count_history
+from svs_undo import compact, delete_bills, soft_delete, undo_last, undo_stack
+
+
+@pytest.fixture
+def db(db):
+    """The shared database with a bill a day from 1 to 6 March."""
+    with db.transaction() as conn:
+        add_bills(conn, [(f"2024-03-0{i} 10:00:00", f"C{i % 2}", 10.0 * i, [("Tomato", 1.0, 10.0 * i, 10.0 * i)])
+                         for i in range(1, 7)])
+    return db
+
+
+def live_ids(db):
+    pager = HistoryPager(db=db)
+    return [pager.get(i)[0] for i in range(len(pager))]
+
+
+def test_deletes_are_tombstones_undone_newest_first(db):
+    assert delete_bills([2], db=db).action == "Delete bill 2"
+    soft_delete("customer_name = ?", ("C1",), "Weekly bill C1", db=db)
+    assert live_ids(db) == [6, 4]
+    assert count_history(db=db) == (2, 100.0)  # rollup ignores tombstones
+    assert db.query_one("SELECT COUNT(*) FROM sales_items")[0] == 6  # lines kept for undo
+    assert delete_bills([2], db=db) is None  # already deleted
+
+    # The stack is in the database, so it survives a restart
+    db.close()
+    db = svs_db.Database(db.path)
+    assert [entry.action for entry in undo_stack(db=db)] == ["Weekly bill C1", "Delete bill 2"]
+    assert undo_last(db=db).bill_count == 3
+    assert live_ids(db) == [6, 5, 4, 3, 1]
+    assert undo_last(db=db).action == "Delete bill 2"
+    assert count_history(db=db) == (6, 210.0)
+    assert undo_last(db=db) is None
+    db.close()
+
+
+def test_compaction_purges_only_expired_tombstones(db):
+    delete_bills([1, 2, 3], db=db)
+    later = datetime.now() + timedelta(days=10)
+    assert compact(keep_days=30, vacuum=False, now=later, db=db).purged_bills == 0
+
+    delete_bills([4], db=db)
+    result = compact(keep_days=5, now=later, batch_size=2, db=db)
+    assert (result.purged_bills, result.dropped_entries) == (4, 2)
+    assert db.query_one("SELECT COUNT(*) FROM sales_history")[0] == 2
+    assert db.query_one("SELECT COUNT(*) FROM sales_items")[0] == 2  # cascaded
+    assert undo_stack(db=db) == []
+    assert count_history(db=db) == (2, 110.0)
+
+
+def test_old_database_is_upgraded(tmp_path):
+    db = svs_db.Database(str(tmp_path / "old.db"))
+    db.execute('''CREATE TABLE sales_history (bill_id INTEGER PRIMARY KEY AUTOINCREMENT, transaction_date TEXT NOT NULL,
+                  customer_name TEXT NOT NULL, total_amount REAL NOT NULL, items_json TEXT NOT NULL)''')
+    db.execute("CREATE INDEX idx_sales_history_date ON sales_history(transaction_date, total_amount)")
+    db.execute("INSERT INTO sales_history (transaction_date, customer_name, total_amount, items_json) VALUES ('2024-01-01 09:00:00', 'A', 5.0, '')")
+    with db.transaction() as conn:
+        svs_db.create_schema(conn)
+    columns = [row[1] for row in db.query("PRAGMA table_info(sales_history)")]
+    assert columns[-2:] == ["deleted_at", "deleted_by"]
+    indexes = {row[0] for row in db.query("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "idx_sales_history_date" not in indexes and "idx_live_bills_date" in indexes
+
+    delete_bills([1], db=db)
+    assert count_history(db=db) == (0, 0.0)
+    undo_last(db=db)
+    assert count_history(db=db) == (1, 5.0)
+    db.close()